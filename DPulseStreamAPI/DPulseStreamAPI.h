@@ -30,11 +30,21 @@
 #include <stdint.h>
 #include <string>
 #include <fstream>
+#include <vector>
+#include <deque>
+#include <thread>
+#include <mutex>
+#include <condition_variable>
+#include <atomic>
 
 using namespace std;
 
 #define DDELETE_SAFETY(__var__) if (__var__) { delete __var__; __var__ = nullptr; }
 
+#if !defined(_MSC_VER)
+typedef int64_t __int64;
+#endif
+
 /****************************************************************************
 **
 **  struct DPulseStreamHeader:
@@ -43,6 +53,15 @@ using namespace std;
 **  using class DPulseStreamManager.
 **  It contains the information, which are necessary to read this file afterwards. 
 **
+**  version 1: each record consists of the time and voltage trace:
+**
+**             [header][time|voltage][time|voltage]...
+**
+**  version 2: the time axis (fixed sampling grid) is stored only once behind
+**             the header followed by voltage-only records:
+**
+**             [header][time axis][voltage][voltage]...
+**
 *****************************************************************************/
 
 typedef struct {
@@ -54,6 +73,90 @@ typedef struct {
 
 #define sz_structDPulseStreamHeader sizeof(DPulseStreamHeader)
 
+#define DPULSESTREAM_VERSION_1 1 // time & voltage trace per pulse
+#define DPULSESTREAM_VERSION_2 2 // shared time axis & voltage-only records
+
+/****************************************************************************
+**
+**  struct DPulseStreamIndexEntry & DPulseStreamIndexFooter:
+**
+**  The optional index trailer (see 'DPulseStreamManager::enableIndexTrailer(..)')
+**  is appended behind the last record by 'stopAndSave()':
+**
+**  [header][..records..][entry 0][entry 1]..[entry N-1][footer]
+**
+**  Each entry summarizes a block of 'recordsPerBlock' consecutive records
+**  (record = pulse or pulse pair) for detector [0] (A) and [1] (B, pairs only):
+**
+**  min./max. voltage   >> min./max. sample of all voltage traces
+**  min./max. amplitude >> min./max. of max(0, max. sample) - min(0, min. sample),
+**                         which bounds the pulse height independent of the
+**                         median filter and the baseline correction applied
+**  baseline mean       >> mean of the first 'numberOfBaselinePoints' samples
+**
+**  The footer is located in the last 48 bytes of the file.
+**
+*****************************************************************************/
+
+#define DPULSESTREAM_INDEX_MAGIC 0x49535044 // 'DPSI'
+
+typedef struct {
+	uint64_t offsetInBytes;
+	uint64_t numberOfRecords;
+	float    minVoltage[2];
+	float    maxVoltage[2];
+	float    minAmplitude[2];
+	float    maxAmplitude[2];
+	float    baselineMean[2];
+} DPulseStreamIndexEntry;
+
+typedef struct {
+	uint32_t magic;
+	uint32_t version;
+	uint64_t numberOfRecords;
+	uint64_t numberOfBlocks;
+	uint64_t recordsPerBlock;
+	uint64_t trailerSizeInBytes;
+	uint32_t pairs;
+	uint32_t numberOfBaselinePoints;
+} DPulseStreamIndexFooter;
+
+#define sz_structDPulseStreamIndexEntry  sizeof(DPulseStreamIndexEntry)
+#define sz_structDPulseStreamIndexFooter sizeof(DPulseStreamIndexFooter)
+
+/****************************************************************************
+**
+**  struct DPulseStreamSegment:
+**
+**  If the segment rotation is enabled (see 'DPulseStreamManager::
+**  enableSegmentRotation(..)'), the pulses are streamed into a sequence of
+**  segment files '<fileName>.000000', '<fileName>.000001', ... each with its
+**  own header (and index trailer). The file '<fileName>' is a manifest (text)
+**  listing the completed segments in order (name relative to the manifest):
+**
+**  # DPulseStream manifest 1
+**  # segment	records	bytes
+**  <fileName>.000000	<number of records>	<size in bytes>
+**  ...
+**
+**  The manifest is rewritten after each completed segment.
+**
+*****************************************************************************/
+
+#define DPULSESTREAM_MANIFEST_MAGIC "# DPulseStream manifest"
+
+typedef struct {
+	string   fileName;
+	uint64_t numberOfRecords;
+	uint64_t sizeInBytes;
+} DPulseStreamSegment;
+
+/* completed segment, which is closed by the writer thread after its queued buffers */
+typedef struct {
+	ofstream     *file;
+	vector<char> trailer;
+} DPulseStreamRetiredSegment;
+
 /****************************************************************************
 **
 **  class DPulseStreamManager:
@@ -61,6 +164,19 @@ typedef struct {
 **  This class provides the base functionality to stream the acquired detector 
 **  output pulses to a binary file.
 **
+**  asynchronous writer (see 'enableAsyncWriter(..)'):
+**
+**  The pulses are copied into a ring of preallocated buffers. A background
+**  thread flushes each filled buffer as one large contiguous block, so that
+**  disk stalls do not block the acquisition thread. If all buffers are
+**  queued for writing, the pulses are dropped and counted instead.
+**
+**  segment rotation (see 'enableSegmentRotation(..)'):
+**
+**  A new segment file is started each N bytes and/or N records (see struct
+**  DPulseStreamSegment). Segments completed while the asynchronous writer is
+**  active are closed by the writer thread.
+**
 *****************************************************************************/
 
 class DPulseStreamManager {
@@ -71,19 +187,116 @@ class DPulseStreamManager {
 	string m_fileName;
 	bool m_isArmed;
 
+	uint32_t m_version;
+	int m_numberOfSamplePoints;
+
+	DPulseStreamHeader m_header;
+	vector<float> m_timeAxis;
+
 	__int64 m_contentInBytes;
 
+	/* asynchronous writer */
+	bool m_asyncWriter;
+	int m_numberOfBuffers;
+	int m_bufferSizeInBytes;
+
+	vector<char*> m_buffers;
+	vector<int> m_bufferContentInBytes;
+
+	int m_fillIndex;
+	int m_flushIndex;
+	int m_queuedBuffers;
+	int m_maxQueuedBuffers;
+	bool m_stopWriter;
+
+	vector<ofstream*> m_bufferFiles;
+	deque<DPulseStreamRetiredSegment> m_retiredSegments;
+
+	thread *m_writerThread;
+	mutex m_mutex;
+	condition_variable m_bufferQueued;
+	condition_variable m_bufferWritten;
+
+	atomic<__int64> m_bytesWritten;
+	__int64 m_droppedPulses;
+
+	/* index trailer */
+	bool m_indexTrailer;
+	int m_recordsPerBlock;
+	int m_numberOfBaselinePoints;
+
+	vector<DPulseStreamIndexEntry> m_indexEntries;
+	double m_baselineSum[2];
+	uint64_t m_numberOfRecords;
+	bool m_pairs;
+
+	/* segment rotation */
+	bool m_segmentRotation;
+	__int64 m_maxSegmentSizeInBytes;
+	__int64 m_maxRecordsPerSegment;
+
+	vector<DPulseStreamSegment> m_segments;
+	string m_segmentFileName;
+	__int64 m_segmentRecords;
+	__int64 m_closedSegmentsInBytes;
+
+	void updateIndex(const float **voltages, int numberOfVoltages, int numberOfSamplePoints, __int64 offsetInBytes);
+	vector<char> indexTrailer();
+
+	bool openSegment();
+	bool rotateSegment();
+	void closeSegmentFile(ofstream *file, const vector<char>& trailer);
+	void writeManifest();
+	bool isSegmentFull(int recordSizeInBytes) const;
+
+	int collectTraces(float *time, float *voltage, int nBytes, const float **traces) const;
+	bool writeTraces(const float **traces, int numberOfTraces, int nBytes, int numberOfPulses);
+	bool enqueueTraces(const float **traces, int numberOfTraces, int nBytes, int numberOfPulses);
+	void queueFillBuffer();
+	void writerLoop();
+
 public:
 	static DPulseStreamManager *sharedInstance();
 
 	/* this function creates the pulse stream binary file */
-	bool start(const string& fileName, double sweepInNanoseconds, double sampleSpeedInGHz, int numberOfSamplePoints);
+	/* version 2: the time axis 'timeAxis' ('numberOfSamplePoints' values) is written once behind the header */
+	/*            if 'timeAxis' == nullptr, the equidistant axis i/'sampleSpeedInGHz' is written */
+	bool start(const string& fileName, double sweepInNanoseconds, double sampleSpeedInGHz, int numberOfSamplePoints, uint32_t version = DPULSESTREAM_VERSION_1, const float *timeAxis = nullptr);
 
 	/* this function closes the pulse stream binary file */
+	/* asynchronous writer: the queued buffers are flushed before closing */
 	void stopAndSave();
 
+	/* this function enables the asynchronous writer for the next 'start(..)' */
+	/* 'numberOfBuffers' buffers of 'bufferSizeInBytes' are allocated: set 'bufferSizeInBytes' >= size of one pulse pair */
+	bool enableAsyncWriter(int numberOfBuffers = 64, int bufferSizeInBytes = 4*1024*1024);
+
+	/* this function disables the asynchronous writer for the next 'start(..)' */
+	bool disableAsyncWriter();
+
+	inline bool isAsyncWriterEnabled() const { return m_asyncWriter; }
+
+	/* this function enables the index trailer (see 'DPulseStreamIndexFooter') for the next 'start(..)' */
+	/* a block summary is stored for each 'recordsPerBlock' records (pulses or pulse pairs) */
+	bool enableIndexTrailer(int recordsPerBlock = 1000, int numberOfBaselinePoints = 20);
+
+	/* this function disables the index trailer for the next 'start(..)' */
+	bool disableIndexTrailer();
+
+	inline bool isIndexTrailerEnabled() const { return m_indexTrailer; }
+
+	/* this function enables the segment rotation (see struct DPulseStreamSegment) for the next 'start(..)' */
+	/* a new segment is started, if the header and records exceed 'maxSegmentSizeInBytes' and/or the segment contains 'maxRecordsPerSegment' records (0: unlimited) */
+	bool enableSegmentRotation(__int64 maxSegmentSizeInBytes, __int64 maxRecordsPerSegment = 0);
+
+	/* this function disables the segment rotation for the next 'start(..)' */
+	bool disableSegmentRotation();
+
+	inline bool isSegmentRotationEnabled() const { return m_segmentRotation; }
+
 	/* this function streams ONE single pulse (time & voltage trace) to the binary file */
 	/* int 'nBytes': size of 'voltage' and/or 'time' in bytes */
+	/* version 2: only the voltage trace is written ('time' is ignored and might be nullptr) */
 	bool writePulse(float *time, float *voltage, int nBytes);
 
 	/* this function streams TWO pulses (time & voltage trace) to the binary file */
@@ -93,7 +306,120 @@ public:
 	inline bool isArmed()    const { return m_isArmed; }
 	inline string fileName() const { return m_fileName; }
 
-	__int64 streamedContentInBytes() const { return m_contentInBytes; }
+	/* segment rotation: name of the current segment file, otherwise 'fileName()' */
+	inline string segmentFileName() const { return m_segmentFileName; }
+
+	/* segment rotation: number of completed segments listed in the manifest */
+	inline int numberOfCompletedSegments() const { return (int)m_segments.size(); }
+	inline uint32_t version() const { return m_version; }
+
+	/* number of bytes accepted for streaming (headers of all segments included) */
+	__int64 streamedContentInBytes() const { return m_closedSegmentsInBytes + m_contentInBytes; }
+
+	/* number of bytes written to the binary file (header included) */
+	__int64 bytesWritten() const { return m_bytesWritten; }
+
+	/* number of pulses dropped by the asynchronous writer since the last 'start(..)' */
+	__int64 droppedPulses();
+
+	/* number of filled buffers waiting to be written by the asynchronous writer */
+	int queueDepth();
+	int maxQueueDepth();
 };
 
+#if !defined(_WIN32)
+
+/****************************************************************************
+**
+**  struct DPulseStreamRingControl:
+**
+**  This struct is placed at the beginning of the POSIX shared memory segment
+**  of class DPulseStreamSharedMemoryRing (128 bytes).
+**
+**  layout: [control][time axis (version 2 only)][records]
+**
+**  The records have the same layout as in the pulse stream file (pairs):
+**
+**  version 1: [time A|voltage A|time B|voltage B]
+**  version 2: [voltage A|voltage B]
+**
+**  'writeIndex' and 'readIndex' count the records written by the producer
+**  and released by the consumer since the creation of the ring. The record
+**  'i' is located in slot 'i % capacityInRecords'.
+**
+*****************************************************************************/
+
+#define DPULSESTREAM_RING_MAGIC 0x52535044 // 'DPSR'
+
+typedef struct {
+	uint32_t           magic;
+	uint32_t           layoutVersion;
+	DPulseStreamHeader header;
+	uint64_t           recordSizeInBytes;
+	uint64_t           capacityInRecords;
+	uint64_t           dataOffsetInBytes;
+	uint64_t           writeIndex;
+	uint64_t           readIndex;
+	uint64_t           droppedPairs;
+	uint32_t           closed;
+	uint32_t           __;
+	char               reserved[32];
+} DPulseStreamRingControl;
+
+#define sz_structDPulseStreamRingControl sizeof(DPulseStreamRingControl)
+
+/****************************************************************************
+**
+**  class DPulseStreamSharedMemoryRing:
+**
+**  This class provides a single-producer/single-consumer ring buffer of pulse
+**  pairs in POSIX shared memory, which is consumed by the python framework
+**  (see 'DPulseStreamSharedMemoryReader') without touching the disk.
+**
+**  If the ring is full, the pulse pairs are dropped and counted, i.e. unread
+**  records are never overwritten.
+**
+*****************************************************************************/
+
+class DPulseStreamSharedMemoryRing {
+	string m_name;
+
+	char *m_memory;
+	size_t m_sizeInBytes;
+
+	DPulseStreamRingControl *m_control;
+
+	int m_numberOfSamplePoints;
+
+public:
+	DPulseStreamSharedMemoryRing();
+	virtual ~DPulseStreamSharedMemoryRing();
+
+	/* this function creates the shared memory segment '/name' holding 'capacityInPairs' pulse pairs */
+	/* for 'version' and 'timeAxis' see 'DPulseStreamManager::start(..)' */
+	bool create(const string& name, double sweepInNanoseconds, double sampleSpeedInGHz, int numberOfSamplePoints, int capacityInPairs, uint32_t version = DPULSESTREAM_VERSION_1, const float *timeAxis = nullptr);
+
+	/* this function marks the ring as closed for the consumer and unmaps the shared memory segment */
+	/* note: the segment is removed by 'remove(..)' or the consumer */
+	void close();
+
+	/* this function removes the shared memory segment '/name' */
+	static bool remove(const string& name);
+
+	/* this function copies TWO pulses (time & voltage trace) as one record into the ring */
+	/* int 'nBytes': size of 'voltage' and/or 'time' in bytes */
+	bool writePulsePair(float *time_1, float *voltage_1, float *time_2, float *voltage_2, int nBytes);
+
+	inline bool isOpen()     const { return m_control != nullptr; }
+	inline string name()     const { return m_name; }
+
+	/* number of pulse pairs dropped, because the ring was full */
+	uint64_t droppedPairs() const;
+
+	/* number of pulse pairs waiting to be consumed */
+	uint64_t queuedPairs() const;
+};
+
+#endif // !_WIN32
+
 #endif // DPULSESTREAMMANAGER_H
\ No newline at end of file
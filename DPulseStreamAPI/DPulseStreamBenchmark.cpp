@@ -0,0 +1,111 @@
+/****************************************************************************
+**
+**  Copyright (C) 2019-2021 Danny Petschke
+**
+**  This program is free software: you can redistribute it and/or modify
+**  it under the terms of the GNU General Public License as published by
+**  the Free Software Foundation, either version 3 of the License, or
+**  (at your option) any later version.
+**
+**  This program is distributed in the hope that it will be useful,
+**  but WITHOUT ANY WARRANTY; without even the implied warranty of
+**  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+**  GNU General Public License for more details.
+**
+**  You should have received a copy of the GNU General Public License
+**  along with this program. If not, see http://www.gnu.org/licenses/.
+**
+*****************************************************************************
+**
+**  @author:  Danny Petschke
+**  @contact: danny.petschke@uni-wuerzburg.de
+**
+*****************************************************************************/
+
+/****************************************************************************
+**
+**  DPulseStreamBenchmark:
+**
+**  This program measures the throughput of DPulseStreamManager and the time
+**  the acquisition thread is blocked by 'writePulsePair(..)' (dead time)
+**  for the synchronous and the asynchronous writer.
+**
+**  usage: DPulseStreamBenchmark [file] [number of pairs] [number of sample points] [version]
+**
+*****************************************************************************/
+
+#include "DPulseStreamAPI.h"
+
+#include <chrono>
+#include <cmath>
+
+using namespace std::chrono;
+
+static void benchmark(const string& fileName, int numberOfPairs, int numberOfSamplePoints, uint32_t version, bool async) {
+	DPulseStreamManager *manager = DPulseStreamManager::sharedInstance();
+
+	if (async)
+		manager->enableAsyncWriter(64, 4*1024*1024);
+	else
+		manager->disableAsyncWriter();
+
+	vector<float> timeA(numberOfSamplePoints), voltageA(numberOfSamplePoints);
+	vector<float> timeB(numberOfSamplePoints), voltageB(numberOfSamplePoints);
+
+	for (int i = 0; i < numberOfSamplePoints; ++ i) {
+		timeA[i] = timeB[i] = (float)(i/5.12);
+
+		voltageA[i] = -200.0f*expf(-0.5f*powf((i - 0.3f*numberOfSamplePoints)/5.0f, 2.0f));
+		voltageB[i] = -100.0f*expf(-0.5f*powf((i - 0.4f*numberOfSamplePoints)/5.0f, 2.0f));
+	}
+
+	const int nBytes = numberOfSamplePoints*sizeof(float);
+
+	if (!manager->start(fileName, 200.0, 5.12, numberOfSamplePoints, version)) {
+		printf("cannot start the pulse stream '%s'\n", fileName.c_str());
+		return;
+	}
+
+	double maxCallInMicroseconds = 0.0;
+
+	const steady_clock::time_point startTime = steady_clock::now();
+
+	for (int k = 0; k < numberOfPairs; ++ k) {
+		const steady_clock::time_point callTime = steady_clock::now();
+
+		manager->writePulsePair(timeA.data(), voltageA.data(), timeB.data(), voltageB.data(), nBytes);
+
+		const double callInMicroseconds = duration<double, micro>(steady_clock::now() - callTime).count();
+
+		if (callInMicroseconds > maxCallInMicroseconds)
+			maxCallInMicroseconds = callInMicroseconds;
+	}
+
+	const double acquisitionInSeconds = duration<double>(steady_clock::now() - startTime).count();
+
+	const __int64 droppedPulses = manager->droppedPulses();
+	const int maxQueueDepth     = manager->maxQueueDepth();
+
+	manager->stopAndSave();
+
+	const double totalInSeconds = duration<double>(steady_clock::now() - startTime).count();
+	const double sizeInMB       = manager->bytesWritten()/(1024.0*1024.0);
+
+	printf("%-5s writer (v%u): %d pairs in %.3f s (acquisition thread: %.3f s, max. call: %.1f us) >> %.1f MB/s, dropped pulses: %lld, max. queue depth: %d, bytes written: %lld\n",
+		   async ? "async" : "sync", version, numberOfPairs, totalInSeconds, acquisitionInSeconds, maxCallInMicroseconds, sizeInMB/totalInSeconds,
+		   (long long)droppedPulses, maxQueueDepth, (long long)manager->bytesWritten());
+}
+
+int main(int argc, char **argv) {
+	const string fileName          = argc > 1 ? argv[1] : "benchmark.drs4DataStream";
+	const int numberOfPairs        = argc > 2 ? atoi(argv[2]) : 100000;
+	const int numberOfSamplePoints = argc > 3 ? atoi(argv[3]) : 1024;
+	const uint32_t version         = argc > 4 ? (uint32_t)atoi(argv[4]) : DPULSESTREAM_VERSION_1;
+
+	benchmark(fileName, numberOfPairs, numberOfSamplePoints, version, false);
+	benchmark(fileName, numberOfPairs, numberOfSamplePoints, version, true);
+
+	DPulseStreamManager::sharedInstance()->disableAsyncWriter();
+
+	return 0;
+}
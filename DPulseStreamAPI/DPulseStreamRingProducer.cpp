@@ -0,0 +1,124 @@
+/****************************************************************************
+**
+**  Copyright (C) 2019-2021 Danny Petschke
+**
+**  This program is free software: you can redistribute it and/or modify
+**  it under the terms of the GNU General Public License as published by
+**  the Free Software Foundation, either version 3 of the License, or
+**  (at your option) any later version.
+**
+**  This program is distributed in the hope that it will be useful,
+**  but WITHOUT ANY WARRANTY; without even the implied warranty of
+**  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+**  GNU General Public License for more details.
+**
+**  You should have received a copy of the GNU General Public License
+**  along with this program. If not, see http://www.gnu.org/licenses/.
+**
+*****************************************************************************
+**
+**  @author:  Danny Petschke
+**  @contact: danny.petschke@uni-wuerzburg.de
+**
+*****************************************************************************/
+
+/****************************************************************************
+**
+**  DPulseStreamRingProducer:
+**
+**  This program is a local test producer for DPulseStreamSharedMemoryRing:
+**  it replays the pulse pairs of a pulse stream file (version 1 or 2) into
+**  the shared memory segment '/name', which is consumed by the python
+**  framework (see 'iterSharedMemoryPulseBlocks(..)').
+**
+**  usage: DPulseStreamRingProducer [name] [pulse pair stream file] [capacity in pairs] [number of loops] [pairs per second (0: unlimited)]
+**
+*****************************************************************************/
+
+#include "DPulseStreamAPI.h"
+
+#include <chrono>
+
+using namespace std::chrono;
+
+int main(int argc, char **argv) {
+	if (argc < 3) {
+		printf("usage: %s [name] [pulse pair stream file] [capacity in pairs] [number of loops] [pairs per second (0: unlimited)]\n", argv[0]);
+		return 1;
+	}
+
+	const string name           = argv[1];
+	const string fileName       = argv[2];
+	const int capacityInPairs   = argc > 3 ? atoi(argv[3]) : 10000;
+	const int numberOfLoops     = argc > 4 ? atoi(argv[4]) : 1;
+	const double pairsPerSecond = argc > 5 ? atof(argv[5]) : 0.0;
+
+	ifstream file(fileName, ios::in | ios::binary);
+
+	DPulseStreamHeader header;
+
+	if (!file.read((char*)&header, sz_structDPulseStreamHeader)) {
+		printf("cannot read the header of '%s'\n", fileName.c_str());
+		return 1;
+	}
+
+	const int n = header.numberOfSamplePoints;
+
+	vector<float> timeAxis(n), timeA(n), voltageA(n), timeB(n), voltageB(n);
+
+	if (header.version == DPULSESTREAM_VERSION_2)
+		file.read((char*)timeAxis.data(), n*sizeof(float));
+
+	const streampos dataOffset = file.tellg();
+
+	DPulseStreamSharedMemoryRing ring;
+
+	if (!ring.create(name, header.sweepInNanoseconds, header.sampleSpeedInGHz, n, capacityInPairs, header.version, timeAxis.data())) {
+		printf("cannot create the shared memory segment '%s'\n", name.c_str());
+		return 1;
+	}
+
+	const steady_clock::time_point startTime = steady_clock::now();
+
+	uint64_t numberOfPairs = 0;
+
+	for (int loop = 0; loop < numberOfLoops; ++ loop) {
+		file.clear();
+		file.seekg(dataOffset);
+
+		while (true) {
+			if (header.version == DPULSESTREAM_VERSION_2) {
+				if (!file.read((char*)voltageA.data(), n*sizeof(float)) || !file.read((char*)voltageB.data(), n*sizeof(float)))
+					break;
+			}
+			else {
+				if (!file.read((char*)timeA.data(), n*sizeof(float)) || !file.read((char*)voltageA.data(), n*sizeof(float)) ||
+					!file.read((char*)timeB.data(), n*sizeof(float)) || !file.read((char*)voltageB.data(), n*sizeof(float)))
+					break;
+			}
+
+			/* the replay waits for the consumer instead of dropping pairs */
+			while (ring.queuedPairs() >= (uint64_t)capacityInPairs)
+				this_thread::sleep_for(microseconds(100));
+
+			/* throttle to the given rate */
+			if (pairsPerSecond > 0.0) {
+				const steady_clock::time_point due = startTime + duration_cast<steady_clock::duration>(duration<double>(numberOfPairs/pairsPerSecond));
+
+				this_thread::sleep_until(due);
+			}
+
+			ring.writePulsePair(timeA.data(), voltageA.data(), timeB.data(), voltageB.data(), n*sizeof(float));
+
+			numberOfPairs ++;
+		}
+	}
+
+	const double seconds = duration<double>(steady_clock::now() - startTime).count();
+
+	printf("%llu pulse pairs in %.3f s (%.0f pairs/s), dropped: %llu\n", (unsigned long long)numberOfPairs, seconds, numberOfPairs/seconds, (unsigned long long)ring.droppedPairs());
+
+	ring.close();
+
+	return 0;
+}
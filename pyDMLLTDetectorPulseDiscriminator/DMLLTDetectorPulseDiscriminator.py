@@ -49,22 +49,35 @@ Created on Tue Mar 19 13:25:01 2019
 import sys
 import os
 import struct
+import hashlib
+import glob
 import matplotlib.pyplot as plt
 import numpy as np
 from copy import deepcopy
+from time import monotonic, sleep
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory, resource_tracker
 
 from joblib import dump, load
 from sklearn.naive_bayes import GaussianNB
 from sklearn.calibration import CalibratedClassifierCV
 
 from scipy.signal import medfilt
+from scipy.ndimage import median_filter
 from scipy.interpolate import CubicSpline
+from scipy.special import expit, softmax
 
 """
 
  This class holds all information, which are required to TRAIN and TEST a machine('s classifier).
  Moreover, it provides (re)storing the learned machine's classifier from a file (*.joblib).
  
+ Optionally, a fast pre-classifier 'preClassifier' (e.g. GaussianNB() or LogisticRegression()) forms a two-stage cascade with the 
+ classifier: a pulse is rejected if the probability of the class CORRECT (1) of the pre-classifier is <= 'preRejectThreshold' 
+ and accepted if it is >= 'preAcceptThreshold'. Only the pulses in the uncertain band in between are passed to the (expensive) 
+ classifier (see 'predict(..)'). Both are TRAINed on the same pulses (see 'fit(..)'). Use 'runClassifierCascade(..)' to 
+ choose the thresholds (accuracy vs. throughput).
+ 
 """
 
 class DMachineParams():
@@ -79,13 +92,21 @@ class DMachineParams():
     
     m_classifier          = CalibratedClassifierCV(GaussianNB(), cv=2, method='isotonic')
     
+    # pre-classifier (two-stage cascade)
+    m_preClassifier       = None
+    m_preRejectThreshold  = 0.05
+    m_preAcceptThreshold  = 0.95
+    
     def __init__(self, 
                  correctForBaseline = True, 
                  startCell          = 10, 
                  cellRegion         = 150, 
                  medianFilter       = True, 
                  windowSize         = 5, 
-                 classifier         = CalibratedClassifierCV(GaussianNB(), cv=2, method='isotonic')):
+                 classifier         = CalibratedClassifierCV(GaussianNB(), cv=2, method='isotonic'),
+                 preClassifier      = None,
+                 preRejectThreshold = 0.05,
+                 preAcceptThreshold = 0.95):
         self.m_classifier         = deepcopy(classifier)
         
         self.m_correctForBaseline = correctForBaseline
@@ -94,6 +115,10 @@ class DMachineParams():
         self.m_medianFilter       = medianFilter
         self.m_windowSize         = windowSize
         
+        self.m_preClassifier      = deepcopy(preClassifier)
+        self.m_preRejectThreshold = preRejectThreshold
+        self.m_preAcceptThreshold = preAcceptThreshold
+        
     def load(self, fileNameAndPath = '/name'):
         dumpList = load(fileNameAndPath + '.joblib')
         
@@ -105,9 +130,22 @@ class DMachineParams():
         self.m_medianFilter       = dumpList[4]
         self.m_windowSize         = dumpList[5]
         
+        # machines stored without pre-classifier
+        if len(dumpList) > 6:
+            self.m_preClassifier      = deepcopy(dumpList[6])
+            self.m_preRejectThreshold = dumpList[7]
+            self.m_preAcceptThreshold = dumpList[8]
+        else:
+            self.m_preClassifier      = None
+            self.m_preRejectThreshold = 0.05
+            self.m_preAcceptThreshold = 0.95
+        
     def save(self, fileNameAndPath = '/name'):
         dumpList = [self.m_classifier, self.m_correctForBaseline, self.m_startCell, self.m_cellRegion, self.m_medianFilter, self.m_windowSize]
         
+        if self.m_preClassifier is not None:
+            dumpList += [self.m_preClassifier, self.m_preRejectThreshold, self.m_preAcceptThreshold]
+        
         dump(dumpList, fileNameAndPath + '.joblib')
         
     def copy(self):
@@ -121,11 +159,128 @@ class DMachineParams():
         machineParams.m_medianFilter       = self.m_medianFilter
         machineParams.m_windowSize         = self.m_windowSize
         
+        machineParams.m_preClassifier      = deepcopy(self.m_preClassifier)
+        machineParams.m_preRejectThreshold = self.m_preRejectThreshold
+        machineParams.m_preAcceptThreshold = self.m_preAcceptThreshold
+        
         return machineParams
+    
+    """
+    
+     This function TRAINs the classifier (and the pre-classifier) on the features 'x_array' with the labels 'y_array'.
+     
+    """
+    
+    def fit(self, x_array, y_array):
+        self.m_classifier.fit(x_array, y_array)
+        
+        if self.m_preClassifier is not None:
+            self.m_preClassifier.fit(x_array, y_array)
+            
+        return self
+    
+    """
+    
+     This function updates the classifier (and the pre-classifier) incrementally by the features 'x_array' with the labels 'y_array' 
+     (both require 'partial_fit(..)', e.g. GaussianNB, ValueError otherwise).
+     
+    """
+    
+    def partialFit(self, x_array, y_array, classes = np.array([0, 1])):
+        if not hasattr(self.m_classifier, 'partial_fit'):
+            raise ValueError("the classifier '{0}' does not support 'partial_fit'".format(self.m_classifier))
+        
+        if self.m_preClassifier is not None and not hasattr(self.m_preClassifier, 'partial_fit'):
+            raise ValueError("the pre-classifier '{0}' does not support 'partial_fit'".format(self.m_preClassifier))
+        
+        self.m_classifier.partial_fit(x_array, y_array, classes=classes)
+        
+        if self.m_preClassifier is not None:
+            self.m_preClassifier.partial_fit(x_array, y_array, classes=classes)
+            
+        return self
+    
+    """
+    
+     This function returns the predicted classes of the features 'x_array': if a pre-classifier is given, the classifier 
+     only predicts the pulses in the uncertain band of the pre-classifier (see 'DMachineParams').
+     
+    """
+    
+    def predict(self, x_array):
+        prediction, __ = self.predictWithProbability(x_array, self.m_preClassifier is None, False)
+        
+        return prediction
+    
+    """
+    
+     This function returns the predicted classes of the features 'x_array' (see 'predict(..)') and the probabilities of the class 
+     CORRECT (1) of the stage deciding on each pulse (see 'classifierPredictionWithProbability(..)'). 
+     
+     If 'classifierOnly' == 'True', the pre-classifier is ignored. The probabilities are not determined (None) if 'classifierOnly' == 'True' 
+     and 'probability' == 'False'.
+     
+    """
+    
+    def predictWithProbability(self, x_array, classifierOnly = False, probability = True):
+        x_array = np.asarray(x_array)
+        
+        if classifierOnly or self.m_preClassifier is None:
+            if classifierOnly and not probability:
+                return self.m_classifier.predict(x_array), None
+            
+            return classifierPredictionWithProbability(self.m_classifier, x_array)
+        
+        __, probabilityOfCorrect = classifierPredictionWithProbability(self.m_preClassifier, x_array)
+        
+        uncertain = (probabilityOfCorrect > self.m_preRejectThreshold) & (probabilityOfCorrect < self.m_preAcceptThreshold)
+        
+        prediction = np.where(probabilityOfCorrect >= self.m_preAcceptThreshold, 1, 0)
+        
+        if np.any(uncertain):
+            prediction[uncertain], probabilityOfCorrect[uncertain] = classifierPredictionWithProbability(self.m_classifier, x_array[uncertain])
+            
+        return prediction, probabilityOfCorrect
+    
+    """
+    
+     This function returns the prediction accuracy [0.0-1.0] of the machine (see 'predict(..)') for the features 'x_array' with the labels 'y_array'.
+     
+    """
+    
+    def score(self, x_array, y_array):
+        if self.m_preClassifier is None:
+            return self.m_classifier.score(x_array, y_array)
+        
+        return np.mean(self.predict(x_array) == y_array)
+        
+    """
+    
+     This function returns a copy of the machine whose classifier (and pre-classifier, if supported) is replaced by 
+     the compiled predictor (see 'compileClassifier(..)'). By default ('verify' == 'True'), each predictor is verified against 
+     sklearn on the features 'x_verify' or, if not given, on features drawn from its gaussian classes (ValueError on deviations).
+     
+    """
+    
+    def compile(self, x_verify = None, tolerance = 1e-6, verify = True):
+        machineParams = self.copy()
+        
+        machineParams.m_classifier = compileClassifier(self.m_classifier, x_verify, tolerance, verify)
         
+        # unsupported pre-classifiers are kept
+        if self.m_preClassifier is not None and isCompilableClassifier(self.m_preClassifier):
+            machineParams.m_preClassifier = compileClassifier(self.m_preClassifier, x_verify, tolerance, verify)
+            
+        return machineParams
+    
     def debug(self):
         print("---------------------------------------------------------------")
         print("ML classifier:         {0}".format(self.m_classifier))
+        print("ML pre-classifier:     {0}".format(self.m_preClassifier))
+        
+        if self.m_preClassifier is not None:
+            print("uncertain band:        ({0}, {1})".format(self.m_preRejectThreshold, self.m_preAcceptThreshold))
+            
         print("")
         print("baseline correction?:  {0}".format(self.m_correctForBaseline))
         print("region:                [{0}:{1}]".format(self.m_startCell, self.m_cellRegion))
@@ -134,6 +289,271 @@ class DMachineParams():
         print("window size:           {0}".format(self.m_windowSize))
         print("---------------------------------------------------------------")
         
+"""
+
+ This function returns the predicted classes of the features 'x_array' of the TRAINed classifier 'classifier' 
+ (class of the highest probability as 'predict(..)') and the probabilities of the class CORRECT (1). 
+ Classifiers without 'predict_proba(..)' return the probabilities 0.0/1.0 of their prediction.
+     
+"""
+
+def classifierPredictionWithProbability(classifier, x_array):
+    if not len(x_array):
+        return np.zeros(0, dtype=int), np.zeros(0)
+    
+    if not hasattr(classifier, 'predict_proba'):
+        prediction = classifier.predict(x_array)
+        
+        return prediction, (prediction == 1).astype(np.float64)
+    
+    probability = classifier.predict_proba(x_array)
+    
+    prediction = classifier.classes_[np.argmax(probability, axis=1)]
+    
+    if not 1 in classifier.classes_:
+        return prediction, np.zeros(len(x_array))
+    
+    return prediction, probability[:, list(classifier.classes_).index(1)].astype(np.float64)
+
+"""
+
+ This class is an array-backed (pure NumPy) predictor exported from a TRAINed GaussianNB or CalibratedClassifierCV(GaussianNB()) 
+ with isotonic or sigmoid calibration (see 'compileClassifier(..)'). It replaces the classifier in 'DMachineParams' (see 'DMachineParams.compile(..)') 
+ and provides 'predict(..)', 'predict_proba(..)' and 'score(..)' but cannot be TRAINed.
+ 
+ The joint log-likelihoods of the gaussian classes are quadratic in the features. Hence, the decision values of all (calibrated) 
+ classifiers follow from a single matrix product of [x², x] with 'm_weights' (the features are shifted by 'm_shift' for 
+ numerical accuracy). For two classes, each classifier requires a single column (log-likelihood ratio), whose probability 
+ (sigmoid) is mapped by the piecewise-linear (isotonic) or sigmoid calibration.
+ 
+"""
+
+class DCompiledClassifier():
+    m_classes      = np.array([0, 1])
+    m_shift        = np.zeros(0)
+    m_weights      = np.zeros((0, 0))
+    m_bias         = np.zeros(0)
+    
+    # calibration: '' (none), 'isotonic' or 'sigmoid'
+    m_method       = ''
+    m_calibrators  = []
+    
+    def __init__(self, classes = np.array([0, 1]), shift = np.zeros(0), weights = np.zeros((0, 0)), bias = np.zeros(0), method = '', calibrators = []):
+        self.m_classes     = np.asarray(classes)
+        self.m_shift       = np.asarray(shift, dtype=np.float64)
+        self.m_weights     = np.asarray(weights, dtype=np.float64)
+        self.m_bias        = np.asarray(bias, dtype=np.float64)
+        self.m_method      = method
+        self.m_calibrators = list(calibrators)
+        
+    @property
+    def classes_(self):
+        return self.m_classes
+    
+    """
+    
+     This function returns the decision values (joint log-likelihoods or log-likelihood ratios) of the features 'x_array'.
+     
+    """
+    
+    def decisionValues(self, x_array):
+        x_shifted = np.asarray(x_array, dtype=np.float64) - self.m_shift
+        
+        return np.concatenate((x_shifted*x_shifted, x_shifted), axis=1) @ self.m_weights + self.m_bias
+    
+    def predict_proba(self, x_array):
+        decision = self.decisionValues(x_array)
+        
+        if self.m_method == '':
+            if len(self.m_classes) == 2:
+                return np.column_stack((expit(-decision[:, 0]), expit(decision[:, 0])))
+            
+            return softmax(decision, axis=1)
+        
+        probabilityOfClass0 = np.zeros(len(decision))
+        probabilityOfClass1 = np.zeros(len(decision))
+        
+        for i, calibrator in enumerate(self.m_calibrators):
+            if self.m_method == 'isotonic':
+                calibrated = np.interp(expit(decision[:, i]), calibrator[0], calibrator[1])
+            else:
+                calibrated = expit(-(calibrator[0]*expit(decision[:, i]) + calibrator[1]))
+                
+            probabilityOfClass0 += 1.0 - calibrated
+            probabilityOfClass1 += calibrated
+            
+        probability = np.column_stack((probabilityOfClass0, probabilityOfClass1))/len(self.m_calibrators)
+        
+        probability[(1.0 < probability) & (probability <= 1.0 + 1e-5)] = 1.0
+        
+        return probability
+    
+    def predict(self, x_array):
+        if self.m_method == '':
+            decision = self.decisionValues(x_array)
+            
+            if len(self.m_classes) == 2:
+                return self.m_classes[(decision[:, 0] > 0.0).astype(int)]
+            
+            return self.m_classes[np.argmax(decision, axis=1)]
+        
+        return self.m_classes[np.argmax(self.predict_proba(x_array), axis=1)]
+    
+    def score(self, x_array, y_array):
+        return np.mean(self.predict(x_array) == y_array)
+    
+"""
+
+ This function returns the shift, the weights and the bias (see 'DCompiledClassifier') of the joint log-likelihoods of the 
+ TRAINed GaussianNB 'classifier' (one column per class).
+     
+"""
+
+def gaussianNBLogLikelihoodWeights(classifier, shift):
+    variance = classifier.var_ if hasattr(classifier, 'var_') else classifier.sigma_
+    
+    theta = classifier.theta_ - shift
+    
+    weights = np.concatenate((-0.5/variance, theta/variance), axis=1).T
+    bias    = np.log(classifier.class_prior_) - 0.5*np.sum(np.log(2.0*np.pi*variance), axis=1) - 0.5*np.sum(theta*theta/variance, axis=1)
+    
+    return weights, bias
+
+"""
+
+ This function returns the estimator of a calibrated classifier of CalibratedClassifierCV ('base_estimator' in older sklearn versions).
+     
+"""
+
+def calibratedEstimatorOf(calibrated):
+    return calibrated.estimator if hasattr(calibrated, 'estimator') else getattr(calibrated, 'base_estimator', None)
+
+"""
+
+ This function returns 'True' if the classifier 'classifier' is TRAINed and can be exported by 'compileClassifier(..)'.
+     
+"""
+
+def isCompilableClassifier(classifier):
+    if isinstance(classifier, GaussianNB):
+        return hasattr(classifier, 'theta_')
+    
+    if not isinstance(classifier, CalibratedClassifierCV) or not hasattr(classifier, 'calibrated_classifiers_'):
+        return False
+    
+    if classifier.method not in ('isotonic', 'sigmoid') or len(classifier.classes_) != 2:
+        return False
+    
+    return all(isinstance(calibratedEstimatorOf(calibrated), GaussianNB) and np.array_equal(calibratedEstimatorOf(calibrated).classes_, classifier.classes_) 
+               for calibrated in classifier.calibrated_classifiers_)
+
+"""
+
+ This function exports the TRAINed classifier 'classifier' as 'DCompiledClassifier'. Supported are GaussianNB (any number of classes) 
+ and CalibratedClassifierCV(GaussianNB()) with method 'isotonic' or 'sigmoid' (two classes).
+ 
+ If 'verify' == 'True' (default), the predictor is verified against the classifier on the features 'x_verify' or, if not given, 
+ on features drawn from the gaussian classes of the classifier (see 'verificationSamplesOf(..)') (see 'compiledClassifierDeviation(..)'): 
+ a ValueError is raised if any probability deviates by more than 'tolerance' or any prediction differs except for pulses whose 
+ class probabilities are equal within 'tolerance'.
+     
+"""
+
+def compileClassifier(classifier, x_verify = None, tolerance = 1e-6, verify = True):
+    if isinstance(classifier, DCompiledClassifier):
+        return classifier
+    
+    if not isCompilableClassifier(classifier):
+        raise ValueError("the classifier '{0}' is not TRAINed or not supported".format(classifier))
+    
+    if isinstance(classifier, GaussianNB):
+        shift = np.mean(classifier.theta_, axis=0)
+        
+        weights, bias = gaussianNBLogLikelihoodWeights(classifier, shift)
+        
+        if len(classifier.classes_) == 2:
+            weights, bias = weights[:, 1:] - weights[:, :1], bias[1:] - bias[:1]
+            
+        compiled = DCompiledClassifier(classifier.classes_, shift, weights, bias)
+    else:
+        estimators = [calibratedEstimatorOf(calibrated) for calibrated in classifier.calibrated_classifiers_]
+        
+        shift = np.mean([np.mean(estimator.theta_, axis=0) for estimator in estimators], axis=0)
+        
+        weights = []
+        bias    = []
+        
+        for estimator in estimators:
+            estimatorWeights, estimatorBias = gaussianNBLogLikelihoodWeights(estimator, shift)
+            
+            weights.append(estimatorWeights[:, 1] - estimatorWeights[:, 0])
+            bias.append(estimatorBias[1] - estimatorBias[0])
+            
+        if classifier.method == 'isotonic':
+            calibrators = [(calibrated.calibrators[0].X_thresholds_, calibrated.calibrators[0].y_thresholds_) for calibrated in classifier.calibrated_classifiers_]
+        else:
+            calibrators = [(calibrated.calibrators[0].a_, calibrated.calibrators[0].b_) for calibrated in classifier.calibrated_classifiers_]
+            
+        compiled = DCompiledClassifier(classifier.classes_, shift, np.column_stack(weights), np.array(bias), classifier.method, calibrators)
+        
+    if verify:
+        if x_verify is None:
+            x_verify = verificationSamplesOf(classifier)
+            
+        maxDeviation, agreement = compiledClassifierDeviation(classifier, compiled, x_verify, tolerance)
+        
+        if maxDeviation > tolerance or agreement < 1.0:
+            raise ValueError('the compiled classifier deviates from the classifier (max. deviation of probabilities: {0}, agreement of predictions: {1})'.format(maxDeviation, agreement))
+        
+    return compiled
+
+"""
+
+ This function returns 'numberOfSamples' features per class (and per calibrated classifier) drawn from the gaussian classes 
+ (mean 'theta_' and variance 'var_') of the TRAINed (calibrated) GaussianNB 'classifier' (see 'compileClassifier(..)').
+     
+"""
+
+def verificationSamplesOf(classifier, numberOfSamples = 250, seed = 0):
+    estimators = [classifier] if isinstance(classifier, GaussianNB) else [calibratedEstimatorOf(calibrated) for calibrated in classifier.calibrated_classifiers_]
+    
+    rng = np.random.default_rng(seed)
+    
+    samples = []
+    
+    for estimator in estimators:
+        variance = estimator.var_ if hasattr(estimator, 'var_') else estimator.sigma_
+        
+        for theta, sigma in zip(estimator.theta_, np.sqrt(variance)):
+            samples.append(rng.normal(theta, sigma, (numberOfSamples, len(theta))))
+            
+    return np.concatenate(samples)
+
+"""
+
+ This function returns the maximum deviation of the probabilities of the compiled classifier 'compiled' (see 'compileClassifier(..)') 
+ from those of the TRAINed classifier 'classifier' for the features 'x_array' and the fraction [0.0-1.0] of the same predictions. 
+ Pulses whose class probabilities are equal within 'tolerance' (ties) are not taken into account for the predictions.
+     
+"""
+
+def compiledClassifierDeviation(classifier, compiled, x_array, tolerance = 1e-6):
+    if not len(x_array):
+        return 0.0, 1.0
+    
+    probability         = classifier.predict_proba(x_array)
+    probabilityCompiled = compiled.predict_proba(x_array)
+    
+    maxDeviation = float(np.max(np.abs(probability - probabilityCompiled)))
+    
+    sortedProbability = np.sort(probability, axis=1)
+    
+    decided = (sortedProbability[:, -1] - sortedProbability[:, -2]) > tolerance
+    
+    agreement = float(np.mean(classifier.predict(x_array[decided]) == compiled.predict(x_array[decided]))) if np.any(decided) else 1.0
+    
+    return maxDeviation, agreement
+
 """
 
  This function reads the required information defined in the header (c-type struct) 
@@ -153,6 +573,13 @@ class DMachineParams():
     }
  
  Note: ONLY the number of 'sampling points' is required for the framework functionality. 
+ 
+ Depending on the 'version', the header is followed by:
+     
+     version 1: records of the time and voltage trace of each pulse,
+     version 2: the time axis (stored only once) and voltage-only records.
+     
+ Note: 'readPulse(..)' reads version 1 records only, use 'DPulseStreamReader' for both versions.
    
 """
 
@@ -172,1048 +599,2389 @@ def readHeader(file):
 
  This function reads the time [ns] and voltage [mV] traces of a single detector pulse in 
  a given pulse-stream file 'file'.
+ 
+ The traces are returned as 'dtype' (np.float64 or np.float32, the type stored in the pulse stream).
      
 """
 
-def readPulse(file, numberOfCells):
-    time = np.zeros(numberOfCells)
-    volt = np.zeros(numberOfCells)
-        
-    aborted   = False
-    resort    = False
-    priorTime = -1e10
+def readPulse(file, numberOfCells, dtype = np.float64):
+    byteChunk = file.read(4*numberOfCells)
     
-    for i in range (0, numberOfCells):
-        byteChunk = file.read(4)
-        
-        if not byteChunk:
-            aborted = True
-            break
-        
-        if (time[i] < priorTime):
-            resort = True
-            
-        time[i] = struct.unpack('f', byteChunk)[0]
-        priorTime = time[i]
-        
-    if aborted:
+    if len(byteChunk) < 4*numberOfCells:
         time = np.zeros(0)
+    else:
+        time = np.frombuffer(byteChunk, dtype='<f4').astype(dtype)
         
-    if resort:
-        time = np.sort(time)
-        
-    aborted = False
+        if np.any(np.diff(time) < 0.0):
+            time = np.sort(time)
              
-    for i in range (0, numberOfCells):
-        byteChunk = file.read(4)
-        
-        if not byteChunk:
-            aborted = True
-            break
-        
-        volt[i] = struct.unpack('f', byteChunk)[0]
-        
-    if aborted:
+    byteChunk = file.read(4*numberOfCells)
+    
+    if len(byteChunk) < 4*numberOfCells:
         volt = np.zeros(0)
+    else:
+        volt = np.frombuffer(byteChunk, dtype='<f4').astype(dtype)
         
     return time, volt
 
 """
 
- This function normalizes the pulse shape for TRAINing/TESTing and PREDICTING:
+ The header (c-type struct) of each pulse-stream file (see 'readHeader(..)') as NumPy structured data type. 
+ 
+"""
+
+pulseStreamHeaderDType = np.dtype([('version',            '<u4'),
+                                   ('__',                 '<u4'),
+                                   ('sweepInNanoseconds', '<f8'),
+                                   ('frequencyInGHz',     '<f8'),
+                                   ('numberOfCells',      '<i4'),
+                                   ('___',                '<u4')])
+
+"""
+
+ This function returns the NumPy structured data type of ONE record in a pulse-stream file:
      
- (1) by its integrated area over the entire time frame (number of cells) with respect to the zero baseline and then
- (2) by its absolute value of maximum/minimum amplitude that: max(amplitude) = 1.0. 
+ version 1:
+     
+ pairs = False: a single detector pulse  --> ('time', 'voltage')
+ pairs = True:  a pair of detector pulses --> ('timeA', 'voltageA', 'timeB', 'voltageB')
+ 
+ version 2 (shared time axis):
      
+ pairs = False: a single detector pulse  --> ('voltage')
+ pairs = True:  a pair of detector pulses --> ('voltageA', 'voltageB')
+ 
+ Each field holds 'numberOfCells' samples of type(float32).
+ 
 """
 
-def normalizeData(voltage, numberOfCells, polarity):
-    arg = 0
-    
-    valid = True
+def pulseRecordDType(numberOfCells, pairs = False, version = 1):
+    trace = ('<f4', (numberOfCells,))
     
-    if not polarity: #negative
-        arg = np.argmin(voltage)
-    else:            #positive
-        arg = np.argmax(voltage)
+    if version == 2:
+        if not pairs:
+            return np.dtype([('voltage', trace)])
         
-    minMaxValue = voltage[arg]
-    minMaxArg   = arg    
+        return np.dtype([('voltageA', trace), ('voltageB', trace)])
     
-    # safety region (may adjust this region for your purposes)
-    if minMaxArg < 0.02*numberOfCells or minMaxArg > 0.92*numberOfCells:
-        valid = False
-        
-        np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)), minMaxValue, minMaxArg, valid
-                   
-    voltage /= np.abs(sum(voltage))   
+    if not pairs:
+        return np.dtype([('time', trace), ('voltage', trace)])
     
-    if not polarity: #negative
-        arg = np.argmin(voltage)
-    else:            #positive
-        arg = np.argmax(voltage)
-        
-    if arg < 0 or arg >= numberOfCells:
-        valid = False
-        
-        return voltage, minMaxValue, minMaxArg, valid
+    return np.dtype([('timeA', trace), ('voltageA', trace), ('timeB', trace), ('voltageB', trace)])
+
+"""
+
+ The optional index trailer behind the last record of a pulse-stream file (see the C++ API: DPulseStreamIndexEntry/DPulseStreamIndexFooter) 
+ as NumPy structured data types:
+     
+ [header][..records..][entry 0][entry 1]..[entry N-1][footer (48 bytes)]
+ 
+ Each entry summarizes a block of consecutive records for detector [0] (A) and [1] (B) by the min./max. voltage, 
+ the min./max. of the amplitude bound max(0, max. sample) - min(0, min. sample) and the baseline mean.
+ 
+"""
+
+pulseStreamIndexEntryDType  = np.dtype([('offsetInBytes',          '<u8'),
+                                        ('numberOfRecords',        '<u8'),
+                                        ('minVoltage',             '<f4', (2,)),
+                                        ('maxVoltage',             '<f4', (2,)),
+                                        ('minAmplitude',           '<f4', (2,)),
+                                        ('maxAmplitude',           '<f4', (2,)),
+                                        ('baselineMean',           '<f4', (2,))])
+
+pulseStreamIndexFooterDType = np.dtype([('magic',                  '<u4'),
+                                        ('version',                '<u4'),
+                                        ('numberOfRecords',        '<u8'),
+                                        ('numberOfBlocks',         '<u8'),
+                                        ('recordsPerBlock',        '<u8'),
+                                        ('trailerSizeInBytes',     '<u8'),
+                                        ('pairs',                  '<u4'),
+                                        ('numberOfBaselinePoints', '<u4')])
+
+pulseStreamIndexMagic = 0x49535044 # 'DPSI'
+
+"""
+
+ This function reads the index trailer of the pulse-stream file 'fileName' (if any), whose records start at 'dataOffset'. 
+ 
+ return: 
+     
+     (1) footer and (2) entries (see 'pulseStreamIndexEntryDType') or None, None if the file has no (valid) index trailer.
+     
+"""
+
+def readIndexTrailer(fileName, dataOffset = 32):
+    fileSize = os.path.getsize(fileName)
     
-    if voltage[arg] == 0.0: # prevent by zero division
-        valid = False
-        
-        return voltage, 0.0, minMaxArg, valid
+    if fileSize - dataOffset < pulseStreamIndexFooterDType.itemsize:
+        return None, None
     
-    voltage /= voltage[arg]
+    footer = np.fromfile(fileName, dtype=pulseStreamIndexFooterDType, count=1, offset=fileSize - pulseStreamIndexFooterDType.itemsize)
     
-    return np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)), minMaxValue, minMaxArg, valid
+    if not len(footer) or not int(footer['magic'][0]) == pulseStreamIndexMagic or not int(footer['version'][0]) == 1:
+        return None, None
+    
+    footer = footer[0]
+    
+    numberOfBlocks = int(footer['numberOfBlocks'])
+    trailerSize    = int(footer['trailerSizeInBytes'])
+    
+    if not trailerSize == numberOfBlocks*pulseStreamIndexEntryDType.itemsize + pulseStreamIndexFooterDType.itemsize or fileSize - trailerSize < dataOffset:
+        return None, None
+    
+    entries = np.fromfile(fileName, dtype=pulseStreamIndexEntryDType, count=numberOfBlocks, offset=fileSize - trailerSize)
+    
+    return footer, entries
 
 """
 
- This function calculates the time difference, i.e. the lifetime between two detector pulses using the constant fraction (CF) principle.
+ This class maps a pulse-stream file into memory (np.memmap) as an array of fixed-size pulse records 
+ (see 'pulseRecordDType(..)') behind the 32 bytes header (see 'readHeader(..)').
+ 
+ Blocks of pulses are returned as 2D arrays (float32) of shape (number of pulses, number of cells) without 
+ any per-sample work in python. An incomplete record at the end of the stream is ignored.
+ 
+ Version 2 streams store the time axis only once behind the header. The time traces of a block are then returned 
+ as read-only views of the shared time axis (np.broadcast_to), which is sorted only once.
+ 
+ If the file has an index trailer (see 'readIndexTrailer(..)'), the trailer is excluded from the records and 
+ provided by 'm_indexFooter' and 'm_indexEntries' (otherwise None).
  
 """
 
-def calcLifetime(xStart                  = [], 
-                 yStart                  = [], 
-                 xStop                   = [], 
-                 yStop                   = [],
-                 cfd_level_start         = 25.0,
-                 cfd_level_stop          = 25.0,
-                 amplitudeStart          = 0.0,
-                 amplitudeStop           = 0.0,
-                 isPositivePolarity      = False,
-                 cubicSpline             = True,
-                 cubicSplineRenderPoints = 200):
-    timeStart = 0.0
-    timeStop  = 0.0
-    
-    cfdVoltageStart = cfd_level_start*0.01*amplitudeStart
-    cfdVoltageStop  = cfd_level_stop *0.01*amplitudeStop
+class DPulseStreamReader():
+    def __init__(self, fileName = '/pulseStream', pairs = False):
+        header = np.fromfile(fileName, dtype=pulseStreamHeaderDType, count=1)
         
-    rejectStart = True
-    rejectStop  = True
-    
-    # using cubic spline interpolation?
-    if cubicSpline:
-        #negative polarity
-        if not isPositivePolarity: 
-            argStart = np.argmin(yStart)  
-            argStop  = np.argmin(yStop)  
-            
-            # start branch
-            index = -1
+        if not len(header):
+            raise IOError("'{0}' does not contain a pulse-stream header.".format(fileName))
+        
+        self.m_fileName           = fileName
+        self.m_pairs              = pairs
+        
+        self.m_version            = int(header['version'][0])
+        self.m_sweepInNanoseconds = float(header['sweepInNanoseconds'][0])
+        self.m_frequencyInGHz     = float(header['frequencyInGHz'][0])
+        self.m_numberOfCells      = int(header['numberOfCells'][0])
+        
+        if self.m_version > 2:
+            raise IOError("'{0}': unsupported pulse-stream version {1}.".format(fileName, self.m_version))
             
-            for i in range(argStart, 0, -1):
-                if yStart[i] <= cfdVoltageStart and yStart[i-1] >= cfdVoltageStart:
-                    index = i
-                    break
+        self.m_recordDType        = pulseRecordDType(self.m_numberOfCells, pairs, self.m_version)
+        self.m_headerBytes        = pulseStreamHeaderDType.itemsize
+        self.m_timeAxis           = None
+        
+        # version 2: the shared time axis follows the header
+        if self.m_version == 2:
+            self.m_timeAxis = np.fromfile(fileName, dtype='<f4', count=self.m_numberOfCells, offset=self.m_headerBytes)
             
-            if not index <= 2:
-                xRenderPoints = np.zeros(cubicSplineRenderPoints)
-                yCubicValues  = np.zeros(cubicSplineRenderPoints)
-                
-                time_lower = xStart[index-1]
-                time_upper = xStart[index]
-                
-                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
+            if len(self.m_timeAxis) < self.m_numberOfCells:
+                raise IOError("'{0}' does not contain the time axis.".format(fileName))
                 
-                spline = CubicSpline(xStart, yStart)
-                
-                for cubic in range(0, cubicSplineRenderPoints):
-                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
-                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
-                    
-                for i in range(cubicSplineRenderPoints-1, 0, -1):
-                    if yCubicValues[i] <= cfdVoltageStart and yCubicValues[i-1] >= cfdVoltageStart:
-                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
-                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
-                        
-                        if slope >= 0 or i <= 2:
-                            break
-                            
-                        timeStart   = (cfdVoltageStart - intercept)/slope
-                        rejectStart = False
+            self.m_timeAxis     = sortTimeTraces(self.m_timeAxis.reshape(1, -1))[0]
+            self.m_headerBytes += self.m_timeAxis.nbytes
             
-            # stop branch
-            index = -1
-            
-            for i in range(argStop, 0, -1):
-                if yStop[i] <= cfdVoltageStop and yStop[i-1] >= cfdVoltageStop:
-                    index = i
-                    break
-            
-            if not index <= 2:
-                xRenderPoints = np.zeros(cubicSplineRenderPoints)
-                yCubicValues  = np.zeros(cubicSplineRenderPoints)
-                
-                time_lower = xStop[index-1]
-                time_upper = xStop[index]
-                
-                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
-                   
-                spline = CubicSpline(xStop, yStop)
-                
-                for cubic in range(0, cubicSplineRenderPoints):
-                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
-                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
-                    
-                for i in range(cubicSplineRenderPoints-1, 0, -1):
-                    if yCubicValues[i] <= cfdVoltageStop and yCubicValues[i-1] >= cfdVoltageStop:
-                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
-                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
-                        
-                        if slope >= 0 or i <= 2:
-                            break
-                            
-                        timeStop   = (cfdVoltageStop - intercept)/slope
-                        rejectStop = False
-           
-        #positive polarity         
+        self.m_lastFileSize = self.m_headerBytes # nothing has been polled yet (see 'refresh(..)')
+        
+        self.m_indexFooter, self.m_indexEntries = readIndexTrailer(fileName, self.m_headerBytes)
+        
+        numberOfRecords = self.recordsInFile()
+        
+        if numberOfRecords > 0:
+            self.m_records = np.memmap(fileName, dtype=self.m_recordDType, mode='r', offset=self.m_headerBytes, shape=(numberOfRecords,))
         else:
-            argStart = np.argmax(yStart)  
-            argStop  = np.argmax(yStop)  
+            self.m_records = np.zeros(0, dtype=self.m_recordDType)
             
-            # start branch
-            index = -1
-            
-            for i in range(argStart, 0, -1):
-                if yStart[i] >= cfdVoltageStart and yStart[i-1] <= cfdVoltageStart:
-                    index = i
-                    break
+    def __len__(self):
+        return self.numberOfPulses()
+    
+    """
+    
+     This function maps the pulses appended to a growing pulse-stream file since the last call (only complete records). 
+     
+     The index trailer is appended by a single write() when the file is closed. A partially written trailer fails the 
+     magic check (see 'readIndexTrailer(..)') and would be mapped as records. If 'stableOnly' is True, only the records, 
+     which were already in the file at the last call, are counted until the trailer is complete.
+     
+     return: 
+         
+         (1) number of pulses.
+         
+    """
+    
+    def refresh(self, stableOnly = False):
+        # a closed pulse stream (index trailer) doesn't grow anymore
+        if self.m_indexFooter is not None:
+            return self.numberOfPulses()
+        
+        fileSize = os.path.getsize(self.m_fileName)
+        
+        self.m_indexFooter, self.m_indexEntries = readIndexTrailer(self.m_fileName, self.m_headerBytes)
+        
+        numberOfRecords = self.recordsInFile()
+        
+        if numberOfRecords > len(self.m_records):
+            self.m_records = np.memmap(self.m_fileName, dtype=self.m_recordDType, mode='r', offset=self.m_headerBytes, shape=(numberOfRecords,))
+        elif numberOfRecords < len(self.m_records): # the tail mapped before was a partially written trailer
+            self.m_records = self.m_records[:numberOfRecords]
             
-            if not index <= 2:
-                xRenderPoints = np.zeros(cubicSplineRenderPoints)
-                yCubicValues  = np.zeros(cubicSplineRenderPoints)
-                
-                time_lower = xStart[index-1]
-                time_upper = xStart[index]
-                
-                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
-                
-                spline = CubicSpline(xStart, yStart)
-                
-                for cubic in range(0, cubicSplineRenderPoints):
-                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
-                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
-                
-                for i in range(cubicSplineRenderPoints-1, 0, -1):
-                    if yCubicValues[i] >= cfdVoltageStart and yCubicValues[i-1] <= cfdVoltageStart:
-                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
-                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
-                        
-                        if slope <= 0 or i <= 2:
-                            break
-                            
-                        timeStart   = (cfdVoltageStart - intercept)/slope
-                        rejectStart = False
+        stableSize          = min(fileSize, self.m_lastFileSize)
+        self.m_lastFileSize = fileSize
+        
+        if stableOnly and self.m_indexFooter is None:
+            return min(self.numberOfPulses(), max(0, (stableSize - self.m_headerBytes)//self.m_recordDType.itemsize))
+        
+        return self.numberOfPulses()
+    
+    def numberOfPulses(self):
+        return len(self.m_records)
+    
+    def recordsInFile(self):
+        dataBytes = os.path.getsize(self.m_fileName) - self.m_headerBytes
+        
+        if self.m_indexFooter is not None:
+            dataBytes -= int(self.m_indexFooter['trailerSizeInBytes'])
             
-            # stop branch
-            index = -1
+        return max(0, dataBytes//self.m_recordDType.itemsize)
+    
+    def hasIndexTrailer(self):
+        return self.m_indexFooter is not None
+    
+    def recordBytes(self):
+        return self.m_recordDType.itemsize
+    
+    """
+    
+     This function returns the pulses [start:start+count] as 2D arrays (float32): 
+         
+     pairs = False: time, voltage
+     pairs = True:  timeA, voltageA, timeB, voltageB
+     
+     If 'count' == -1 (default), all pulses from 'start' until the end of the stream are returned.
+     
+    """
+    
+    def readBlock(self, start = 0, count = -1):
+        stop = self.numberOfPulses() if count == -1 else min(start + count, self.numberOfPulses())
+        
+        return self.tracesOfRecords(self.m_records[start:stop])
+    
+    """
+    
+     This function returns the pulses at the positions 'indexes' (ascending order recommended) in the same way as 
+     'readBlock(..)'. Only the records of the given pulses are read (random access).
+     
+    """
+    
+    def readPulses(self, indexes):
+        return self.tracesOfRecords(self.m_records[np.asarray(indexes, dtype=np.int64)])
+    
+    def tracesOfRecords(self, records):
+        if self.m_timeAxis is not None:
+            time = np.broadcast_to(self.m_timeAxis, (len(records), self.m_numberOfCells))
             
-            for i in range(argStop, 0, -1):
-                if yStop[i] >= cfdVoltageStop and yStop[i-1] <= cfdVoltageStop:
-                    index = i
-                    break
+            if not self.m_pairs:
+                return time, np.array(records['voltage'])
             
-            if not index <= 2:
-                xRenderPoints = np.zeros(cubicSplineRenderPoints)
-                yCubicValues  = np.zeros(cubicSplineRenderPoints)
-                
-                time_lower = xStop[index-1]
-                time_upper = xStop[index]
-                
-                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
-                
-                spline = CubicSpline(xStop, yStop)
-                
-                for cubic in range(0, cubicSplineRenderPoints):
-                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
-                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
-                
-                for i in range(cubicSplineRenderPoints-1, 0, -1):
-                    if yCubicValues[i] >= cfdVoltageStop and yCubicValues[i-1] <= cfdVoltageStop:
-                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
-                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
-                        
-                        if slope <= 0 or i <= 2:
-                            break
-                            
-                        timeStop   = (cfdVoltageStop - intercept)/slope
-                        rejectStop = False
+            return time, np.array(records['voltageA']), time, np.array(records['voltageB'])
+        
+        if not self.m_pairs:
+            return sortTimeTraces(np.array(records['time'])), np.array(records['voltage'])
+        
+        return sortTimeTraces(np.array(records['timeA'])), np.array(records['voltageA']), sortTimeTraces(np.array(records['timeB'])), np.array(records['voltageB'])
     
-    # linear interpolation                 
-    else:
-        #negative polarity
-        if not isPositivePolarity: 
-            argStart = np.argmin(yStart)  
-            argStop  = np.argmin(yStop)  
-            
-            for i in range(argStart, 0, -1):
-                if yStart[i] <= cfdVoltageStart and yStart[i-1] >= cfdVoltageStart:
-                    slope     = (yStart[i-1]-yStart[i])/(xStart[i-1]-xStart[i])
-                    intercept = yStart[i] - slope*xStart[i]
-                    
-                    if slope >= 0 or i <= 2:
-                        break
-                        
-                    timeStart   = (cfdVoltageStart - intercept)/slope
-                    rejectStart = False       
-                                            
-            for i in range(argStop, 0, -1):
-                if yStop[i] <= cfdVoltageStop and yStop[i-1] >= cfdVoltageStop:
-                    slope     = (yStop[i-1]-yStop[i])/(xStop[i-1]-xStop[i])
-                    intercept = yStop[i] - slope*xStop[i]
-                    
-                    if slope >= 0 or i <= 2:
-                        break
-                    
-                    timeStop   = (cfdVoltageStop - intercept)/slope
-                    rejectStop = False
-        #positive polarity
-        else:            
-            argStart = np.argmax(yStart)  
-            argStop  = np.argmax(yStop)  
-            
-            for i in range(argStart, 0, -1):
-                if yStart[i] >= cfdVoltageStart and yStart[i-1] <= cfdVoltageStart:
-                    slope     = (yStart[i-1]-yStart[i])/(xStart[i-1]-xStart[i])
-                    intercept = yStart[i] - slope*xStart[i]
-                    
-                    if slope <= 0 or i <= 2:
-                        break
-                    
-                    timeStart   = (cfdVoltageStart - intercept)/slope
-                    rejectStart = False
-                                
-            for i in range(argStop, 0, -1):
-                if yStop[i] >= cfdVoltageStop and yStop[i-1] <= cfdVoltageStop:
-                    slope     = (yStop[i-1]-yStop[i])/(xStop[i-1]-xStop[i])
-                    intercept = yStop[i] - slope*xStop[i]
-                    
-                    if slope <= 0 or i <= 2:
-                        break
-                    
-                    timeStop   = (cfdVoltageStop - intercept)/slope
-                    rejectStop = False
-                           
-    return 1000.0*(timeStop - timeStart), (rejectStart or rejectStop)
+    def close(self):
+        self.m_records = np.zeros(0, dtype=self.m_recordDType) # releases the memory map
 
 """
 
- This function can be used to TRAIN and TEST a machine's classifier from only ONE data set of streamed 
- pulses 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
-
- If 'splitAfterNPulses' == -1 (default), the pulses in the respective 
- pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses' are splitted after 50% 
- of pulses read and used for the TRAINing process. The remaining 50% of streamed pulses are 
- considered for TESTing the TRAINed machine's classifier.
+ This function sorts each time trace of the 2D array 'time' (in place) which is not in ascending order (see 'readPulse(..)').
  
- return: 
+"""
+
+def sortTimeTraces(time):
+    unsorted = np.any(time[:, 1:] < time[:, :-1], axis=1)
+    
+    if np.any(unsorted):
+        time[unsorted] = np.sort(time[unsorted], axis=1)
+        
+    return time
+
+"""
+
+ A pulse stream might be split into segment files (see the C++ API: DPulseStreamManager::enableSegmentRotation(..)), 
+ which are listed in order by a manifest (text file):
      
-     (1) DMachineParams() from the learned machine and 
-     (2) the prediction accuracy [0.0-1.0].
+ # DPulseStream manifest 1
+ # segment	records	bytes
+ <segment file name (relative to the manifest)>	<number of records>	<size in bytes>
+ ...
  
 """
 
-def splitTrainAndTest(fileNameCorrectPulses = '/correct', 
-                      fileNameRejectPulses  = '/reject',  
-                      isPositivePolarity    = False,
-                      splitAfterNPulses     = -1,
-                      machineInput          = DMachineParams()):
-    mlInput = machineInput.copy()
-    
-    fileSizeTrue  = os.path.getsize(fileNameCorrectPulses)
-    fileSizeFalse = os.path.getsize(fileNameRejectPulses)
-    
-    # train data
-    x_array_train   = []
-    y_array_train   = []
-    
-    # test data
-    x_array_test    = []
-    y_array_test    = []
-    
-    readBytes       = 32 #header offset
+pulseStreamManifestMagic = '# DPulseStream manifest'
+
+def isPulseStreamManifest(fileName = '/pulseStream'):
+    with open(fileName, 'rb') as file:
+        return file.read(len(pulseStreamManifestMagic)) == pulseStreamManifestMagic.encode('ascii')
     
-    numberOfPulses_train = 0
-    numberOfPulses_test  = 0
+"""
+
+ This function reads the manifest 'fileName' (see 'isPulseStreamManifest(..)').
+ 
+ return: 
+     
+     (1) list of segments (file name, number of records, size in bytes).
+     
+"""
+
+def readPulseStreamManifest(fileName = '/pulseStream'):
+    directory = os.path.dirname(os.path.abspath(fileName))
     
-    # (1) REJECT pulses:
-    with open(fileNameRejectPulses, "rb") as streamFile:
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
-        
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeFalse - readBytes)/pulseBytes
-        
-        if not (numberOfPulses%2): # even
-            numberOfPulses_train = numberOfPulses/2
-        else: # odd
-            numberOfPulses_train = (numberOfPulses-1)/2
-                                   
-        numberOfPulses_test = numberOfPulses_train
-                         
-        if not splitAfterNPulses == -1:
-            numberOfPulses_train = splitAfterNPulses
-            numberOfPulses_test  = numberOfPulses_train
-        
-        pulseCounter = 0
+    segments = []
     
-        while True:
-            __, pulse = readPulse(streamFile, numberOfCells)
-                
-            if not len(pulse):
-                break
-            
-            # apply median filter?:
-            if mlInput.m_medianFilter:
-                pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-            # correct for baseline?:
-            if mlInput.m_correctForBaseline:
-                stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                mean = 0.0
-                    
-                if np.abs(stddev_pre) < np.abs(stddev_post):
-                    mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                else:
-                    mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                           
-                pulse -= mean
-                    
-            readBytes += pulseBytes
+    with open(fileName, 'r') as file:
+        for line in file:
+            line = line.rstrip('\r\n')
             
-            # normalize pulse data
-            voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-                
-            if not valid:
+            if not line or line.startswith('#'):
                 continue
             
-            pulseCounter += 1
-                
-            if pulseCounter <= numberOfPulses_train:
-                x_array_train.append(voltage_norm)
-                y_array_train.append(0) # << FALSE (0) means 'bad' pulses (REJECT)
-            elif pulseCounter > numberOfPulses_train and pulseCounter <= numberOfPulses_train + numberOfPulses_test:
-                x_array_test.append(voltage_norm)
-                y_array_test.append(0) # << FALSE (0) means 'bad' pulses (REJECT)
-            else:
-                break
-                
-        streamFile.close()
-        
-    readBytes = 32 #header offset
-    
-    # (2) CORRECT pulses:
-    with open(fileNameCorrectPulses, "rb") as streamFile:
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
-        
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeTrue - readBytes)/pulseBytes
-        
-        if not (numberOfPulses%2): # even
-            numberOfPulses_train = numberOfPulses/2
-        else: # odd
-            numberOfPulses_train = (numberOfPulses-1)/2
-                                   
-        numberOfPulses_test = numberOfPulses_train
-                         
-        if not splitAfterNPulses == -1:
-            numberOfPulses_train = splitAfterNPulses
-            numberOfPulses_test  = numberOfPulses_train
-        
-        pulseCounter = 0
-          
-        while True:
-            __, pulse = readPulse(streamFile, numberOfCells)
-                
-            if not len(pulse):
-                break
-                
-            # apply median filter?:
-            if mlInput.m_medianFilter:
-                pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-            # correct for baseline?:
-            if mlInput.m_correctForBaseline:
-                stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                mean = 0.0
-                    
-                if np.abs(stddev_pre) < np.abs(stddev_post):
-                    mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                else:
-                    mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                           
-                pulse -= mean
-                    
-            readBytes += pulseBytes
-                
-            # normalize pulse data
-            voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-                
-            if not valid:
-                continue
-                
-            pulseCounter += 1
-                
-            if pulseCounter <= numberOfPulses_train:
-                x_array_train.append(voltage_norm)
-                y_array_train.append(1) # << TRUE (1) means 'good' pulses (CORRECT)
-            elif pulseCounter > numberOfPulses_train and pulseCounter <= numberOfPulses_train + numberOfPulses_test:
-                x_array_test.append(voltage_norm)
-                y_array_test.append(1) # << TRUE (1) means 'good' pulses (CORRECT)
-            else:
-                break
+            fields = line.split('\t')
+            
+            if not len(fields) == 3:
+                raise IOError("'{0}': invalid manifest entry '{1}'.".format(fileName, line))
                 
-        streamFile.close()
-                   
-    mlInput.m_classifier.fit(x_array_train, y_array_train)
-        
-    x_array_train.clear()
-    y_array_train.clear()
-    
-    return mlInput.m_classifier.score(x_array_test, y_array_test), mlInput
-      
+            segments.append((os.path.join(directory, fields[0]), int(fields[1]), int(fields[2])))
+            
+    return segments
+
 """
 
- This function determines the prediction accuracy of a TRAINed machine's classifier 'machineInput' by TESTing
- a different set of pulse streams containing correct and wrong pulses 'fileNameCorrectPulses' and 'fileNameRejectPulses' 
- repectively.
- 
- If 'splitAfterNPulses' == -1 (default), the entire number of pulses from the given pulse streams 
- 'fileNameCorrectPulses' and 'fileNameRejectPulses' are used for TESTing. Otherwise, the set number 
- 'splitAfterNPulses' is considered for both pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
+ This function expands the pulse stream(s) 'fileNames' into a list of pulse-stream files, where 'fileNames' might be:
+     
+     (1) a single pulse-stream file,
+     (2) a manifest of segment files (see 'readPulseStreamManifest(..)'),
+     (3) a glob pattern (e.g. '/run/A_true_*.drs4DataStream'), whose matches are sorted by name or 
+     (4) a list of (1)-(3) in the order of the pulse sequence.
  
  return: 
      
-     (1) prediction accuracy [0.0-1.0].
+     (1) list of (file name, number of records, size in bytes), where the number of records and the size 
+         is -1 (unknown) for files not listed by a manifest.
      
 """
 
-def predictPulses(fileNameCorrectPulses = '/correct', 
-                  fileNameRejectPulses  = '/reject', 
-                  isPositivePolarity    = False,
-                  splitAfterNPulses     = -1,
-                  machineInput          = DMachineParams(),
-                  debug                 = True):
-    mlInput = machineInput.copy()
+def expandPulseStreamFileNames(fileNames = '/pulseStream'):
+    if isinstance(fileNames, (list, tuple)):
+        return [entry for fileName in fileNames for entry in expandPulseStreamFileNames(fileName)]
     
-    fileSizeTrue  = os.path.getsize(fileNameCorrectPulses)
-    fileSizeFalse = os.path.getsize(fileNameRejectPulses)
-    
-    readBytes = 32 #header offset
+    # an existing file is never a pattern (e.g. 'run[1].drs4DataStream')
+    if os.path.isfile(fileNames):
+        if isPulseStreamManifest(fileNames):
+            return readPulseStreamManifest(fileNames)
+        
+        return [(fileNames, -1, -1)]
     
-    x_array = []
-    y_array = []
+    if glob.has_magic(fileNames):
+        return [entry for fileName in sorted(glob.glob(fileNames)) for entry in expandPulseStreamFileNames(fileName)]
     
-    # (1) REJECT pulses:
-    with open(fileNameRejectPulses, "rb") as streamFile:
-        if debug:
-            print("(1) >> teach machine with REJECT pulses:\n")
-            
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
-        
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeFalse - readBytes)/pulseBytes
-        
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}'.format(frequencyInGHz))
-            print('number of pulses: {0}\n'.format(numberOfPulses))
-        
-        pulseCounter = 0
+    return [(fileNames, -1, -1)]
+
+"""
+
+ This class provides several pulse-stream files (see 'expandPulseStreamFileNames(..)') as ONE indexed pulse sequence 
+ with the interface of 'DPulseStreamReader'. 
+ 
+ The headers of all files are checked for compatibility (version, sweep, frequency and number of cells, see 'readHeader(..)') 
+ and the number of records of each file is derived from its size. Files listed by a manifest must be complete. 
+ 
+ The files are opened (mapped) lazily on the first read of one of their pulses. Blocks crossing the border of two files 
+ are concatenated.
+ 
+ usage:
+     
+     dataset = DPulseStreamDataset(['/run1/A_true.drs4DataStream', '/run2/A_true_*.drs4DataStream'])
+     
+     time, voltage = dataset.readBlock(start, count)
+ 
+"""
+
+class DPulseStreamDataset():
+    def __init__(self, fileNames = '/pulseStream', pairs = False):
+        self.m_fileName        = fileNames
+        self.m_pairs           = pairs
+        self.m_fileNames       = []
+        self.m_numberOfRecords = []
+        self.m_indexTrailers   = []
         
-        while True:
-            __, pulse = readPulse(streamFile, numberOfCells)
+        for fileName, numberOfRecords, sizeInBytes in expandPulseStreamFileNames(fileNames):
+            with open(fileName, 'rb') as file:
+                version = struct.unpack('<I', file.read(4))[0]
                 
-            if not len(pulse) or (splitAfterNPulses > -1 and pulseCounter > splitAfterNPulses):
-                break
+                file.seek(0)
                 
-            # apply median filter?:
-            if mlInput.m_medianFilter:
-                pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-            # correct for baseline?:
-            if mlInput.m_correctForBaseline:
-                stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                mean = 0.0
-                    
-                if np.abs(stddev_pre) < np.abs(stddev_post):
-                    mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                else:
-                    mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                           
-                pulse -= mean
+                numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(file)
+                
+            if self.m_fileNames and not (version, sweepInNanoseconds, frequencyInGHz, numberOfCells) == (self.m_version, self.m_sweepInNanoseconds, self.m_frequencyInGHz, self.m_numberOfCells):
+                raise IOError("'{0}': the header differs from the header of '{1}'.".format(fileName, self.m_fileNames[0]))
+                
+            if not self.m_fileNames:
+                if version > 2:
+                    raise IOError("'{0}': unsupported pulse-stream version {1}.".format(fileName, version))
                     
-            readBytes += pulseBytes
-            
-            # normalize pulse data
-            voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
+                self.m_version            = version
+                self.m_sweepInNanoseconds = sweepInNanoseconds
+                self.m_frequencyInGHz     = frequencyInGHz
+                self.m_numberOfCells      = numberOfCells
+                self.m_recordDType        = pulseRecordDType(numberOfCells, pairs, version)
+                self.m_headerBytes        = pulseStreamHeaderDType.itemsize + (4*numberOfCells if version == 2 else 0)
                 
-            if not valid:
-                continue
+            fileSize = os.path.getsize(fileName)
+            
+            if sizeInBytes >= 0 and not fileSize == sizeInBytes:
+                raise IOError("'{0}' is incomplete.".format(fileName))
                 
-            pulseCounter += 1
+            footer, __ = readIndexTrailer(fileName, self.m_headerBytes)
             
-            if debug:
-                sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeFalse/1024)/1000, (readBytes-32)/pulseBytes, numberOfPulses))
-             
-            x_array.append(voltage_norm)
-            y_array.append(0) # << FALSE (0) means bad pulses (REJECT)
+            dataBytes = fileSize - self.m_headerBytes - (0 if footer is None else int(footer['trailerSizeInBytes']))
+            
+            if numberOfRecords >= 0 and not max(0, dataBytes//self.recordBytes()) == numberOfRecords:
+                raise IOError("'{0}' does not contain {1} records.".format(fileName, numberOfRecords))
                 
-        streamFile.close()
-        
-    readBytes = 32 #header offset
-    
-    # (2) CORRECT pulses:
-    with open(fileNameCorrectPulses, "rb") as streamFile:
-        if debug:
-            print("(2) >> teach machine with CORRECT pulses:\n")
+            self.m_fileNames.append(fileName)
+            self.m_numberOfRecords.append(max(0, dataBytes//self.recordBytes()))
+            self.m_indexTrailers.append(footer is not None)
             
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
-        
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeTrue - readBytes)/pulseBytes
+        if not self.m_fileNames:
+            raise IOError("'{0}' does not match any pulse-stream file.".format(fileNames))
+            
+        # the index trailers are provided by the readers of the files (see 'reader(..)')
+        self.m_indexFooter  = None
+        self.m_indexEntries = None
         
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}'.format(frequencyInGHz))
-            print('number of pulses: {0}\n'.format(numberOfPulses))
+        # index of the first pulse of each file
+        self.m_firstPulses  = np.cumsum([0] + self.m_numberOfRecords)
         
-        pulseCounter = 0
+        # opened lazily (see 'reader(..)')
+        self.m_readers      = [None]*len(self.m_fileNames)
         
-        while True:
-            __, pulse = readPulse(streamFile, numberOfCells)
-                
-            if not len(pulse) or (splitAfterNPulses > -1 and pulseCounter > splitAfterNPulses):
-                break
-                
-            # apply median filter?:
-            if mlInput.m_medianFilter:
-                pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-            # correct for baseline?:
-            if mlInput.m_correctForBaseline:
-                stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                mean = 0.0
-                    
-                if np.abs(stddev_pre) < np.abs(stddev_post):
-                    mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                else:
-                    mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                           
-                pulse -= mean
-                    
-            readBytes += pulseBytes
-            
-            # normalize pulse data
-            voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-                
-            if not valid:
-                continue
-            
-            pulseCounter += 1
-            
-            if debug:
-                sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeTrue/1024)/1000, (readBytes-32)/pulseBytes, numberOfPulses))
-             
-            x_array.append(voltage_norm)
-            y_array.append(1) # << TRUE (1) means good pulses (CORRECT)
-                
-        streamFile.close()
-        
-    score = mlInput.m_classifier.score(x_array, y_array)
+    def __len__(self):
+        return self.numberOfPulses()
     
-    if debug:
-        sys.stdout.write('\nscore: {0}%'.format(score*100.0))
+    def numberOfPulses(self):
+        return int(self.m_firstPulses[-1])
     
-    return score
-
-"""
-
- This function TRAINs the machine's classifier from the pulse streams containing the correct and wrong pulses 
- 'fileNameCorrectPulses' and 'fileNameRejectPulses', respectively.
- 
- If 'splitAfterNPulsesX' == -1 (default), the entire number of pulses from the given pulse streams 
- 'fileNameCorrectPulses' and 'fileNameRejectPulses' are used for TRAINing. Otherwise, the set number 
- 'splitAfterNPulsesX' is considered for both 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
- 
- If 'outputMachineFileName' == '', the TRAINed machine isn't stored in a file (*joblib). 
- 
- return: 
-     
-     (1) TRAINed machine (DMachineParams()).
-     
-"""
+    def numberOfFiles(self):
+        return len(self.m_fileNames)
     
-def trainPulses(fileNameCorrectPulses    = '/correct', 
-                fileNameRejectPulses     = '/reject', 
-                outputMachineFileName    = '/machine', 
-                isPositivePolarity       = False,
-                splitAfterNPulsesCorrect = -1,
-                splitAfterNPulsesReject  = -1,
-                machineInput             = DMachineParams(),
-                debug                    = True):
-    mlInput = machineInput.copy()
+    """
     
-    fileSizeTrue  = os.path.getsize(fileNameCorrectPulses)
-    fileSizeFalse = os.path.getsize(fileNameRejectPulses)
+     return: 
+         
+         (1) list of (file name, number of records) in the order of the pulse sequence.
+         
+    """
     
-    readBytes     = 32 #header offset
+    def files(self):
+        return list(zip(self.m_fileNames, self.m_numberOfRecords))
     
-    x_array       = []
-    y_array       = []
+    """
     
-    # (1) REJECT pulses:
-    with open(fileNameRejectPulses, "rb") as streamFile:
-        if debug:
-            print("(1) >> teach machine with REJECT pulses:\n")
+     return: 
+         
+         (1) True if each file has an index trailer (see 'readIndexTrailer(..)').
+         
+    """
+    
+    def hasIndexTrailer(self):
+        return all(self.m_indexTrailers)
+    
+    def recordBytes(self):
+        return self.m_recordDType.itemsize
+    
+    def reader(self, index):
+        if self.m_readers[index] is None:
+            self.m_readers[index] = DPulseStreamReader(self.m_fileNames[index], self.m_pairs)
             
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
-        
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeFalse - readBytes)/pulseBytes
-        
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}'.format(frequencyInGHz))
-            print('number of pulses: {0}\n'.format(numberOfPulses))
+        return self.m_readers[index]
+    
+    """
+    
+     see 'DPulseStreamReader.readBlock(..)'
+     
+    """
+    
+    def readBlock(self, start = 0, count = -1):
+        stop = self.numberOfPulses() if count == -1 else min(start + count, self.numberOfPulses())
         
-        pulseCounter = 0
+        blocks = []
         
-        while True:
-            __, pulse = readPulse(streamFile, numberOfCells)
-                
-            if not len(pulse) or (splitAfterNPulsesReject > -1 and pulseCounter > splitAfterNPulsesReject):
+        # files overlapping [start:stop]
+        for index in range(max(0, np.searchsorted(self.m_firstPulses, start, side='right') - 1), len(self.m_fileNames)):
+            firstPulse = int(self.m_firstPulses[index])
+            
+            if firstPulse >= stop:
                 break
-                
-            # apply median filter?:
-            if mlInput.m_medianFilter:
-                pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-            # correct for baseline?:
-            if mlInput.m_correctForBaseline:
-                stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                mean = 0.0
-                    
-                if np.abs(stddev_pre) < np.abs(stddev_post):
-                    mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                else:
-                    mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                           
-                pulse -= mean
-                    
-            readBytes += pulseBytes
             
-            # normalize pulse data
-            voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-                
-            if not valid:
-                continue
-                
-            pulseCounter += 1
+            first = max(start, firstPulse)
+            last  = min(stop, firstPulse + self.m_numberOfRecords[index])
             
-            if debug:
-                sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeFalse/1024)/1000, (readBytes-32)/pulseBytes, numberOfPulses))
-             
-            x_array.append(voltage_norm)
-            y_array.append(0) # << FALSE (0) means bad pulses (REJECT)
+            if first < last:
+                blocks.append(self.reader(index).readBlock(first - firstPulse, last - first))
                 
-        streamFile.close()
+        if len(blocks) == 1:
+            return blocks[0]
         
-    readBytes = 32 #header offset
-    
-    # (2) CORRECT pulses:
-    with open(fileNameCorrectPulses, "rb") as streamFile:
-        if debug:
-            print("(2) >> teach machine with CORRECT pulses:\n")
-            
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
+        if not blocks:
+            return self.reader(0).readBlock(0, 0)
         
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeTrue - readBytes)/pulseBytes
-        
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}'.format(frequencyInGHz))
-            print('number of pulses: {0}\n'.format(numberOfPulses))
+        return tuple(np.concatenate(traces) for traces in zip(*blocks))
+    
+    """
+    
+     see 'DPulseStreamReader.readPulses(..)': 'indexes' must be in ascending order.
+     
+    """
+    
+    def readPulses(self, indexes):
+        indexes = np.asarray(indexes, dtype=np.int64)
         
-        pulseCounter = 0
+        files = np.searchsorted(self.m_firstPulses, indexes, side='right') - 1
         
-        while True:
-            time, pulse = readPulse(streamFile, numberOfCells)
-                
-            if not len(pulse) or (splitAfterNPulsesCorrect > -1 and pulseCounter > splitAfterNPulsesCorrect):
-                break
-            
-            # apply median filter?:
-            if mlInput.m_medianFilter:
-                pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-            # correct for baseline?:
-            if mlInput.m_correctForBaseline:
-                stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                mean = 0.0
-                    
-                if np.abs(stddev_pre) < np.abs(stddev_post):
-                    mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                else:
-                    mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                           
-                pulse -= mean
-                
-            readBytes += pulseBytes
-            
-            # normalize pulse data
-            voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-            
-            if not valid:
-                continue
-            
-            pulseCounter += 1
-            
-            if debug:
-                sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeTrue/1024)/1000, (readBytes-32)/pulseBytes, numberOfPulses))
-             
-            x_array.append(voltage_norm)
-            y_array.append(1) # << TRUE (1) means good pulses (CORRECT)
-                
-        streamFile.close()
-                
-    mlInput.m_classifier.fit(x_array, y_array)
-            
-    x_array.clear()
-    y_array.clear()
+        blocks = [self.reader(index).readPulses(indexes[files == index] - self.m_firstPulses[index]) for index in np.unique(files)]
         
-    if not outputMachineFileName == '':
-        mlInput.save(outputMachineFileName)
+        if len(blocks) == 1:
+            return blocks[0]
         
-    return mlInput
+        if not blocks:
+            return self.reader(0).readBlock(0, 0)
         
+        return tuple(np.concatenate(traces) for traces in zip(*blocks))
+    
+    def close(self):
+        for index, reader in enumerate(self.m_readers):
+            if reader is not None:
+                reader.close()
+                
+            self.m_readers[index] = None
+
 """
 
- This function is similar to 'trainPulses(..)' but, instead, applies batching (out-of-core fitting) internally 
- to TRAIN the machine's classifier on large pulse streams, which do not fit the RAM.
- 
- If 'splitAfterNPulses' == -1 (default), the entire number pulses from the given pulse streams 
- 'fileNameCorrectPulses' and 'fileNameRejectPulses' are used to TRAIN the machine's classifier. Otherwise, the set number 
- 'splitAfterNPulses' is considered for both pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
- 
- If 'outputMachineFileName' == '', the machine won't be stored in a file (*joblib). 
+ This function returns the pulse-stream files of 'fileNames' (see 'expandPulseStreamFileNames(..)').
  
  return: 
      
-     (1) TRAINed machine (DMachineParams()).
+     (1) list of (file name, number of records).
      
 """
 
-def trainPulsesOnline(fileNameCorrectPulses = '/correct', 
-                      fileNameRejectPulses  = '/reject', 
-                      outputMachineFileName = '/machine', 
-                      isPositivePolarity    = False,
-                      chunkSize             = 5000, # according to the specs of scikit learn, set this number as near as possible to the RAM size.
-                      machineInput          = DMachineParams(),
-                      debug                 = True): 
-    mlInput = machineInput.copy()
+def pulseStreamSegments(fileNames = '/pulseStream', pairs = False):
+    return DPulseStreamDataset(fileNames, pairs).files()
+
+def pulseStreamSizeInBytes(fileNames = '/pulseStream'):
+    return sum(os.path.getsize(fileName) for fileName, __, __ in expandPulseStreamFileNames(fileNames))
+
+"""
+
+ This function opens the pulse stream 'fileName', which is either a single pulse-stream file (see 'DPulseStreamReader') 
+ or a manifest, glob pattern or list of pulse-stream files (see 'DPulseStreamDataset').
+ 
+"""
+
+def openPulseStream(fileName = '/pulseStream', pairs = False):
+    if isinstance(fileName, (list, tuple)):
+        return DPulseStreamDataset(fileName, pairs)
     
-    y_all = []
-    y_all.append(0) # bad  pulse (REJECT)
-    y_all.append(1) # good pulse (CORRECT)
+    if os.path.isfile(fileName):
+        if isPulseStreamManifest(fileName):
+            return DPulseStreamDataset(fileName, pairs)
+    elif glob.has_magic(fileName):
+        return DPulseStreamDataset(fileName, pairs)
+    
+    return DPulseStreamReader(fileName, pairs)
+
+"""
+
+ This generator streams the pulse stream 'fileName' in contiguous blocks of at most 'blockSize' pulses 
+ (see 'openPulseStream(..)'). The memory required is bounded by the block size, independent of the file size.
+ 
+ If 'count' == -1 (default), all pulses from 'start' until the end of the stream are streamed.
+ 
+ yields:
+     
+     pairs = False: time, voltage                     >> each of shape (n, number of cells) and type(float32)
+     pairs = True:  timeA, voltageA, timeB, voltageB  >> each of shape (n, number of cells) and type(float32)
+ 
+"""
+
+def iterPulseBlocks(fileName = '/pulseStream', blockSize = 1000, pairs = False, start = 0, count = -1):
+    reader = openPulseStream(fileName, pairs)
     
-    fileSizeTrue  = os.path.getsize(fileNameCorrectPulses)
-    fileSizeFalse = os.path.getsize(fileNameRejectPulses)
+    stop = reader.numberOfPulses() if count == -1 else min(start + count, reader.numberOfPulses())
     
-    readBytes = 32 #header offset
+    try:
+        for first in range(start, stop, blockSize):
+            yield reader.readBlock(first, min(blockSize, stop - first))
+    finally:
+        reader.close()
+
+"""
+
+ This function opens a pulse-stream file 'fileName' (see 'DPulseStreamReader'), which might be created just now: 
+ it waits until the header is written, the file 'sentinelFileName' exists (if not '') or 'idleTimeout_in_s' seconds 
+ have passed (-1: unlimited).
+ 
+"""
+
+def waitForPulseStream(fileName = '/pulseStream', pairs = False, idleTimeout_in_s = 60.0, pollInterval_in_s = 1.0, sentinelFileName = ''):
+    startTime = monotonic()
     
-    # (1) REJECT pulses:
-    with open(fileNameRejectPulses, "rb") as streamFile:
-        if debug:
-            print("(1) >> teach machine with REJECT pulses:\n")
+    while True:
+        try:
+            return DPulseStreamReader(fileName, pairs)
+        except (IOError, OSError):
+            if (sentinelFileName and os.path.exists(sentinelFileName)) or (idleTimeout_in_s > -1 and monotonic() - startTime > idleTimeout_in_s):
+                raise
+                
+            sleep(pollInterval_in_s)
+
+"""
+
+ This generator follows a pulse-stream file 'fileName', which is still written (e.g. by DPulseStreamManager), and 
+ streams its complete records in blocks of at most 'blockSize' pulses shortly after they are appended (see 'iterPulseBlocks(..)'). 
+ The file is polled every 'pollInterval_in_s' seconds.
+ 
+ A record is streamed once it has been in the file for one poll, so that the beginning of an index trailer, which is 
+ still written, is never streamed as records. The file 'sentinelFileName' must be created after the file is closed.
+ 
+ The generator stops if: 
+     
+     (1) 'numberOfPulses' pulses are streamed (-1: unlimited),
+     (2) the file 'sentinelFileName' exists (if not '') or the index trailer has been written (see 'DPulseStreamReader') 
+         and all complete records are streamed or
+     (3) the file has not grown for 'idleTimeout_in_s' seconds (-1: unlimited).
+ 
+ yields:
+     
+     pairs = False: time, voltage                     >> each of shape (n, number of cells) and type(float32)
+     pairs = True:  timeA, voltageA, timeB, voltageB  >> each of shape (n, number of cells) and type(float32)
+ 
+"""
+
+def iterFollowPulseBlocks(fileName = '/pulseStream', blockSize = 1000, pairs = False, numberOfPulses = -1, idleTimeout_in_s = 60.0, pollInterval_in_s = 1.0, sentinelFileName = ''):
+    reader = waitForPulseStream(fileName, pairs, idleTimeout_in_s, pollInterval_in_s, sentinelFileName)
+    
+    lastReceived   = monotonic()
+    pulsesStreamed = 0
+    
+    try:
+        while numberOfPulses < 0 or pulsesStreamed < numberOfPulses:
+            # the sentinel is checked before refreshing, so that no record written before the sentinel is missed
+            stop = bool(sentinelFileName) and os.path.exists(sentinelFileName)
+            
+            # records appended since the last poll may be the beginning of the index trailer (see 'DPulseStreamReader.refresh(..)')
+            stopIndex = reader.refresh(stableOnly=not stop)
+            
+            if numberOfPulses > -1:
+                stopIndex = min(stopIndex, numberOfPulses)
+            
+            if stopIndex > pulsesStreamed:
+                for first in range(pulsesStreamed, stopIndex, blockSize):
+                    yield reader.readBlock(first, min(blockSize, stopIndex - first))
+                    
+                pulsesStreamed = stopIndex
+                lastReceived   = monotonic()
+            elif stop or reader.hasIndexTrailer() or (idleTimeout_in_s > -1 and monotonic() - lastReceived > idleTimeout_in_s):
+                break
             
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
+            # the remaining records are streamed without waiting
+            if not (stop or reader.hasIndexTrailer()):
+                sleep(pollInterval_in_s)
+    finally:
+        reader.close()
+
+"""
+
+ The control block (c-type struct) at the beginning of the shared memory segment of a pulse pair ring buffer 
+ (see the C++ API: DPulseStreamSharedMemoryRing) as NumPy structured data type (128 bytes).
+ 
+"""
+
+sharedMemoryRingControlDType = np.dtype([('magic',              '<u4'),
+                                         ('layoutVersion',      '<u4'),
+                                         ('header',             pulseStreamHeaderDType),
+                                         ('recordSizeInBytes',  '<u8'),
+                                         ('capacityInRecords',  '<u8'),
+                                         ('dataOffsetInBytes',  '<u8'),
+                                         ('writeIndex',         '<u8'),
+                                         ('readIndex',          '<u8'),
+                                         ('droppedPairs',       '<u8'),
+                                         ('closed',             '<u4'),
+                                         ('__',                 '<u4'),
+                                         ('reserved',           'V32')])
+
+sharedMemoryRingMagic = 0x52535044 # 'DPSR'
+
+"""
+
+ This class consumes the pulse pairs of a POSIX shared memory ring buffer 'name', which is filled by the C++ API 
+ (see DPulseStreamSharedMemoryRing), without touching the disk.
+ 
+ The records have the same layout as the records of a pulse pair stream file (see 'pulseRecordDType(..)'). 
+ 'readBlock(..)' returns zero-copy, read-only views of the records in the shared memory segment. The records 
+ are handed back to the producer by 'release(..)', i.e. the views must not be used afterwards.
+ 
+ Note: a single consumer is supported. The indices of the ring are exchanged by aligned 64 bit loads and 
+ stores, which are atomic on x86-64.
+ 
+"""
+
+class DPulseStreamSharedMemoryReader():
+    def __init__(self, name = 'DPulseStreamRing'):
+        self.m_unregistered = False
         
-        pulseBytes     = 2*numberOfCells*4
-        numberOfPulses = (fileSizeFalse - readBytes)/pulseBytes
+        try:
+            self.m_sharedMemory = shared_memory.SharedMemory(name=name, track=False) # python >= 3.13
+        except TypeError:
+            self.m_sharedMemory = shared_memory.SharedMemory(name=name)
+            
+            # the segment is owned by the producer: do not remove it at exit
+            resource_tracker.unregister(self.m_sharedMemory._name, 'shared_memory')
+            
+            self.m_unregistered = True
+            
+        control = np.ndarray((1,), dtype=sharedMemoryRingControlDType, buffer=self.m_sharedMemory.buf)[0]
         
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}'.format(frequencyInGHz))
-            print('number of pulses: {0}\n'.format(numberOfPulses))
+        if not int(control['magic']) == sharedMemoryRingMagic:
+            self.close()
+            
+            raise IOError("'{0}' is not a pulse pair ring buffer.".format(name))
+            
+        self.m_name               = name
+        self.m_version            = int(control['header']['version'])
+        self.m_sweepInNanoseconds = float(control['header']['sweepInNanoseconds'])
+        self.m_frequencyInGHz     = float(control['header']['frequencyInGHz'])
+        self.m_numberOfCells      = int(control['header']['numberOfCells'])
+        self.m_capacity           = int(control['capacityInRecords'])
+        self.m_recordDType        = pulseRecordDType(self.m_numberOfCells, True, self.m_version)
+        self.m_timeAxis           = None
         
-        pulseCounter = 0
+        if not self.m_recordDType.itemsize == int(control['recordSizeInBytes']):
+            self.close()
+            
+            raise IOError("'{0}': unexpected record size.".format(name))
+            
+        # live views: [writeIndex, readIndex, droppedPairs] and 'closed'
+        self.m_indices = np.ndarray((3,), dtype='<u8', buffer=self.m_sharedMemory.buf, offset=sharedMemoryRingControlDType.fields['writeIndex'][1])
+        self.m_closed  = np.ndarray((1,), dtype='<u4', buffer=self.m_sharedMemory.buf, offset=sharedMemoryRingControlDType.fields['closed'][1])
         
-        while True:
-            x_array = []
-            y_array = []
-           
-            abortStream = False
+        # version 2: the shared time axis follows the control block
+        if self.m_version == 2:
+            self.m_timeAxis = sortTimeTraces(np.ndarray((1, self.m_numberOfCells), dtype='<f4', buffer=self.m_sharedMemory.buf, offset=sharedMemoryRingControlDType.itemsize).copy())[0]
             
-            for run in range(0, chunkSize):
-                __, pulse = readPulse(streamFile, numberOfCells)
-                
-                if not len(pulse):
-                    abortStream = True
-                    break
-                
-                # apply median filter?:
-                if mlInput.m_medianFilter:
-                    pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-                # correct for baseline?:
-                if mlInput.m_correctForBaseline:
-                    mean_pre  = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                    mean_post = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                    stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                    stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                    mean = 0.0
-                    
-                    if np.abs(stddev_pre) < np.abs(stddev_post):
-                        mean = mean_pre
-                    else:
-                        mean = mean_post
-                           
-                    pulse -= mean
-                    
-                readBytes += pulseBytes
-                
-                voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-                
-                if not valid:
-                    continue
-                
-                pulseCounter += 1
-                
-                if debug:
-                    sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeFalse/1024)/1000, (readBytes-32)/pulseBytes, numberOfPulses))
-             
-                x_array.append(voltage_norm)
-                y_array.append(0)
-                
-            if len(x_array) > 0:    
-                mlInput.m_classifier.partial_fit(x_array, y_array, classes=np.unique(y_all))
-                
-            if abortStream:
-                break;
-                
-        streamFile.close()
+        self.m_records = np.ndarray((self.m_capacity,), dtype=self.m_recordDType, buffer=self.m_sharedMemory.buf, offset=int(control['dataOffsetInBytes']))
         
-    readBytes = 32 #header offset   
+    def numberOfAvailablePairs(self):
+        return int(self.m_indices[0]) - int(self.m_indices[1])
+    
+    def droppedPairs(self):
+        return int(self.m_indices[2])
+    
+    def isClosed(self):
+        return bool(self.m_closed[0])
+    
+    """
+    
+     This function returns up to 'count' (-1: all) available pulse pairs as views: timeA, voltageA, timeB, voltageB. 
+     The block ends at the end of the ring, i.e. the next block starts at the beginning of the ring.
+     
+    """
+    
+    def readBlock(self, count = -1):
+        readIndex = int(self.m_indices[1])
+        available = int(self.m_indices[0]) - readIndex
         
-    # (2) CORRECT pulses:
-    with open(fileNameCorrectPulses, "rb") as streamFile2:
-        if debug:
-            print("(2) >> teach machine with CORRECT pulses:\n")
+        if count > -1:
+            available = min(available, count)
             
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile2)
+        start = readIndex % self.m_capacity
+        stop  = start + min(available, self.m_capacity - start)
         
-        pulseBytes = 2*numberOfCells*4
-        numberOfPulses = (fileSizeTrue - readBytes)/pulseBytes
+        records = self.m_records[start:stop]
         
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}'.format(frequencyInGHz))
-            print('number of pulses: {0}\n'.format(numberOfPulses))
+        if self.m_timeAxis is not None:
+            time = np.broadcast_to(self.m_timeAxis, (len(records), self.m_numberOfCells))
             
-        pulseCounter = 0
+            return time, self.readOnly(records['voltageA']), time, self.readOnly(records['voltageB'])
         
-        while True:
-            x_array = []
-            y_array = []
-           
-            abortStream = False
+        timeA = self.readOnly(records['timeA'])
+        timeB = self.readOnly(records['timeB'])
+        
+        # unsorted time traces are sorted in a copy
+        if np.any(timeA[:, 1:] < timeA[:, :-1]):
+            timeA = sortTimeTraces(np.array(timeA))
             
-            for run in range(0, chunkSize):
-                __, pulse = readPulse(streamFile2, numberOfCells)
-                
-                if not len(pulse):
-                    abortStream = True
-                    break
-                
-                # apply median filter?:
-                if mlInput.m_medianFilter:
-                    pulse = medfilt(pulse, mlInput.m_windowSize)
-                    
-                # correct for baseline?:
-                if mlInput.m_correctForBaseline:
-                    mean_pre  = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
-                    mean_post = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
-                    
-                    mean = 0.0
-                    
-                    if np.abs(mean_pre) < np.abs(mean_post):
-                        mean = mean_pre
-                    else:
-                        mean = mean_post
-                           
-                    pulse -= mean
-                
-                
-                readBytes += pulseBytes
-                
-                voltage_norm, __, __, valid = normalizeData(pulse, numberOfCells, isPositivePolarity)
-                
-                if not valid:
-                    continue
-                
-                pulseCounter += 1
-                
-                if debug:
-                    sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeTrue/1024)/1000, (readBytes-32)/pulseBytes, numberOfPulses))
+        if np.any(timeB[:, 1:] < timeB[:, :-1]):
+            timeB = sortTimeTraces(np.array(timeB))
             
-                x_array.append(voltage_norm)
-                y_array.append(1)
-                
-            if len(x_array) > 0:    
-                mlInput.m_classifier.partial_fit(x_array, y_array, classes=np.unique(y_all))
-                
-            if abortStream:
-                break;
-                
-        streamFile2.close()
+        return timeA, self.readOnly(records['voltageA']), timeB, self.readOnly(records['voltageB'])
     
-    if not outputMachineFileName == '':
-        mlInput.save(outputMachineFileName)
+    def readOnly(self, view):
+        view.flags.writeable = False
+        
+        return view
     
-    return mlInput
+    """
+    
+     This function hands 'count' pulse pairs back to the producer.
      
+    """
+    
+    def release(self, count):
+        self.m_indices[1] = self.m_indices[1] + np.uint64(count)
+        
+    def close(self, unlink = False):
+        # the views have to be released before the shared memory can be closed
+        self.m_records = None
+        self.m_indices = None
+        self.m_closed  = None
+        
+        try:
+            self.m_sharedMemory.close()
+        except BufferError:
+            pass # views are still referenced by the caller: the segment is unmapped on their release
+        
+        if unlink:
+            if self.m_unregistered:
+                self.m_unregistered = False
+                
+                resource_tracker.register(self.m_sharedMemory._name, 'shared_memory') # 'unlink()' unregisters the segment again
+                
+            self.m_sharedMemory.unlink()
+
 """
 
- This function can be used to TRAIN and TEST a machine's classifier from TWO data sets of correct ('fileNameCorrectPulses_train' & 'fileNameCorrectPulses_test') 
- and wrong ('fileNameRejectPulses_train' & 'fileNameRejectPulses_test') streamed pulses.
+ This generator consumes the pulse pairs of the shared memory ring buffer 'name' (see 'DPulseStreamSharedMemoryReader') 
+ in blocks of at most 'blockSize' pulse pairs. The yielded views are valid until the next block is requested.
  
- This function is similar to 'splitTrainAndTest(..)', which instead needs only ONE data set of pulse streams.
-
- If 'splitAfterNPulses_xx' == -1 (default), the entire number pulses from the pulse streams 
- 'fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx' are used for TRAINing or TESTing. Otherwise, the given number 
- 'splitAfterNPulses_xx' is considered for both pulse streams 'fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx'.
+ The generator stops if: 
+     
+     (1) the producer has closed the ring and all pulse pairs are consumed,
+     (2) 'numberOfPairs' pulse pairs are consumed (-1: unlimited) or
+     (3) no pulse pair has been received for 'idleTimeout_in_s' seconds (-1: unlimited).
  
- return: 
+ yields:
      
-     (1) list, which contains the prediction accuracies [0.0-1.0] for each 'numberOfPulses_train',
-     (4) DMachineParams() from the learned machine.
+     timeA, voltageA, timeB, voltageB  >> each of shape (n, number of cells) and type(float32)
  
 """
 
-def trainAndTest(fileNameCorrectPulses_train = '/correct_train', 
+def iterSharedMemoryPulseBlocks(name = 'DPulseStreamRing', blockSize = 1000, numberOfPairs = -1, idleTimeout_in_s = 10.0, pollInterval_in_s = 0.001, unlink = False):
+    reader = DPulseStreamSharedMemoryReader(name)
+    
+    pairsConsumed = 0
+    lastReceived  = monotonic()
+    
+    try:
+        while numberOfPairs < 0 or pairsConsumed < numberOfPairs:
+            count = blockSize if numberOfPairs < 0 else min(blockSize, numberOfPairs - pairsConsumed)
+            
+            # the 'closed' flag is checked before reading, so that no pulse pair published before closing is missed
+            closed = reader.isClosed()
+            block  = reader.readBlock(count)
+            
+            if not len(block[1]):
+                if closed or (idleTimeout_in_s > -1 and monotonic() - lastReceived > idleTimeout_in_s):
+                    break
+                
+                sleep(pollInterval_in_s)
+                continue
+            
+            yield block
+            
+            reader.release(len(block[1]))
+            
+            pairsConsumed += len(block[1])
+            lastReceived   = monotonic()
+            
+            del block
+    finally:
+        reader.close(unlink)
+
+"""
+
+ This function normalizes the pulse shape for TRAINing/TESTing and PREDICTING:
+     
+ (1) by its integrated area over the entire time frame (number of cells) with respect to the zero baseline and then
+ (2) by its absolute value of maximum/minimum amplitude that: max(amplitude) = 1.0. 
+     
+"""
+
+def normalizeData(voltage, numberOfCells, polarity):
+    arg = 0
+    
+    valid = True
+    
+    if not polarity: #negative
+        arg = np.argmin(voltage)
+    else:            #positive
+        arg = np.argmax(voltage)
+        
+    minMaxValue = voltage[arg]
+    minMaxArg   = arg    
+    
+    # safety region (may adjust this region for your purposes)
+    if minMaxArg < 0.02*numberOfCells or minMaxArg > 0.92*numberOfCells:
+        valid = False
+        
+        np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)), minMaxValue, minMaxArg, valid
+                   
+    voltage /= np.abs(sum(voltage))   
+    
+    if not polarity: #negative
+        arg = np.argmin(voltage)
+    else:            #positive
+        arg = np.argmax(voltage)
+        
+    if arg < 0 or arg >= numberOfCells:
+        valid = False
+        
+        return voltage, minMaxValue, minMaxArg, valid
+    
+    if voltage[arg] == 0.0: # prevent by zero division
+        valid = False
+        
+        return voltage, 0.0, minMaxArg, valid
+    
+    voltage /= voltage[arg]
+    
+    return np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)), minMaxValue, minMaxArg, valid
+
+"""
+
+ This class holds reusable workspace buffers of the preprocessing and the lifetime determination (see 'calcLifetimesOfPulsePairs(..)'), 
+ so that a block of pulses does not allocate new arrays of shape (number of pulses, number of cells) once the buffers are large enough.
+ 
+ 'array(..)' returns a buffer which is valid (not overwritten) until the next call with the same 'name'. 
+ 'child(..)' returns a (cached) workspace of its own, e.g. one per detector.
+ 
+"""
+
+class DPulseWorkspace():
+    def __init__(self):
+        self.m_buffers  = {}
+        self.m_children = {}
+        
+    def array(self, name, shape, dtype = np.float64):
+        dtype = np.dtype(dtype)
+        size  = int(np.prod(shape))
+        
+        buffer = self.m_buffers.get((name, dtype))
+        
+        if buffer is None or len(buffer) < size:
+            buffer = np.empty(size, dtype=dtype)
+            
+            self.m_buffers[(name, dtype)] = buffer
+            
+        return buffer[:size].reshape(shape)
+    
+    def child(self, name):
+        if not name in self.m_children:
+            self.m_children[name] = DPulseWorkspace()
+            
+        return self.m_children[name]
+    
+    def sizeInBytes(self):
+        return sum(buffer.nbytes for buffer in self.m_buffers.values()) + sum(child.sizeInBytes() for child in self.m_children.values())
+
+"""
+
+ This function applies a median filter with the (odd) window size 'windowSize' on each pulse (row) of the 2D array 'voltage'.
+ 
+ If 'out' is given, the filtered pulses are written to 'out' (same shape, not 'voltage' itself) instead of a new array. 
+ The zero padding at the edges is the same in both cases.
+ 
+"""
+
+def medianFilterPulses(voltage, windowSize, out = None):
+    if out is None:
+        return medfilt(voltage, [1, windowSize])
+    
+    median_filter(voltage, size=(1, windowSize), mode='constant', cval=0.0, output=out)
+    
+    return out
+
+"""
+
+ This function corrects each pulse (row) of the 2D array 'voltage' for its baseline (in place): 
+     
+ The mean value of the baseline region in front of [startCell:cellRegion] or at the end of the pulse is subtracted, 
+ whichever region shows the lower standard deviation.
+ 
+"""
+
+def correctBaselinePulses(voltage, numberOfCells, startCell, cellRegion):
+    region_pre  = voltage[:, startCell:cellRegion]
+    region_post = voltage[:, numberOfCells-1-startCell-cellRegion:numberOfCells-1-startCell]
+    
+    stddev_pre  = np.std(region_pre,  axis=1)
+    stddev_post = np.std(region_post, axis=1)
+    
+    mean = np.where(np.abs(stddev_pre) < np.abs(stddev_post), np.mean(region_pre, axis=1), np.mean(region_post, axis=1))
+    
+    voltage -= mean[:, np.newaxis]
+    
+    return voltage
+
+"""
+
+ This function is the counterpart of 'normalizeData(..)' for a 2D array 'voltage' of shape (number of pulses, number of cells). 
+ The pulses are normalized in place.
+ 
+ return: 
+     
+     (1) normalized pulses (2D array) with the peak shifted to cell 'numberOfCells/2',
+     (2) amplitudes (minimum/maximum) before normalization,
+     (3) cells of the amplitudes (2),
+     (4) validity mask.
+     
+ If a 'workspace' (DPulseWorkspace()) is given, (1) is one of its buffers.
+     
+"""
+
+def normalizePulses(voltage, numberOfCells, polarity, workspace = None):
+    rows = np.arange(len(voltage))
+    
+    if not polarity: #negative
+        minMaxArg = np.argmin(voltage, axis=1)
+    else:            #positive
+        minMaxArg = np.argmax(voltage, axis=1)
+        
+    minMaxValue = voltage[rows, minMaxArg]
+    
+    # safety region (may adjust this region for your purposes)
+    valid = (minMaxArg >= 0.02*numberOfCells) & (minMaxArg <= 0.92*numberOfCells)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # sequential summation as the built-in sum() in 'normalizeData(..)'
+        if workspace is None:
+            voltage /= np.abs(np.cumsum(voltage, axis=1)[:, -1])[:, np.newaxis]
+        else:
+            voltage /= np.abs(np.cumsum(voltage, axis=1, out=workspace.array('sum', voltage.shape, voltage.dtype))[:, -1])[:, np.newaxis]
+        
+        if not polarity: #negative
+            arg = np.argmin(voltage, axis=1)
+        else:            #positive
+            arg = np.argmax(voltage, axis=1)
+            
+        peak = voltage[rows, arg]
+        
+        valid &= (peak != 0.0) & np.isfinite(peak) # prevent by zero division
+        
+        voltage /= np.where(valid, peak, 1.0)[:, np.newaxis]
+    
+    # shift the peak to the center: equivalent to np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)) for each pulse
+    if workspace is None:
+        index = (np.arange(numberOfCells)[np.newaxis, :] + arg[:, np.newaxis] - (int)(numberOfCells/2)) % numberOfCells
+        
+        return np.take_along_axis(voltage, index, axis=1), minMaxValue, minMaxArg, valid
+    
+    index = workspace.array('index', voltage.shape, np.intp)
+    
+    np.add(np.arange(numberOfCells)[np.newaxis, :], (arg - (int)(numberOfCells/2))[:, np.newaxis], out=index)
+    np.remainder(index, numberOfCells, out=index)
+    
+    index += (rows*numberOfCells)[:, np.newaxis] # flat index of the (contiguous) 2D array
+    
+    return np.take(np.ascontiguousarray(voltage).ravel(), index, out=workspace.array('features', voltage.shape, voltage.dtype)), minMaxValue, minMaxArg, valid
+
+"""
+
+ This function preprocesses a block of pulses 'voltage' of shape (number of pulses, number of cells) for TRAINing/TESTing 
+ and PREDICTING according to 'machineInput' (DMachineParams()): median filter, baseline correction and normalization.
+ 
+ return: 
+     
+     (1) feature matrix of shape (number of pulses, number of cells) and
+     (2) validity mask of the pulses (see 'normalizeData(..)').
+     
+ The pulses are processed as 'dtype': np.float64 (default) or np.float32, the type stored in the pulse stream (see 'createLifetimeSpectrum(..)' 
+ for the accuracy). If a 'workspace' (DPulseWorkspace()) is given, its buffers are used instead of new arrays and (1) is valid 
+ until the next call with the same 'workspace'.
+     
+"""
+
+def preprocessPulses(voltage, machineInput = DMachineParams(), isPositivePolarity = False, dtype = np.float64, workspace = None):
+    pulses = filterPulses(voltage, machineInput, machineInput.m_medianFilter, machineInput.m_windowSize, dtype, workspace)
+        
+    features, __, __, valid = normalizePulses(pulses, voltage.shape[1], isPositivePolarity, workspace)
+    
+    return features, valid
+
+"""
+
+ This function returns a copy of the pulses 'voltage' of shape (number of pulses, number of cells) as 'dtype', which is median filtered 
+ with the window size 'windowSize' (if 'medianFilter') and corrected for its baseline according to 'machineInput' (DMachineParams()). 
+ 
+ If a 'workspace' (DPulseWorkspace()) is given, the copy is written to its buffers 'name'/'name' + 'Filtered'.
+ 
+"""
+
+def filterPulses(voltage, machineInput = DMachineParams(), medianFilter = True, windowSize = 5, dtype = np.float64, workspace = None, name = 'pulses'):
+    if workspace is None:
+        pulses = np.array(voltage, dtype=dtype)
+    else:
+        pulses = workspace.array(name, voltage.shape, dtype)
+        
+        np.copyto(pulses, voltage)
+    
+    # apply median filter?:
+    if medianFilter:
+        pulses = medianFilterPulses(pulses, windowSize, None if workspace is None else workspace.array(name + 'Filtered', voltage.shape, dtype))
+        
+    # correct for baseline?:
+    if machineInput.m_correctForBaseline:
+        correctBaselinePulses(pulses, voltage.shape[1], machineInput.m_startCell, machineInput.m_cellRegion)
+        
+    return pulses
+
+"""
+
+ This function returns an upper bound of the absolute amplitudes [mV] of the pulses 'voltage' of shape (number of pulses, number of cells), 
+ which holds for any median filter and baseline correction applied (see 'filterPulses(..)'): max(0, max. sample) - min(0, min. sample). 
+ This is the amplitude bound of the index trailer (see 'pulseStreamIndexEntryDType'), but per pulse.
+ 
+"""
+
+def amplitudeBoundOfPulses(voltage):
+    bound = np.maximum(np.max(voltage, axis=1), 0.0).astype(np.float64) - np.minimum(np.min(voltage, axis=1), 0.0)
+    
+    # small margin for the rounding of the baseline mean
+    return bound*(1.0 + 1e-6) + 1e-6
+
+"""
+
+ This function determines the time of the constant fraction (CF) level 'cfdVoltage' [mV] of a single detector pulse (x = time, y = voltage) 
+ in closed form: 
+     
+ Walking backwards from the pulse maximum/minimum, the first sampling point 'index' passing the CF level is searched. 
+ A cubic spline is fitted only to the local neighbourhood of +/- 'neighbours' sampling points around 'index' and the cubic 
+ polynomial of the segment [x[index-1], x[index]] is solved analytically for the CF level.
+ 
+ return: 
+     
+     (1) time of the CF level and
+     (2) 'True' if the pulse has to be rejected.
+     
+"""
+
+def calcCFDTimeCubicSpline(x, y, cfdVoltage, isPositivePolarity = False, neighbours = 8):
+    if not isPositivePolarity:
+        arg      = np.argmin(y)
+        crossing = (y[1:arg+1] <= cfdVoltage) & (y[:arg] >= cfdVoltage)
+    else:
+        arg      = np.argmax(y)
+        crossing = (y[1:arg+1] >= cfdVoltage) & (y[:arg] <= cfdVoltage)
+        
+    if not np.any(crossing):
+        return 0.0, True
+    
+    index = np.flatnonzero(crossing)[-1] + 1
+    
+    if index <= 2:
+        return 0.0, True
+    
+    lower = max(0, index - 1 - neighbours)
+    upper = min(len(x), index + 1 + neighbours)
+    
+    spline = CubicSpline(x[lower:upper], y[lower:upper])
+    
+    # c3*t^3 + c2*t^2 + c1*t + c0 = cfdVoltage with t = time - x[index-1] in [0, x[index] - x[index-1]]
+    c3, c2, c1, c0 = spline.c[:, index - 1 - lower]
+    
+    roots = np.roots([c3, c2, c1, c0 - cfdVoltage])
+    roots = roots[np.abs(roots.imag) <= 1e-9*max(1.0, np.abs(roots).max())].real
+    roots = roots[(roots >= 0.0) & (roots <= x[index] - x[index-1])]
+    
+    if not len(roots):
+        return 0.0, True
+    
+    # closest to the pulse maximum/minimum
+    t = roots.max()
+    
+    slope = 3.0*c3*t*t + 2.0*c2*t + c1
+    
+    if (not isPositivePolarity and slope >= 0) or (isPositivePolarity and slope <= 0):
+        return 0.0, True
+    
+    return x[index-1] + t, False
+
+"""
+
+ This function determines the time of the constant fraction (CF) level 'cfdVoltage' [mV] of a single detector pulse (x = time, y = voltage):
+     
+ Walking backwards from the pulse maximum/minimum, the time is interpolated linearly between the sampling points passing the CF level. 
+ The pulse is rejected if the slope does not match the polarity or the CF level is located within the first cells.
+ 
+ If 'cubicSpline' is 'True', the interpolation is applied on 'cubicSplineRenderPoints' points of a cubic spline rendered between 
+ the two sampling points passing the CF level, or, if 'analyticCubicSpline' is 'True', solved in closed form (see 'calcCFDTimeCubicSpline(..)').
+ 
+ return: 
+     
+     (1) time of the CF level and
+     (2) 'True' if the pulse has to be rejected.
+     
+"""
+
+def calcCFDTime(x, 
+                y, 
+                cfdVoltage              = 0.0,
+                isPositivePolarity      = False,
+                cubicSpline             = True,
+                cubicSplineRenderPoints = 200,
+                analyticCubicSpline     = False):
+    if cubicSpline and analyticCubicSpline:
+        return calcCFDTimeCubicSpline(x, y, cfdVoltage, isPositivePolarity)
+    
+    time   = 0.0
+    reject = True
+    
+    if not isPositivePolarity: #negative
+        arg = np.argmin(y)
+    else:                      #positive
+        arg = np.argmax(y)
+    
+    # using cubic spline interpolation?
+    if cubicSpline:
+        index = -1
+        
+        for i in range(arg, 0, -1):
+            if (not isPositivePolarity and y[i] <= cfdVoltage and y[i-1] >= cfdVoltage) or (isPositivePolarity and y[i] >= cfdVoltage and y[i-1] <= cfdVoltage):
+                index = i
+                break
+            
+        if index <= 2:
+            return time, reject
+        
+        xRenderPoints = np.zeros(cubicSplineRenderPoints)
+        yCubicValues  = np.zeros(cubicSplineRenderPoints)
+        
+        time_lower = x[index-1]
+        time_upper = x[index]
+        
+        timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
+        
+        spline = CubicSpline(x, y)
+        
+        for cubic in range(0, cubicSplineRenderPoints):
+            xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
+            yCubicValues[cubic]  = spline(xRenderPoints[cubic])
+            
+        # linear interpolation between the rendered points
+        x   = xRenderPoints
+        y   = yCubicValues
+        arg = cubicSplineRenderPoints-1
+        
+    for i in range(arg, 0, -1):
+        if (not isPositivePolarity and y[i] <= cfdVoltage and y[i-1] >= cfdVoltage) or (isPositivePolarity and y[i] >= cfdVoltage and y[i-1] <= cfdVoltage):
+            slope     = (y[i-1]-y[i])/(x[i-1]-x[i])
+            intercept = y[i] - slope*x[i]
+            
+            if (not isPositivePolarity and slope >= 0) or (isPositivePolarity and slope <= 0) or i <= 2:
+                break
+            
+            time   = (cfdVoltage - intercept)/slope
+            reject = False
+            
+    return time, reject
+
+"""
+
+ This function calculates the time difference, i.e. the lifetime between two detector pulses using the constant fraction (CF) principle (see 'calcCFDTime(..)').
+ 
+"""
+
+def calcLifetime(xStart                  = [], 
+                 yStart                  = [], 
+                 xStop                   = [], 
+                 yStop                   = [],
+                 cfd_level_start         = 25.0,
+                 cfd_level_stop          = 25.0,
+                 amplitudeStart          = 0.0,
+                 amplitudeStop           = 0.0,
+                 isPositivePolarity      = False,
+                 cubicSpline             = True,
+                 cubicSplineRenderPoints = 200,
+                 analyticCubicSpline     = False):
+    cfdVoltageStart = cfd_level_start*0.01*amplitudeStart
+    cfdVoltageStop  = cfd_level_stop *0.01*amplitudeStop
+    
+    timeStart, rejectStart = calcCFDTime(xStart, yStart, cfdVoltageStart, isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+    timeStop,  rejectStop  = calcCFDTime(xStop,  yStop,  cfdVoltageStop,  isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+                           
+    return 1000.0*(timeStop - timeStart), (rejectStart or rejectStop)
+
+"""
+
+ This function is the counterpart of 'calcCFDTime(..)' for a block of detector pulses, i.e. 2D arrays 'time' and 'voltage' 
+ of shape (number of pulses, number of cells) with the amplitudes 'amplitude' of each pulse and the CF level 'cfd_level' in percentage (%).
+ 
+ The linear interpolation is applied on the entire block by array operations: 
+     
+ Walking backwards from the maximum/minimum, 'calcCFDTime(..)' interpolates at each sampling point passing the CF level 
+ until a crossing fails the reject rules (slope, cell <= 2). Hence, the resulting time is obtained at the earliest crossing 
+ above the latest failing crossing before the maximum/minimum.
+ 
+ return: 
+     
+     (1) array of times of the CF level and
+     (2) array of reject flags.
+     
+"""
+
+def calcCFDTimes(time, 
+                 voltage, 
+                 amplitude,
+                 cfd_level               = 25.0,
+                 isPositivePolarity      = False,
+                 cubicSpline             = True,
+                 cubicSplineRenderPoints = 200,
+                 analyticCubicSpline     = False):
+    numberOfPulses, numberOfCells = voltage.shape
+    
+    cfdVoltage = cfd_level*0.01*np.broadcast_to(amplitude, (numberOfPulses,))
+    
+    times  = np.zeros(numberOfPulses)
+    reject = np.ones(numberOfPulses, dtype=bool)
+    
+    if cubicSpline:
+        for k in range(numberOfPulses):
+            times[k], reject[k] = calcCFDTime(time[k], voltage[k], cfdVoltage[k], isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+            
+        return times, reject
+    
+    if not numberOfPulses:
+        return times, reject
+    
+    rows  = np.arange(numberOfPulses)
+    cells = np.arange(1, numberOfCells)[np.newaxis, :] # cell 'i' of the crossing [i-1, i]
+    c     = cfdVoltage[:, np.newaxis]
+    
+    if not isPositivePolarity: #negative
+        arg      = np.argmin(voltage, axis=1)
+        crossing = (voltage[:, 1:] <= c) & (voltage[:, :-1] >= c)
+    else:                      #positive
+        arg      = np.argmax(voltage, axis=1)
+        crossing = (voltage[:, 1:] >= c) & (voltage[:, :-1] <= c)
+        
+    crossing &= cells <= arg[:, np.newaxis]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (voltage[:, :-1]-voltage[:, 1:])/(time[:, :-1]-time[:, 1:])
+        
+    if not isPositivePolarity:
+        failing = crossing & ((slope >= 0) | (cells <= 2))
+    else:
+        failing = crossing & ((slope <= 0) | (cells <= 2))
+        
+    # latest failing crossing before the maximum/minimum (0 if none)
+    lastFailing = np.max(np.where(failing, cells, 0), axis=1)
+    
+    accepted = crossing & ~failing & (cells > lastFailing[:, np.newaxis])
+    
+    reject = ~np.any(accepted, axis=1)
+    
+    # earliest accepted crossing
+    i = np.argmax(accepted, axis=1) + 1
+    i = i[~reject]
+    k = rows[~reject]
+    
+    # solve for the CF level in float64 (also for float32 pulses)
+    x0, x1 = time[k, i-1].astype(np.float64),    time[k, i].astype(np.float64)
+    y0, y1 = voltage[k, i-1].astype(np.float64), voltage[k, i].astype(np.float64)
+    
+    slope     = (y0-y1)/(x0-x1)
+    intercept = y1 - slope*x1
+    
+    times[k] = (cfdVoltage[k] - intercept)/slope
+    
+    return times, reject
+
+"""
+
+ This function is the counterpart of 'calcLifetime(..)' for blocks of start and stop pulses (see 'calcCFDTimes(..)').
+ 
+ return: 
+     
+     (1) array of lifetimes [ps] and
+     (2) array of reject flags.
+     
+"""
+
+def calcLifetimes(xStart, 
+                  yStart, 
+                  xStop, 
+                  yStop,
+                  cfd_level_start         = 25.0,
+                  cfd_level_stop          = 25.0,
+                  amplitudeStart          = 0.0,
+                  amplitudeStop           = 0.0,
+                  isPositivePolarity      = False,
+                  cubicSpline             = True,
+                  cubicSplineRenderPoints = 200,
+                  analyticCubicSpline     = False):
+    timeStart, rejectStart = calcCFDTimes(xStart, yStart, amplitudeStart, cfd_level_start, isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+    timeStop,  rejectStop  = calcCFDTimes(xStop,  yStop,  amplitudeStop,  cfd_level_stop,  isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+    
+    return 1000.0*(timeStop - timeStart), (rejectStart | rejectStop)
+
+"""
+
+ This function reads the first 'numberOfPulses' valid pulses (see 'normalizeData(..)') of the pulse stream 'fileName' 
+ block by block (see 'openPulseStream(..)') and returns them preprocessed according to 'machineInput' (median filter, 
+ baseline correction and normalization) as 2D array of shape (number of valid pulses, number of cells).
+ 
+ 'fileName' might be a manifest, glob pattern or list of pulse-stream files (see 'DPulseStreamDataset').
+ 
+ If 'numberOfPulses' == -1 (default), all valid pulses of the pulse stream are returned.
+ 
+ If a 'featureCache' (DFeatureCache()) is given, the feature matrix is served from the cache (if available).
+ 
+"""
+
+def readValidPulses(fileName           = '/pulseStream', 
+                    numberOfPulses     = -1,
+                    isPositivePolarity = False,
+                    machineInput       = DMachineParams(),
+                    blockSize          = 1000,
+                    debug              = False,
+                    featureCache       = None):
+    if featureCache is not None:
+        return featureCache.readValidPulses(fileName, numberOfPulses, isPositivePolarity, machineInput, blockSize, debug)
+    
+    reader = openPulseStream(fileName)
+    
+    numberOfCells = reader.m_numberOfCells
+    fileSize      = pulseStreamSizeInBytes(fileName)
+    
+    if debug:
+        print('number of cells:  {0}'.format(numberOfCells))
+        print('sweep in ns:      {0}'.format(reader.m_sweepInNanoseconds))
+        print('frequency in GHz: {0}'.format(reader.m_frequencyInGHz))
+        print('number of pulses: {0}\n'.format(reader.numberOfPulses()))
+        
+    pulseBytes = reader.recordBytes()
+    readBytes  = reader.m_headerBytes #header offset
+    
+    x_array = []
+    
+    numberOfValidPulses = 0
+    
+    start = 0
+    
+    while start < reader.numberOfPulses():
+        # read no more pulses than still required
+        count = blockSize if numberOfPulses < 0 else min(blockSize, numberOfPulses - numberOfValidPulses)
+        
+        __, voltage = reader.readBlock(start, count)
+        
+        start     += len(voltage)
+        readBytes += len(voltage)*pulseBytes
+        
+        voltage_norm, valid = preprocessPulses(voltage, machineInput, isPositivePolarity)
+        
+        x_array.append(voltage_norm[valid])
+        
+        numberOfValidPulses += len(x_array[-1])
+            
+        if debug:
+            sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSize/1024)/1000, start, reader.numberOfPulses()))
+            
+        if numberOfPulses > -1 and numberOfValidPulses >= numberOfPulses:
+            break
+    
+    reader.close()
+    
+    if not len(x_array):
+        return np.zeros((0, numberOfCells))
+    
+    x_array = np.concatenate(x_array)
+    
+    return x_array if numberOfPulses < 0 else x_array[:numberOfPulses]
+
+"""
+
+ This function draws a seeded random sample of 'numberOfPulses' valid pulses (see 'normalizeData(..)') from the pulse 
+ stream 'fileName' (see 'openPulseStream(..)') and returns them preprocessed like 'readValidPulses(..)'. Only the records 
+ of the drawn pulses are read, i.e. the cost scales with the sample size and not with the size of the pulse stream.
+ 
+ sampling:
+     
+     'uniform'    >> the pulses are drawn uniformly without replacement from the entire pulse stream. Invalid pulses are 
+                     replaced by further draws.
+     'stratified' >> the pulse stream is divided into 'numberOfPulses' strata of (nearly) equal length and one pulse is 
+                     drawn per stratum (stratified by position), which represents drifts during a long acquisition run. 
+                     Invalid pulses are replaced by their successors within the stratum.
+ 
+ The same 'seed' (int) reproduces the sample. Fewer pulses are returned, if the pulse stream does not contain 
+ enough valid pulses (or strata without any valid pulse).
+ 
+ return: 
+     
+     (1) 2D array of shape (number of pulses, number of cells) in the order of the pulse stream and 
+     (2) the positions of the pulses in the pulse stream.
+     
+"""
+
+def sampleValidPulses(fileName           = '/pulseStream', 
+                      numberOfPulses     = 1000,
+                      isPositivePolarity = False,
+                      machineInput       = DMachineParams(),
+                      sampling           = 'uniform',
+                      seed               = None,
+                      debug              = False):
+    if not sampling in ('uniform', 'stratified'):
+        raise ValueError("unknown sampling '{0}' (use 'uniform' or 'stratified').".format(sampling))
+        
+    reader = openPulseStream(fileName)
+    rng    = np.random.default_rng(seed)
+    
+    numberOfCells       = reader.m_numberOfCells
+    numberOfPulsesInAll = reader.numberOfPulses()
+    numberOfPulses      = max(0, min(numberOfPulses, numberOfPulsesInAll))
+    
+    indexes = []
+    x_array = []
+    
+    numberOfValidPulses = 0
+    numberOfReadPulses  = 0
+    
+    if sampling == 'stratified':
+        first  = (np.arange(numberOfPulses, dtype=np.int64)*numberOfPulsesInAll)//numberOfPulses
+        length = (np.arange(1, numberOfPulses + 1, dtype=np.int64)*numberOfPulsesInAll)//numberOfPulses - first
+        offset = rng.integers(0, np.maximum(length, 1))
+        
+        tries  = np.zeros(numberOfPulses, dtype=np.int64)
+        filled = np.zeros(numberOfPulses, dtype=bool)
+        
+    drawn = np.zeros(0, dtype=np.int64)
+    
+    while numberOfValidPulses < numberOfPulses:
+        if sampling == 'stratified':
+            # the next candidate of each stratum without a valid pulse so far
+            strata = np.flatnonzero(~filled & (tries < length))
+            
+            if not len(strata):
+                break
+            
+            candidates = first[strata] + (offset[strata] + tries[strata])%length[strata]
+            
+            tries[strata] += 1
+        else:
+            if len(drawn) == numberOfPulsesInAll:
+                break
+            
+            # the number of draws is adapted to the fraction of valid pulses so far
+            fraction = numberOfValidPulses/len(drawn) if len(drawn) else 1.0
+            
+            numberOfDraws = min(numberOfPulsesInAll - len(drawn), int(np.ceil(1.1*(numberOfPulses - numberOfValidPulses)/max(fraction, 0.01))))
+            
+            if 2*(len(drawn) + numberOfDraws) > numberOfPulsesInAll:
+                candidates = rng.choice(np.setdiff1d(np.arange(numberOfPulsesInAll), drawn), numberOfDraws, replace=False)
+            else:
+                candidates = rng.choice(numberOfPulsesInAll, numberOfDraws, replace=False)
+                candidates = candidates[~np.isin(candidates, drawn)]
+                
+            drawn = np.concatenate((drawn, candidates))
+            
+        # read in ascending order, but keep the order of the draws for the selection
+        order = np.argsort(candidates, kind='stable')
+        
+        __, voltage = reader.readPulses(candidates[order])
+        
+        numberOfReadPulses += len(voltage)
+        
+        voltage_norm, valid = preprocessPulses(voltage, machineInput, isPositivePolarity)
+        
+        if sampling == 'stratified':
+            selected = np.flatnonzero(valid)
+            
+            filled[strata[order[selected]]] = True
+        else:
+            selected = np.flatnonzero(valid)
+            selected = np.sort(selected[np.argsort(order[selected], kind='stable')][:numberOfPulses - numberOfValidPulses])
+            
+        indexes.append(candidates[order][selected])
+        x_array.append(voltage_norm[selected])
+        
+        numberOfValidPulses += len(selected)
+        
+        if debug:
+            sys.stdout.write('\rsampled pulses: [{0}/{1}] valid <<>> {2} pulses read of {3}'.format(numberOfValidPulses, numberOfPulses, numberOfReadPulses, numberOfPulsesInAll))
+            
+    reader.close()
+    
+    if not len(x_array):
+        return np.zeros((0, numberOfCells)), np.zeros(0, dtype=np.int64)
+    
+    indexes = np.concatenate(indexes)
+    x_array = np.concatenate(x_array)
+    
+    order = np.argsort(indexes, kind='stable')
+    
+    return x_array[order], indexes[order]
+
+"""
+
+ This function returns the (valid) pulses of 'fileName' used for TRAINing: the first 'numberOfPulses' valid pulses 
+ (see 'readValidPulses(..)') if 'sampling' == '', otherwise a random sample (see 'sampleValidPulses(..)').
+ 
+"""
+
+def readTrainingPulses(fileName           = '/pulseStream', 
+                       numberOfPulses     = -1,
+                       isPositivePolarity = False,
+                       machineInput       = DMachineParams(),
+                       blockSize          = 1000,
+                       debug              = False,
+                       featureCache       = None,
+                       sampling           = '',
+                       seed               = None):
+    if sampling == '' or numberOfPulses < 0:
+        return readValidPulses(fileName, numberOfPulses, isPositivePolarity, machineInput, blockSize, debug, featureCache)
+    
+    return sampleValidPulses(fileName, numberOfPulses, isPositivePolarity, machineInput, sampling, seed, debug)[0]
+
+"""
+
+ This class provides a persistent on-disk cache of the feature matrices returned by 'readValidPulses(..)'. 
+ 
+ Pipelines like 'runPipelineGrid(..)' call 'trainAndTest(..)' for each grid point and, thus, re-read, 
+ re-filter and re-normalize the same pulse streams over and over again. Using a cache, the raw data is only 
+ touched once per pulse stream and distinct preprocessing setting.
+ 
+ The key of a cache entry covers:
+     
+     (1) the identity of the pulse stream (path, size and modification time of each file),
+     (2) the polarity and 
+     (3) the preprocessing fields of DMachineParams() (baseline correction and median filter).
+     
+ On a cache miss at least 'prefetchPulses' valid pulses are read and stored (-1: entire pulse stream), so that 
+ subsequent requests of the same or a smaller number of pulses are served from the cache.
+ 
+ If the size of all cache entries exceeds 'maxSizeInMB', the least recently used entries are removed.
+ 
+ usage:
+     
+     featureCache = DFeatureCache('/featureCache', maxSizeInMB=2048)
+     
+     runPipelineGrid(..., featureCache=featureCache)
+ 
+"""
+
+class DFeatureCache():
+    m_version = 1 # increase, if the preprocessing changes
+    
+    def __init__(self, cacheDirectory = '/featureCache', maxSizeInMB = 1024, prefetchPulses = 10000):
+        self.m_cacheDirectory  = cacheDirectory
+        self.m_maxSizeInBytes  = int(maxSizeInMB*1024*1024)
+        self.m_prefetchPulses  = prefetchPulses
+        
+        # statistics
+        self.m_hits            = 0
+        self.m_misses          = 0
+        
+        os.makedirs(cacheDirectory, exist_ok=True)
+        
+    def key(self, fileName = '/pulseStream', isPositivePolarity = False, machineInput = DMachineParams()):
+        files = []
+        
+        # identity of each file of a manifest, glob pattern or list (see 'expandPulseStreamFileNames(..)')
+        for name, __, __ in expandPulseStreamFileNames(fileName):
+            stat = os.stat(name)
+            
+            files.append((os.path.abspath(name), stat.st_size, stat.st_mtime_ns))
+        
+        # settings, which are not applied, do not affect the features:
+        baseline     = (machineInput.m_startCell, machineInput.m_cellRegion) if machineInput.m_correctForBaseline else None
+        medianFilter = machineInput.m_windowSize if machineInput.m_medianFilter else None
+        
+        identity = (self.m_version,) + (files[0] if len(files) == 1 else tuple(files)) + (bool(isPositivePolarity), baseline, medianFilter)
+        
+        return hashlib.sha1(repr(identity).encode('utf-8')).hexdigest()
+    
+    def entryFileName(self, key):
+        return os.path.join(self.m_cacheDirectory, key + '.npz')
+    
+    """
+    
+     This function is a drop-in replacement for 'readValidPulses(..)' returning exactly the same feature matrix.
+     
+    """
+    
+    def readValidPulses(self, 
+                        fileName           = '/pulseStream', 
+                        numberOfPulses     = -1,
+                        isPositivePolarity = False,
+                        machineInput       = DMachineParams(),
+                        blockSize          = 1000,
+                        debug              = False):
+        entryFileName = self.entryFileName(self.key(fileName, isPositivePolarity, machineInput))
+        
+        x_array = None
+        
+        if os.path.exists(entryFileName):
+            try:
+                with np.load(entryFileName) as entry:
+                    # a complete entry contains all valid pulses of the pulse stream
+                    if bool(entry['complete']) or (numberOfPulses > -1 and len(entry['features']) >= numberOfPulses):
+                        x_array = entry['features']
+                        
+                os.utime(entryFileName) # LRU: mark as recently used
+            except (OSError, ValueError, KeyError):
+                x_array = None # corrupt or concurrently removed entry
+                
+        if x_array is not None:
+            self.m_hits += 1
+            
+            if debug:
+                print('feature cache hit: {0} ({1} valid pulses)'.format(fileName, len(x_array)))
+                
+            return x_array if numberOfPulses < 0 else x_array[:numberOfPulses]
+        
+        self.m_misses += 1
+        
+        numberOfPulsesToRead = -1
+        
+        if numberOfPulses > -1 and self.m_prefetchPulses > -1:
+            numberOfPulsesToRead = max(numberOfPulses, self.m_prefetchPulses)
+            
+        x_array = readValidPulses(fileName, numberOfPulsesToRead, isPositivePolarity, machineInput, blockSize, debug)
+        
+        self.store(entryFileName, x_array, numberOfPulsesToRead == -1 or len(x_array) < numberOfPulsesToRead)
+        
+        return x_array if numberOfPulses < 0 else x_array[:numberOfPulses]
+    
+    def store(self, entryFileName, x_array, complete):
+        if x_array.nbytes > self.m_maxSizeInBytes:
+            return
+        
+        # write to a temporary file first, so that concurrent readers never see an incomplete entry
+        tmpFileName = '{0}.{1}.tmp'.format(entryFileName, os.getpid())
+        
+        with open(tmpFileName, 'wb') as file:
+            np.savez(file, features=x_array, complete=complete)
+            
+        # the entry (incl. the npz overhead) must fit into the cache
+        sizeInBytes = os.path.getsize(tmpFileName)
+        
+        if sizeInBytes > self.m_maxSizeInBytes:
+            os.remove(tmpFileName)
+            return
+        
+        self.evict(self.m_maxSizeInBytes - sizeInBytes)
+        
+        os.replace(tmpFileName, entryFileName)
+        
+    """
+    
+     This function removes the least recently used entries until the size of the cache is <= 'maxSizeInBytes'.
+     
+    """
+    
+    def evict(self, maxSizeInBytes = 0):
+        entries = []
+        
+        for name in os.listdir(self.m_cacheDirectory):
+            if not name.endswith('.npz'):
+                continue
+            
+            try:
+                stat = os.stat(os.path.join(self.m_cacheDirectory, name))
+            except OSError:
+                continue
+            
+            entries.append((stat.st_mtime, stat.st_size, name))
+            
+        entries.sort()
+        
+        sizeInBytes = sum(entry[1] for entry in entries)
+        
+        for __, size, name in entries:
+            if sizeInBytes <= maxSizeInBytes:
+                break
+            
+            try:
+                os.remove(os.path.join(self.m_cacheDirectory, name))
+            except OSError:
+                pass
+            
+            sizeInBytes -= size
+            
+    def clear(self):
+        self.evict(0)
+
+"""
+
+ This function can be used to TRAIN and TEST a machine's classifier from only ONE data set of streamed 
+ pulses 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
+
+ If 'splitAfterNPulses' == -1 (default), the pulses in the respective 
+ pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses' are splitted after 50% 
+ of pulses read and used for the TRAINing process. The remaining 50% of streamed pulses are 
+ considered for TESTing the TRAINed machine's classifier.
+ 
+ If 'sampling' is 'uniform' or 'stratified', twice 'splitAfterNPulses' valid pulses are drawn randomly (see 'sampleValidPulses(..)') 
+ instead and split alternately (in the order of the pulse stream) into the TRAIN and TEST pulses.
+ 
+ return: 
+     
+     (1) DMachineParams() from the learned machine and 
+     (2) the prediction accuracy [0.0-1.0].
+ 
+"""
+
+def splitTrainAndTest(fileNameCorrectPulses = '/correct', 
+                      fileNameRejectPulses  = '/reject',  
+                      isPositivePolarity    = False,
+                      splitAfterNPulses     = -1,
+                      machineInput          = DMachineParams(),
+                      blockSize             = 1000,
+                      featureCache          = None,
+                      sampling              = '',
+                      seed                  = None):
+    mlInput = machineInput.copy()
+    
+    # train data
+    x_array_train   = []
+    y_array_train   = []
+    
+    # test data
+    x_array_test    = []
+    y_array_test    = []
+    
+    # (1) REJECT pulses (FALSE (0) means 'bad' pulses) and (2) CORRECT pulses (TRUE (1) means 'good' pulses):
+    for fileName, label in [(fileNameRejectPulses, 0), (fileNameCorrectPulses, 1)]:
+        reader = openPulseStream(fileName)
+        
+        numberOfPulses_train = reader.numberOfPulses()//2
+        
+        reader.close()
+        
+        if not splitAfterNPulses == -1:
+            numberOfPulses_train = splitAfterNPulses
+            
+        numberOfPulses_test = numberOfPulses_train
+        
+        x_array = readTrainingPulses(fileName, numberOfPulses_train + numberOfPulses_test, isPositivePolarity, mlInput, blockSize, False, featureCache, sampling, seed)
+        
+        if sampling == '':
+            x_array_train.append(x_array[:numberOfPulses_train])
+            x_array_test.append(x_array[numberOfPulses_train:])
+        else:
+            x_array_train.append(x_array[0::2])
+            x_array_test.append(x_array[1::2])
+            
+        y_array_train.append(np.full(len(x_array_train[-1]), label))
+        y_array_test.append(np.full(len(x_array_test[-1]), label))
+                   
+    mlInput.fit(np.concatenate(x_array_train), np.concatenate(y_array_train))
+        
+    x_array_train.clear()
+    y_array_train.clear()
+    
+    return mlInput.score(np.concatenate(x_array_test), np.concatenate(y_array_test)), mlInput
+      
+"""
+
+ This function determines the prediction accuracy of a TRAINed machine's classifier 'machineInput' by TESTing
+ a different set of pulse streams containing correct and wrong pulses 'fileNameCorrectPulses' and 'fileNameRejectPulses' 
+ repectively.
+ 
+ If 'splitAfterNPulses' == -1 (default), the entire number of pulses from the given pulse streams 
+ 'fileNameCorrectPulses' and 'fileNameRejectPulses' are used for TESTing. Otherwise, the set number 
+ 'splitAfterNPulses' is considered for both pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
+ 
+ return: 
+     
+     (1) prediction accuracy [0.0-1.0].
+     
+"""
+
+def predictPulses(fileNameCorrectPulses = '/correct', 
+                  fileNameRejectPulses  = '/reject', 
+                  isPositivePolarity    = False,
+                  splitAfterNPulses     = -1,
+                  machineInput          = DMachineParams(),
+                  debug                 = True,
+                  blockSize             = 1000,
+                  featureCache          = None):
+    mlInput = machineInput.copy()
+    
+    # the pulse streams are read until more than 'splitAfterNPulses' valid pulses are collected
+    numberOfPulses = splitAfterNPulses + 1 if splitAfterNPulses > -1 else -1
+    
+    # (1) REJECT pulses:
+    if debug:
+        print("(1) >> teach machine with REJECT pulses:\n")
+        
+    x_reject = readValidPulses(fileNameRejectPulses, numberOfPulses, isPositivePolarity, mlInput, blockSize, debug, featureCache)
+    
+    # (2) CORRECT pulses:
+    if debug:
+        print("(2) >> teach machine with CORRECT pulses:\n")
+        
+    x_correct = readValidPulses(fileNameCorrectPulses, numberOfPulses, isPositivePolarity, mlInput, blockSize, debug, featureCache)
+    
+    x_array = np.concatenate((x_reject, x_correct))
+    y_array = np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(len(x_correct), dtype=int))) # << FALSE (0) means bad pulses (REJECT), TRUE (1) means good pulses (CORRECT)
+        
+    score = mlInput.score(x_array, y_array)
+    
+    if debug:
+        sys.stdout.write('\nscore: {0}%'.format(score*100.0))
+    
+    return score
+
+"""
+
+ This function reports the trade-off between prediction accuracy and throughput of the two-stage cascade (see 'DMachineParams') 
+ of a TRAINed machine 'machineInput' with pre-classifier on the same TESTing pulse streams as 'predictPulses(..)': 
+     
+ The classifier alone, the pre-classifier alone and the cascade for each pair of (reject, accept) thresholds in 'thresholds' 
+ predict all valid pulses. The throughput is the best of 'repeats' runs of the prediction (without reading and preprocessing).
+ 
+ return: 
+     
+     (1) list of the thresholds: 'classifier' (classifier alone), 'preClassifier' (pre-classifier alone) or (reject, accept),
+     (2) list of the prediction accuracies [0.0-1.0] for each (1),
+     (3) list of the throughputs [pulses/s] for each (1),
+     (4) list of the fractions [0.0-1.0] of the pulses passed to the classifier for each (1),
+     (5) list of the fractions [0.0-1.0] of the pulses predicted the same as by the classifier alone for each (1).
+     
+"""
+
+def runClassifierCascade(fileNameCorrectPulses = '/correct', 
+                         fileNameRejectPulses  = '/reject', 
+                         isPositivePolarity    = False,
+                         splitAfterNPulses     = -1,
+                         machineInput          = DMachineParams(),
+                         thresholds            = [(0.01, 0.99), (0.05, 0.95), (0.1, 0.9), (0.2, 0.8), (0.3, 0.7)],
+                         repeats               = 3,
+                         debug                 = True,
+                         blockSize             = 1000,
+                         featureCache          = None):
+    if machineInput.m_preClassifier is None:
+        raise ValueError('the machine has no pre-classifier')
+    
+    mlInput = machineInput.copy()
+    
+    # the pulse streams are read until more than 'splitAfterNPulses' valid pulses are collected
+    numberOfPulses = splitAfterNPulses + 1 if splitAfterNPulses > -1 else -1
+    
+    x_reject  = readValidPulses(fileNameRejectPulses,  numberOfPulses, isPositivePolarity, mlInput, blockSize, False, featureCache)
+    x_correct = readValidPulses(fileNameCorrectPulses, numberOfPulses, isPositivePolarity, mlInput, blockSize, False, featureCache)
+    
+    x_array = np.concatenate((x_reject, x_correct))
+    y_array = np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(len(x_correct), dtype=int))) # << FALSE (0) means bad pulses (REJECT), TRUE (1) means good pulses (CORRECT)
+    
+    __, probabilityOfCorrect = classifierPredictionWithProbability(mlInput.m_preClassifier, x_array)
+    
+    prediction_classifier = mlInput.m_classifier.predict(x_array)
+    
+    plArrThresholds = []
+    plArrAccuracy   = []
+    plArrThroughput = []
+    plArrUncertain  = []
+    plArrAgreement  = []
+    
+    for threshold in ['classifier', 'preClassifier'] + list(thresholds):
+        if threshold == 'classifier':
+            predict = mlInput.m_classifier.predict
+        elif threshold == 'preClassifier':
+            mlInput.m_preRejectThreshold, mlInput.m_preAcceptThreshold = 0.5, 0.5 # no uncertain band
+            
+            predict = mlInput.predict
+        else:
+            mlInput.m_preRejectThreshold, mlInput.m_preAcceptThreshold = threshold
+            
+            predict = mlInput.predict
+            
+        duration = float('inf')
+        
+        for __ in range(max(1, repeats)):
+            start = monotonic()
+            
+            prediction = predict(x_array)
+            
+            duration = min(duration, monotonic() - start)
+            
+        if threshold == 'classifier':
+            uncertain = 1.0
+        else:
+            uncertain = np.mean((probabilityOfCorrect > mlInput.m_preRejectThreshold) & (probabilityOfCorrect < mlInput.m_preAcceptThreshold))
+            
+        plArrThresholds.append(threshold)
+        plArrAccuracy.  append(np.mean(prediction == y_array))
+        plArrThroughput.append(len(x_array)/duration if duration > 0.0 else float('inf'))
+        plArrUncertain. append(uncertain)
+        plArrAgreement. append(np.mean(prediction == prediction_classifier))
+        
+    if debug:
+        print('{0:<16}{1:>12}{2:>16}{3:>14}{4:>12}'.format('thresholds', 'accuracy', 'pulses/s', 'classifier', 'agreement'))
+        
+        for threshold, accuracy, throughput, uncertain, agreement in zip(plArrThresholds, plArrAccuracy, plArrThroughput, plArrUncertain, plArrAgreement):
+            print('{0:<16}{1:>11.4f}%{2:>16.0f}{3:>13.1f}%{4:>11.2f}%'.format(str(threshold), 100.0*accuracy, throughput, 100.0*uncertain, 100.0*agreement))
+            
+    return plArrThresholds, plArrAccuracy, plArrThroughput, plArrUncertain, plArrAgreement
+
+"""
+
+ This function TRAINs the machine's classifier from the pulse streams containing the correct and wrong pulses 
+ 'fileNameCorrectPulses' and 'fileNameRejectPulses', respectively. Each of them might be a manifest, glob pattern or 
+ list of pulse-stream files (see 'DPulseStreamDataset').
+ 
+ If 'splitAfterNPulsesX' == -1 (default), the entire number of pulses from the given pulse streams 
+ 'fileNameCorrectPulses' and 'fileNameRejectPulses' are used for TRAINing. Otherwise, the set number 
+ 'splitAfterNPulsesX' is considered for both 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
+ 
+ If 'sampling' is 'uniform' or 'stratified' (and 'splitAfterNPulsesX' > -1), the pulses are drawn randomly from the entire 
+ pulse streams using 'seed' (see 'sampleValidPulses(..)') instead of taking the first pulses.
+ 
+ If 'outputMachineFileName' == '', the TRAINed machine isn't stored in a file (*joblib). 
+ 
+ return: 
+     
+     (1) TRAINed machine (DMachineParams()).
+     
+"""
+    
+def trainPulses(fileNameCorrectPulses    = '/correct', 
+                fileNameRejectPulses     = '/reject', 
+                outputMachineFileName    = '/machine', 
+                isPositivePolarity       = False,
+                splitAfterNPulsesCorrect = -1,
+                splitAfterNPulsesReject  = -1,
+                machineInput             = DMachineParams(),
+                debug                    = True,
+                blockSize                = 1000,
+                featureCache             = None,
+                sampling                 = '',
+                seed                     = None):
+    mlInput = machineInput.copy()
+    
+    # the pulse streams are read until more than 'splitAfterNPulsesX' valid pulses are collected
+    numberOfPulsesCorrect = splitAfterNPulsesCorrect + 1 if splitAfterNPulsesCorrect > -1 else -1
+    numberOfPulsesReject  = splitAfterNPulsesReject  + 1 if splitAfterNPulsesReject  > -1 else -1
+    
+    # (1) REJECT pulses:
+    if debug:
+        print("(1) >> teach machine with REJECT pulses:\n")
+        
+    x_reject = readTrainingPulses(fileNameRejectPulses, numberOfPulsesReject, isPositivePolarity, mlInput, blockSize, debug, featureCache, sampling, seed)
+    
+    # (2) CORRECT pulses:
+    if debug:
+        print("(2) >> teach machine with CORRECT pulses:\n")
+        
+    x_correct = readTrainingPulses(fileNameCorrectPulses, numberOfPulsesCorrect, isPositivePolarity, mlInput, blockSize, debug, featureCache, sampling, seed)
+    
+    x_array = np.concatenate((x_reject, x_correct))
+    y_array = np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(len(x_correct), dtype=int))) # << FALSE (0) means bad pulses (REJECT), TRUE (1) means good pulses (CORRECT)
+                
+    mlInput.fit(x_array, y_array)
+        
+    if not outputMachineFileName == '':
+        mlInput.save(outputMachineFileName)
+        
+    return mlInput
+        
+"""
+
+ This function is similar to 'trainPulses(..)' but, instead, applies batching (out-of-core fitting) internally 
+ to TRAIN the machine's classifier on large pulse streams, which do not fit the RAM.
+ 
+ If 'splitAfterNPulses' == -1 (default), the entire number pulses from the given pulse streams 
+ 'fileNameCorrectPulses' and 'fileNameRejectPulses' are used to TRAIN the machine's classifier. Otherwise, the set number 
+ 'splitAfterNPulses' is considered for both pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses'.
+ 
+ If 'outputMachineFileName' == '', the machine won't be stored in a file (*joblib). 
+ 
+ return: 
+     
+     (1) TRAINed machine (DMachineParams()).
+     
+"""
+
+def trainPulsesOnline(fileNameCorrectPulses = '/correct', 
+                      fileNameRejectPulses  = '/reject', 
+                      outputMachineFileName = '/machine', 
+                      isPositivePolarity    = False,
+                      chunkSize             = 5000, # according to the specs of scikit learn, set this number as near as possible to the RAM size.
+                      machineInput          = DMachineParams(),
+                      debug                 = True): 
+    mlInput = machineInput.copy()
+    
+    y_all = []
+    y_all.append(0) # bad  pulse (REJECT)
+    y_all.append(1) # good pulse (CORRECT)
+    
+    fileSizeTrue  = pulseStreamSizeInBytes(fileNameCorrectPulses)
+    fileSizeFalse = pulseStreamSizeInBytes(fileNameRejectPulses)
+    
+    # (1) REJECT pulses:
+    if debug:
+        print("(1) >> teach machine with REJECT pulses:\n")
+        
+    reader = openPulseStream(fileNameRejectPulses)
+    
+    numberOfCells  = reader.m_numberOfCells
+    pulseBytes     = reader.recordBytes()
+    numberOfPulses = reader.numberOfPulses()
+    
+    headerBytes    = reader.m_headerBytes
+    readBytes      = headerBytes #header offset
+    
+    if debug:
+        print('number of cells:  {0}'.format(numberOfCells))
+        print('sweep in ns:      {0}'.format(reader.m_sweepInNanoseconds))
+        print('frequency in GHz: {0}'.format(reader.m_frequencyInGHz))
+        print('number of pulses: {0}\n'.format(numberOfPulses))
+        
+    reader.close()
+    
+    pulseCounter = 0
+    
+    for __, voltage in iterPulseBlocks(fileNameRejectPulses, chunkSize):
+        readBytes += len(voltage)*pulseBytes
+        
+        voltage_norm, valid = preprocessPulses(voltage, mlInput, isPositivePolarity)
+        
+        x_array = voltage_norm[valid]
+        y_array = np.full(len(x_array), 0)
+        
+        pulseCounter += len(x_array)
+        
+        if debug:
+            sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeFalse/1024)/1000, (readBytes-headerBytes)//pulseBytes, numberOfPulses))
+            
+        if len(x_array) > 0:    
+            mlInput.partialFit(x_array, y_array, np.unique(y_all))
+        
+    # (2) CORRECT pulses:
+    if debug:
+        print("(2) >> teach machine with CORRECT pulses:\n")
+        
+    reader = openPulseStream(fileNameCorrectPulses)
+    
+    numberOfCells  = reader.m_numberOfCells
+    pulseBytes     = reader.recordBytes()
+    numberOfPulses = reader.numberOfPulses()
+    
+    headerBytes    = reader.m_headerBytes
+    readBytes      = headerBytes #header offset
+    
+    if debug:
+        print('number of cells:  {0}'.format(numberOfCells))
+        print('sweep in ns:      {0}'.format(reader.m_sweepInNanoseconds))
+        print('frequency in GHz: {0}'.format(reader.m_frequencyInGHz))
+        print('number of pulses: {0}\n'.format(numberOfPulses))
+        
+    reader.close()
+        
+    pulseCounter = 0
+    
+    for __, voltage in iterPulseBlocks(fileNameCorrectPulses, chunkSize):
+        readBytes += len(voltage)*pulseBytes
+        
+        voltage_norm, valid = preprocessPulses(voltage, mlInput, isPositivePolarity)
+        
+        x_array = voltage_norm[valid]
+        y_array = np.full(len(x_array), 1)
+        
+        pulseCounter += len(x_array)
+        
+        if debug:
+            sys.stdout.write('\rread data: [{0}/{1}] MB <<>> [{2}/{3}] pulses]'.format((readBytes/1024)/1000, (fileSizeTrue/1024)/1000, (readBytes-headerBytes)//pulseBytes, numberOfPulses))
+            
+        if len(x_array) > 0:    
+            mlInput.partialFit(x_array, y_array, np.unique(y_all))
+    
+    if not outputMachineFileName == '':
+        mlInput.save(outputMachineFileName)
+    
+    return mlInput
+
+"""
+
+ This class holds a uniform random sample (reservoir sampling, algorithm R) of at most 'capacity' pulses out of all 
+ pulses added block by block (see 'add(..)'), where the pulses are stored in a preallocated 2D array of 
+ shape (capacity, number of cells) and type(float32). The memory required is fixed, independent of the number of pulses added.
+ 
+ If 'out' is given, the pulses are stored in 'out' (2D array of shape (capacity, number of cells)) instead.
+ 
+ 'seed' might be an int or a np.random.Generator.
+ 
+"""
+
+class DPulseReservoir():
+    def __init__(self, capacity = 10000, numberOfCells = 1024, seed = None, out = None):
+        self.m_samples        = np.empty((capacity, numberOfCells), dtype=np.float32) if out is None else out
+        self.m_capacity       = capacity
+        self.m_numberOfPulses = 0 # added so far
+        self.m_rng            = np.random.default_rng(seed)
+        
+    def __len__(self):
+        return min(self.m_numberOfPulses, self.m_capacity)
+    
+    def add(self, x_array):
+        numberOfPulses = len(x_array)
+        
+        # (1) fill the reservoir:
+        fill = max(0, min(numberOfPulses, self.m_capacity - self.m_numberOfPulses))
+        
+        self.m_samples[self.m_numberOfPulses:self.m_numberOfPulses + fill] = x_array[:fill]
+        
+        # (2) the i-th pulse replaces a random slot with probability capacity/(i + 1):
+        if numberOfPulses > fill:
+            rows  = np.arange(fill, numberOfPulses)
+            slots = self.m_rng.integers(0, self.m_numberOfPulses + rows + 1)
+            
+            replace = slots < self.m_capacity
+            
+            # the last pulse drawn for a slot wins
+            slots, last = np.unique(slots[replace][::-1], return_index=True)
+            
+            self.m_samples[slots] = x_array[rows[replace][::-1][last]]
+            
+        self.m_numberOfPulses += numberOfPulses
+        
+    def samples(self):
+        return self.m_samples[:len(self)]
+
+"""
+
+ This function builds a TRAINing set of at most 'numberOfPulsesPerClass' valid pulses per class in ONE pass over the 
+ pulse streams 'fileNameCorrectPulses' and 'fileNameRejectPulses' (see 'DPulseReservoir'), i.e. each valid pulse of a 
+ pulse stream is contained with the same probability.
+ 
+ Both classes share ONE preallocated array of type(float32), so that the peak memory is bounded by 
+ 2 x 'numberOfPulsesPerClass' x number of cells x 4 bytes (+ one block of 'blockSize' pulses), independent of the size 
+ of the pulse streams.
+ 
+ return: 
+     
+     (1) 2D array of shape (number of pulses, number of cells) and type(float32) and
+     (2) the labels: FALSE (0) means bad pulses (REJECT), TRUE (1) means good pulses (CORRECT).
+     
+"""
+
+def buildReservoirTrainingSet(fileNameCorrectPulses  = '/correct', 
+                              fileNameRejectPulses   = '/reject', 
+                              numberOfPulsesPerClass = 10000,
+                              isPositivePolarity     = False,
+                              machineInput           = DMachineParams(),
+                              blockSize              = 1000,
+                              seed                   = None,
+                              debug                  = False):
+    numberOfCellsOfFiles = []
+    
+    for fileName in (fileNameRejectPulses, fileNameCorrectPulses):
+        reader = openPulseStream(fileName)
+        
+        numberOfCellsOfFiles.append(reader.m_numberOfCells)
+        
+        reader.close()
+        
+    numberOfCells = numberOfCellsOfFiles[0]
+    
+    if not numberOfCellsOfFiles[1] == numberOfCells:
+        raise IOError("'{0}' and '{1}' differ in the number of cells.".format(fileNameCorrectPulses, fileNameRejectPulses))
+        
+    rng = np.random.default_rng(seed)
+    
+    x_array = np.empty((2*numberOfPulsesPerClass, numberOfCells), dtype=np.float32)
+    
+    reservoirs = []
+    
+    # (1) REJECT pulses (FALSE (0) means 'bad' pulses) and (2) CORRECT pulses (TRUE (1) means 'good' pulses):
+    for fileName, label in [(fileNameRejectPulses, 0), (fileNameCorrectPulses, 1)]:
+        reservoir = DPulseReservoir(numberOfPulsesPerClass, numberOfCells, rng, x_array[label*numberOfPulsesPerClass:(label + 1)*numberOfPulsesPerClass])
+        
+        for __, voltage in iterPulseBlocks(fileName, blockSize):
+            voltage_norm, valid = preprocessPulses(voltage, machineInput, isPositivePolarity)
+            
+            reservoir.add(voltage_norm[valid])
+            
+            if debug:
+                sys.stdout.write('\rreservoir [{0}]: {1} of {2} valid pulses'.format(label, len(reservoir), reservoir.m_numberOfPulses))
+                
+        reservoirs.append(reservoir)
+        
+    numberOfReject, numberOfCorrect = len(reservoirs[0]), len(reservoirs[1])
+    
+    # close the gap of a partially filled REJECT reservoir (in place)
+    if numberOfReject < numberOfPulsesPerClass:
+        x_array[numberOfReject:numberOfReject + numberOfCorrect] = x_array[numberOfPulsesPerClass:numberOfPulsesPerClass + numberOfCorrect]
+        
+    y_array = np.concatenate((np.zeros(numberOfReject, dtype=int), np.ones(numberOfCorrect, dtype=int)))
+    
+    return x_array[:numberOfReject + numberOfCorrect], y_array
+
+"""
+
+ This function is similar to 'trainPulses(..)' but, instead, TRAINs the machine's classifier on a reservoir sample of at most 
+ 'numberOfPulsesPerClass' valid pulses per pulse stream (see 'buildReservoirTrainingSet(..)'), which is passed 
+ to 'fit(..)' without any copy. The memory required is fixed, independent of the size of the pulse streams.
+ 
+ If 'outputMachineFileName' == '', the machine won't be stored in a file (*joblib). 
+ 
+ return: 
+     
+     (1) TRAINed machine (DMachineParams()).
+     
+"""
+
+def trainPulsesReservoir(fileNameCorrectPulses  = '/correct', 
+                         fileNameRejectPulses   = '/reject', 
+                         outputMachineFileName  = '/machine', 
+                         isPositivePolarity     = False,
+                         numberOfPulsesPerClass = 10000,
+                         machineInput           = DMachineParams(),
+                         debug                  = True,
+                         blockSize              = 1000,
+                         seed                   = None):
+    mlInput = machineInput.copy()
+    
+    x_array, y_array = buildReservoirTrainingSet(fileNameCorrectPulses, fileNameRejectPulses, numberOfPulsesPerClass, isPositivePolarity, mlInput, blockSize, seed, debug)
+    
+    mlInput.fit(x_array, y_array)
+    
+    if not outputMachineFileName == '':
+        mlInput.save(outputMachineFileName)
+        
+    return mlInput
+     
+"""
+
+ This function can be used to TRAIN and TEST a machine's classifier from TWO data sets of correct ('fileNameCorrectPulses_train' & 'fileNameCorrectPulses_test') 
+ and wrong ('fileNameRejectPulses_train' & 'fileNameRejectPulses_test') streamed pulses.
+ 
+ This function is similar to 'splitTrainAndTest(..)', which instead needs only ONE data set of pulse streams.
+
+ If 'splitAfterNPulses_xx' == -1 (default), the entire number pulses from the pulse streams 
+ 'fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx' are used for TRAINing or TESTing. Otherwise, the given number 
+ 'splitAfterNPulses_xx' is considered for both pulse streams 'fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx'.
+ 
+ return: 
+     
+     (1) list, which contains the prediction accuracies [0.0-1.0] for each 'numberOfPulses_train',
+     (4) DMachineParams() from the learned machine.
+ 
+"""
+
+def trainAndTest(fileNameCorrectPulses_train = '/correct_train', 
                  fileNameRejectPulses_train  = '/reject_train',
                  fileNameCorrectPulses_test  = '/correct_test', 
                  fileNameRejectPulses_test   = '/reject_test',
@@ -1221,272 +2989,1535 @@ def trainAndTest(fileNameCorrectPulses_train = '/correct_train',
                  numberOfPulsesReject_train  = -1,
                  numberOfPulses_test         = -1,
                  isPositivePolarity          = False,
-                 machineInput                = DMachineParams()):
+                 machineInput                = DMachineParams(),
+                 featureCache                = None):
+    mlInput = machineInput.copy()
+    
+    # train
+    learnedMachine = trainPulses(fileNameCorrectPulses_train, 
+                                 fileNameRejectPulses_train, 
+                                 '', 
+                                 isPositivePolarity, 
+                                 numberOfPulsesCorrect_train,
+                                 numberOfPulsesReject_train,
+                                 mlInput, 
+                                 False,
+                                 featureCache = featureCache)
+    
+    # test
+    score = predictPulses(fileNameCorrectPulses_test, 
+                          fileNameRejectPulses_test, 
+                          isPositivePolarity,  
+                          numberOfPulses_test,
+                          learnedMachine,
+                          False,
+                          featureCache = featureCache)
+    
+    return score, learnedMachine
+
+"""
+
+ This function executes a pipeline on a TESTing ('_test') and TRAINing ('_train') set of 
+ streamed pulses ('fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx') by varying the 
+ number of TRAINed pulses for a given machine definition (classifier) 'machineInput'.
+
+ The list 'numberOfPulses_train' defines the region of N pulses used for the TRAINing cycle, f.e.: 
+     
+ [2, 50, 2] means: looping from 2 to (=)50 with an increment of 2. 
+ 
+ The number of TRAINed pulses 'numberOfPulses_train' is equally applied for CORRECT and REJECT pulses.
+ 
+ If 'learningCurve' == True, the pipeline is evaluated in a single pass (see 'runLearningCurveNPulses(..)').
+
+ return: 
+     
+     (1) list, which contains x-axis data: 'numberOfPulses_train',
+     (2) list, which contains the prediction accuracies [0.0-1.0] for each 'numberOfPulses_train' (1).
+ 
+"""
+
+def runPipelineNPulses(fileNameCorrectPulses_train = '/correct_train', 
+                       fileNameRejectPulses_train  = '/reject_train', 
+                       fileNameCorrectPulses_test  = '/correct_test', 
+                       fileNameRejectPulses_test   = '/correct_test', 
+                       numberOfPulses_train        = [2, 50, 1],
+                       numberOfPulses_test         = 1000,
+                       isPositivePolarity          = False,
+                       machineInput                = DMachineParams(),
+                       debug                       = True,
+                       featureCache                = None,
+                       learningCurve               = False):
+   if learningCurve:
+       return runLearningCurveNPulses(fileNameCorrectPulses_train, 
+                                      fileNameRejectPulses_train,
+                                      fileNameCorrectPulses_test, 
+                                      fileNameRejectPulses_test,
+                                      numberOfPulses_train,
+                                      numberOfPulses_test,
+                                      isPositivePolarity,
+                                      machineInput,
+                                      debug,
+                                      featureCache)
+       
+   mlInput = machineInput.copy()
+   
+   plArrX   = []
+   plArrY   = []
+   
+   size = (numberOfPulses_train[1] + numberOfPulses_train[2])/numberOfPulses_train[2]
+   counter = 0
+    
+   for N in range(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]): 
+       counter += 1
+       
+       score, __   = trainAndTest(fileNameCorrectPulses_train, 
+                                  fileNameRejectPulses_train,
+                                  fileNameCorrectPulses_test, 
+                                  fileNameRejectPulses_test,
+                                  N,
+                                  N,
+                                  numberOfPulses_test,
+                                  isPositivePolarity,
+                                  mlInput,
+                                  featureCache)
+       plArrX. append(N)
+       plArrY. append(score)
+       
+       if debug:
+           sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, size, 100.0*counter/size))
+       
+   return plArrX, plArrY
+
+"""
+
+ This function is similar to 'runPipelineNPulses(..)' but evaluates the learning curve in a single pass: 
+     
+ The TRAINing pulses for the largest N in 'numberOfPulses_train' and the TESTing pulses are read only once. 
+ Each N is then evaluated on the in-memory prefixes of the TRAINing pulses.
+ 
+ If the machine's classifier (and pre-classifier) supports 'partial_fit' (e.g. GaussianNB), the machine is updated incrementally 
+ by the pulses added from one N to the next (see 'DMachineParams.partialFit(..)'), if N decreases it is updated from scratch. Otherwise (e.g. CalibratedClassifierCV), a copy 
+ of the machine is fitted on each prefix, which yields exactly the same scores as 'runPipelineNPulses(..)'.
+ 
+ Note: the variance smoothing of GaussianNB is derived from the most recent 'partial_fit' batch. Thus, the scores 
+ of an incrementally updated GaussianNB can marginally deviate from a GaussianNB fitted from scratch.
+ 
+ return: 
+     
+     (1) list, which contains x-axis data: 'numberOfPulses_train',
+     (2) list, which contains the prediction accuracies [0.0-1.0] for each 'numberOfPulses_train' (1).
+ 
+"""
+
+def runLearningCurveNPulses(fileNameCorrectPulses_train = '/correct_train', 
+                            fileNameRejectPulses_train  = '/reject_train', 
+                            fileNameCorrectPulses_test  = '/correct_test', 
+                            fileNameRejectPulses_test   = '/correct_test', 
+                            numberOfPulses_train        = [2, 50, 1],
+                            numberOfPulses_test         = 1000,
+                            isPositivePolarity          = False,
+                            machineInput                = DMachineParams(),
+                            debug                       = True,
+                            featureCache                = None):
+   mlInput = machineInput.copy()
+   
+   plArrX   = []
+   plArrY   = []
+   
+   N_values = list(range(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]))
+   
+   if not len(N_values):
+       return plArrX, plArrY
+   
+   # the pulse streams are read until more than N valid pulses are collected, N = -1 reads all (see 'trainPulses(..)' and 'predictPulses(..)')
+   numberOfPulsesTrain = max(N_values) + 1 if min(N_values) > -1 else -1
+   
+   x_reject_train  = readValidPulses(fileNameRejectPulses_train,  numberOfPulsesTrain, isPositivePolarity, mlInput, featureCache=featureCache)
+   x_correct_train = readValidPulses(fileNameCorrectPulses_train, numberOfPulsesTrain, isPositivePolarity, mlInput, featureCache=featureCache)
+   
+   numberOfPulsesTest = numberOfPulses_test + 1 if numberOfPulses_test > -1 else -1
+   
+   x_reject_test  = readValidPulses(fileNameRejectPulses_test,  numberOfPulsesTest, isPositivePolarity, mlInput, featureCache=featureCache)
+   x_correct_test = readValidPulses(fileNameCorrectPulses_test, numberOfPulsesTest, isPositivePolarity, mlInput, featureCache=featureCache)
+   
+   x_test = np.concatenate((x_reject_test, x_correct_test))
+   y_test = np.concatenate((np.zeros(len(x_reject_test), dtype=int), np.ones(len(x_correct_test), dtype=int)))
+   
+   incremental = hasattr(mlInput.m_classifier, 'partial_fit') and (mlInput.m_preClassifier is None or hasattr(mlInput.m_preClassifier, 'partial_fit'))
+   
+   machine = mlInput.copy()
+   
+   lastReject  = 0
+   lastCorrect = 0
+   
+   for counter, N in enumerate(N_values): 
+       x_reject  = x_reject_train  if N < 0 else x_reject_train [:N + 1]
+       x_correct = x_correct_train if N < 0 else x_correct_train[:N + 1]
+       
+       # N decreased (e.g. [40, 2, -3]): the machine is updated from scratch
+       if incremental and (len(x_reject) < lastReject or len(x_correct) < lastCorrect):
+           machine = mlInput.copy()
+           
+           lastReject  = 0
+           lastCorrect = 0
+           
+       if incremental:
+           # update by the pulses added since the last N
+           x_array = np.concatenate((x_reject[lastReject:], x_correct[lastCorrect:]))
+           y_array = np.concatenate((np.zeros(len(x_reject) - lastReject, dtype=int), np.ones(len(x_correct) - lastCorrect, dtype=int)))
+           
+           if len(x_array):
+               machine.partialFit(x_array, y_array, np.array([0, 1]))
+       else:
+           machine = mlInput.copy()
+           
+           x_array = np.concatenate((x_reject, x_correct))
+           y_array = np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(len(x_correct), dtype=int)))
+           
+           machine.fit(x_array, y_array)
+           
+       lastReject  = len(x_reject)
+       lastCorrect = len(x_correct)
+       
+       plArrX. append(N)
+       plArrY. append(machine.score(x_test, y_test))
+       
+       if debug:
+           sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter + 1, len(N_values), 100.0*(counter + 1)/len(N_values)))
+           
+   return plArrX, plArrY
+
+"""
+
+ This function executes a pipeline on a TESTing ('_test') and TRAINing ('_train') set of 
+ streamed pulses ('fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx') by varying the 
+ window size of the applied median filter (note: odd numbers are required!) for a given machine 
+ definition (classifier) 'machineInput'.
+
+ The list 'medianFilterIncr' defines the window size region used for the TRAINing cycle, f.e.: 
+     
+ [3, 31, 2] means: looping from 3 to (=)31 with an increment of 2 to consider ODD numbers.
+ 
+ Note: the median filter requires ODD window sizes for each step in the pipeline.
+
+ The number of TRAINed pulses 'numberOfPulses_train' is equally applied for CORRECT and REJECT pulses.
+ 
+ return: 
+     
+     (1) list, which contains x-axis data: 'medianFilterIncr',
+     (2) list, which contains the prediction accuracies [0.0-1.0] for each 'medianFilterIncr' (1).
+ 
+"""
+
+def runPipelineMedianWindow(fileNameCorrectPulses_train = '/correct_train', 
+                            fileNameRejectPulses_train  = '/reject_train', 
+                            fileNameCorrectPulses_test  = '/correct_test', 
+                            fileNameRejectPulses_test   = '/correct_test', 
+                            numberOfPulses_train        = 15,
+                            numberOfPulses_test         = 1000,
+                            isPositivePolarity          = False,
+                            machineInput                = DMachineParams(),
+                            medianFilterIncr            = [3, 31, 2],
+                            debug                       = True,
+                            featureCache                = None):
+   mlInput = machineInput.copy()
+    
+   plArrX   = []
+   plArrY   = []
+   
+   size = (medianFilterIncr[1] + medianFilterIncr[2])/medianFilterIncr[2]
+   counter = 0
+   
+   for N in range(medianFilterIncr[0], medianFilterIncr[1] + medianFilterIncr[2], medianFilterIncr[2]): 
+       mlInput.m_windowSize = N 
+       
+       counter += 1
+       
+       score, __   = trainAndTest(fileNameCorrectPulses_train, 
+                                  fileNameRejectPulses_train,
+                                  fileNameCorrectPulses_test, 
+                                  fileNameRejectPulses_test,
+                                  numberOfPulses_train,
+                                  numberOfPulses_train,
+                                  numberOfPulses_test,
+                                  isPositivePolarity,
+                                  mlInput,
+                                  featureCache)
+       plArrX. append(N)
+       plArrY. append(score)
+       
+       if debug:
+           sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, size, 100.0*counter/size))
+            
+   return plArrX, plArrY
+
+"""
+
+ These functions are executed by the worker processes of 'runPipelineGrid(..)' and 'runPipelineGrid2(..)' if 'numberOfProcesses' > 1: 
+     
+ Each worker process receives the (untrained) machine (classifier and pre-classifier, see 'DMachineParams') and the 
+ arguments of 'loadGridSearchData(..)' of each data set only once (initializer) and returns the prediction accuracy of 
+ a single grid point, which is identical to the score of 'trainAndTest(..)'.
+ 
+ The data sets are loaded by the worker processes (not pickled by the calling process) and only the data set of the 
+ last grid point is kept per worker. The grid points are submitted in order of their data set. A shared 'featureCache' 
+ (see 'DFeatureCache') lets the pulse streams be preprocessed only once for all worker processes.
+ 
+"""
+
+workerGridSearch = {}
+
+def initGridSearchWorker(machineInput, dataSetParams):
+    workerGridSearch['machineInput']  = machineInput
+    workerGridSearch['dataSetParams'] = dataSetParams
+    workerGridSearch['dataSetKey']    = None
+    workerGridSearch['dataSet']       = None
+    
+def dataSetOfWorker(dataSetKey):
+    if not workerGridSearch['dataSetKey'] == dataSetKey:
+        workerGridSearch['dataSet']    = None # release the previous data set before loading
+        workerGridSearch['dataSet']    = loadGridSearchData(*workerGridSearch['dataSetParams'][dataSetKey])
+        workerGridSearch['dataSetKey'] = dataSetKey
+        
+    return workerGridSearch['dataSet']
+    
+def scoreOfGridPoint(dataSetKey, numberOfPulsesCorrect_train, numberOfPulsesReject_train):
+    x_correct_train, x_reject_train, x_test, y_test = dataSetOfWorker(dataSetKey)
+    
+    # see 'trainPulses(..)': more than 'numberOfPulsesX_train' valid pulses are used
+    x_reject  = x_reject_train [:numberOfPulsesReject_train  + 1] if numberOfPulsesReject_train  > -1 else x_reject_train
+    x_correct = x_correct_train[:numberOfPulsesCorrect_train + 1] if numberOfPulsesCorrect_train > -1 else x_correct_train
+    
+    x_array = np.concatenate((x_reject, x_correct))
+    y_array = np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(len(x_correct), dtype=int)))
+    
+    machine = workerGridSearch['machineInput'].copy()
+    machine.fit(x_array, y_array)
+    
+    return machine.score(x_test, y_test)
+
+"""
+
+ This function reads the valid pulses required for all grid points sharing the same preprocessing 'machineInput': 
+     
+ the first 'numberOfPulsesCorrect_train' + 1 CORRECT and 'numberOfPulsesReject_train' + 1 REJECT TRAINing pulses and 
+ the TESTing pulses (see 'predictPulses(..)') (-1: all valid pulses).
+ 
+ return: 
+     
+     (1) tuple of the CORRECT and REJECT TRAINing pulses as well as the TESTing pulses and their labels.
+     
+"""
+
+def loadGridSearchData(fileNameCorrectPulses_train = '/correct_train', 
+                       fileNameRejectPulses_train  = '/reject_train', 
+                       fileNameCorrectPulses_test  = '/correct_test', 
+                       fileNameRejectPulses_test   = '/correct_test', 
+                       numberOfPulsesCorrect_train = -1,
+                       numberOfPulsesReject_train  = -1,
+                       numberOfPulses_test         = -1,
+                       isPositivePolarity          = False,
+                       machineInput                = DMachineParams(),
+                       featureCache                = None):
+    numberOfPulsesCorrect = numberOfPulsesCorrect_train + 1 if numberOfPulsesCorrect_train > -1 else -1
+    numberOfPulsesReject  = numberOfPulsesReject_train  + 1 if numberOfPulsesReject_train  > -1 else -1
+    numberOfPulsesTest    = numberOfPulses_test         + 1 if numberOfPulses_test         > -1 else -1
+    
+    x_correct_train = readValidPulses(fileNameCorrectPulses_train, numberOfPulsesCorrect, isPositivePolarity, machineInput, featureCache=featureCache)
+    x_reject_train  = readValidPulses(fileNameRejectPulses_train,  numberOfPulsesReject,  isPositivePolarity, machineInput, featureCache=featureCache)
+    
+    x_reject_test   = readValidPulses(fileNameRejectPulses_test,   numberOfPulsesTest,    isPositivePolarity, machineInput, featureCache=featureCache)
+    x_correct_test  = readValidPulses(fileNameCorrectPulses_test,  numberOfPulsesTest,    isPositivePolarity, machineInput, featureCache=featureCache)
+    
+    x_test = np.concatenate((x_reject_test, x_correct_test))
+    y_test = np.concatenate((np.zeros(len(x_reject_test), dtype=int), np.ones(len(x_correct_test), dtype=int)))
+    
+    return x_correct_train, x_reject_train, x_test, y_test
+
+"""
+
+ This generator yields the prediction accuracies of the grid points 'gridPoints' = [(dataSetKey, numberOfPulsesCorrect_train, numberOfPulsesReject_train), ..] 
+ evaluated in parallel by 'numberOfProcesses' worker processes in order of their completion. 'dataSetParams' maps each 'dataSetKey' 
+ to the arguments of 'loadGridSearchData(..)'.
+ 
+ yields: 
+     
+     (1) index of the grid point in 'gridPoints' and 
+     (2) prediction accuracy [0.0-1.0].
+     
+"""
+
+def iterGridScoresParallel(machineInput, dataSetParams, gridPoints, numberOfProcesses):
+    with ProcessPoolExecutor(max_workers=numberOfProcesses, initializer=initGridSearchWorker, initargs=(machineInput, dataSetParams)) as executor:
+        futures = {executor.submit(scoreOfGridPoint, *gridPoint): index for index, gridPoint in enumerate(gridPoints)}
+        
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+"""
+
+ This function combines functions: runPipelineNPulses(..) and runPipelineMedianWindow(..).
+ 
+ If 'numberOfProcesses' > 1, the grid points are evaluated in parallel by 'numberOfProcesses' worker processes, which 
+ read the pulse streams themselves (see 'initGridSearchWorker(..)', use a 'featureCache' to preprocess them only once). 
+ The results are identical to the serial execution.
+ 
+ Note: on Windows, the calling script must be protected by 'if __name__ == '__main__':'.
+ 
+"""
+
+def runPipelineGrid(fileNameCorrectPulses_train = '/correct_train', 
+                    fileNameRejectPulses_train  = '/reject_train', 
+                    fileNameCorrectPulses_test  = '/correct_test', 
+                    fileNameRejectPulses_test   = '/correct_test', 
+                    numberOfPulses_train        = [2, 50, 1],
+                    medianFilterIncr            = [3, 31, 2],
+                    numberOfPulses_test         = 1000,
+                    isPositivePolarity          = False,
+                    machineInput                = DMachineParams(),
+                    debug                       = True,
+                    featureCache                = None,
+                    numberOfProcesses           = 1):
+    mlInput = machineInput.copy()
+    
+    _plArrY   = []
+   
+    _xAxis    = np.arange(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]) # number of pulses (N CORRECT = N REJECT)
+    _yAxis    = np.arange(medianFilterIncr[0],     medianFilterIncr[1] + medianFilterIncr[2],         medianFilterIncr[2])     # median filter window size
+    
+    counter = 0
+    
+    if numberOfProcesses > 1 and len(_xAxis) and len(_yAxis):
+        dataSetParams = {}
+        
+        for N_m in _yAxis:
+            mlInput.m_windowSize = int(N_m)
+            
+            dataSetParams[int(N_m)] = (fileNameCorrectPulses_train, 
+                                       fileNameRejectPulses_train,
+                                       fileNameCorrectPulses_test, 
+                                       fileNameRejectPulses_test,
+                                       int(_xAxis.max()),
+                                       int(_xAxis.max()),
+                                       numberOfPulses_test,
+                                       isPositivePolarity,
+                                       mlInput.copy(),
+                                       featureCache)
+            
+        gridPoints = [(int(N_m), int(N_p), int(N_p)) for N_m in _yAxis for N_p in _xAxis]
+        
+        _plArrY = [[0.0]*len(_xAxis) for __ in _yAxis]
+        
+        for index, score in iterGridScoresParallel(mlInput, dataSetParams, gridPoints, numberOfProcesses):
+            counter += 1
+            
+            _plArrY[index//len(_xAxis)][index%len(_xAxis)] = score
+            
+            if debug:
+                sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, len(gridPoints), 100.0*counter/len(gridPoints)))
+                
+        return _xAxis, _yAxis, _plArrY
+    
+    for N_m in range(medianFilterIncr[0], medianFilterIncr[1] + medianFilterIncr[2], medianFilterIncr[2]):
+        mlInput.m_windowSize = N_m
+        
+        plArrY   = []
+        
+        for N_p in range(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]): 
+           counter += 1
+            
+           score, __   = trainAndTest(fileNameCorrectPulses_train, 
+                                      fileNameRejectPulses_train,
+                                      fileNameCorrectPulses_test, 
+                                      fileNameRejectPulses_test,
+                                      N_p,
+                                      N_p,
+                                      numberOfPulses_test,
+                                      isPositivePolarity,
+                                      mlInput,
+                                      featureCache)
+           
+           if debug:
+               sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, len(_xAxis)*len(_yAxis), 100.0*counter/(len(_xAxis)*len(_yAxis))))
+            
+           plArrY.append(score)
+           
+        _plArrY. append(plArrY)
+        
+    return _xAxis, _yAxis, _plArrY
+
+"""
+
+ This function executes a pipeline on a TESTing ('_test') and TRAINing ('_train') set of 
+ streamed pulses ('fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx') by varying the 
+ number of CORRECT pulses vs. the number of REJECT pulses for a given machine 
+ definition (classifier) 'machineInput'.
+ 
+ If 'numberOfProcesses' > 1, the grid points are evaluated in parallel by 'numberOfProcesses' worker processes 
+ (see 'runPipelineGrid(..)').
+
+ The list 'numberOfPulsesCorrect_xxx' defines the number of pulses used for the TRAINing cycle, f.e.: 
+     
+ [3, 31, 2] means: looping from 3 to (=)31 with an increment of 2.
+ 
+ return: 
+     
+     (1) list, which contains x-axis data: 'numberOfPulsesCorrect_train',
+     (2) list, which contains y-axis data: 'fileNameRejectPulses_train',
+     (3) list, which contains the prediction accuracies [0.0-1.0] for each point (x,y).
+     (4) point (x,y) of the best prediction accuracy and the repsective accuracy score [0.0-1.0].
+ 
+"""
+
+def runPipelineGrid2(fileNameCorrectPulses_train = '/correct_train', 
+                     fileNameRejectPulses_train  = '/reject_train', 
+                     fileNameCorrectPulses_test  = '/correct_test', 
+                     fileNameRejectPulses_test   = '/correct_test', 
+                     numberOfPulsesCorrect_train = [2, 50, 1],
+                     numberOfPulsesReject_train  = [2, 50, 1],
+                     numberOfPulses_test         = 1000,
+                     isPositivePolarity          = False,
+                     machineInput                = DMachineParams(),
+                     debug                       = True,
+                     featureCache                = None,
+                     numberOfProcesses           = 1):
     mlInput = machineInput.copy()
     
-    # train
-    learnedMachine = trainPulses(fileNameCorrectPulses_train, 
-                                 fileNameRejectPulses_train, 
-                                 '', 
-                                 isPositivePolarity, 
-                                 numberOfPulsesCorrect_train,
-                                 numberOfPulsesReject_train,
-                                 mlInput, 
-                                 False)
+    _plArrY   = []
+   
+    _xAxis    = np.arange(numberOfPulsesCorrect_train[0], numberOfPulsesCorrect_train[1] + numberOfPulsesCorrect_train[2], numberOfPulsesCorrect_train[2]) # number of pulses: CORRECT
+    _yAxis    = np.arange(numberOfPulsesReject_train[0],  numberOfPulsesReject_train[1] + numberOfPulsesReject_train[2],   numberOfPulsesReject_train[2])  # number of pulses: REJECT
+    
+    bestList  = [0.0, 0, 0]
+    maxScore  = -1.0       
+
+    counter = 0              
+    
+    if numberOfProcesses > 1 and len(_xAxis) and len(_yAxis):
+        dataSetParams = {0: (fileNameCorrectPulses_train, 
+                             fileNameRejectPulses_train,
+                             fileNameCorrectPulses_test, 
+                             fileNameRejectPulses_test,
+                             int(_xAxis.max()),
+                             int(_yAxis.max()),
+                             numberOfPulses_test,
+                             isPositivePolarity,
+                             mlInput,
+                             featureCache)}
+        
+        gridPoints = [(0, int(N_c), int(N_r)) for N_r in _yAxis for N_c in _xAxis]
+        
+        _plArrY = [[0.0]*len(_xAxis) for __ in _yAxis]
+        
+        for index, score in iterGridScoresParallel(mlInput, dataSetParams, gridPoints, numberOfProcesses):
+            counter += 1
+            
+            _plArrY[index//len(_xAxis)][index%len(_xAxis)] = score
+            
+            if debug:
+                sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, len(gridPoints), 100.0*counter/len(gridPoints)))
+        
+        # the best grid point is determined in the order of the serial execution
+        for index, (__, N_c, N_r) in enumerate(gridPoints):
+            score = _plArrY[index//len(_xAxis)][index%len(_xAxis)]
+            
+            if score >= maxScore:
+                maxScore    = score
+                
+                bestList[0] = score
+                bestList[1] = N_c
+                bestList[2] = N_r
+                
+        return _xAxis, _yAxis, _plArrY, bestList
+                         
+    for N_r in range(numberOfPulsesReject_train[0], numberOfPulsesReject_train[1] + numberOfPulsesReject_train[2], numberOfPulsesReject_train[2]):
+        plArrY   = []
+        
+        for N_c in range(numberOfPulsesCorrect_train[0], numberOfPulsesCorrect_train[1] + numberOfPulsesCorrect_train[2], numberOfPulsesCorrect_train[2]): 
+           counter += 1
+           
+           score, __   = trainAndTest(fileNameCorrectPulses_train, 
+                                      fileNameRejectPulses_train,
+                                      fileNameCorrectPulses_test, 
+                                      fileNameRejectPulses_test,
+                                      N_c,
+                                      N_r,
+                                      numberOfPulses_test,
+                                      isPositivePolarity,
+                                      mlInput,
+                                      featureCache)
+           
+           if debug:
+               sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, len(_xAxis)*len(_yAxis), 100.0*counter/(len(_xAxis)*len(_yAxis))))
+             
+           if score >= maxScore:
+               maxScore    = score
+               
+               bestList[0] = score
+               bestList[1] = N_c
+               bestList[2] = N_r
+           
+           plArrY.append(score)
+           
+        _plArrY. append(plArrY)
+        
+    return _xAxis, _yAxis, _plArrY, bestList
+
+"""
+
+ This function prepares a block of pulse pairs (2D arrays of shape (number of pairs, number of cells)) for the classification 
+ and the CF timing (see 'calcLifetimesOfPulsePairs(..)'): 
+     
+ The ML data (features) is preprocessed according to 'machineInputA'/'machineInputB' (see 'preprocessPulses(..)'), 
+ the original pulses are median filtered (if 'medianFilterA'/'medianFilterB') and corrected for their baseline. 
+ 
+ return: 
+     
+     (1) time traces of A and B as 'dtype' (float32 if 'float32Mode', else float64),
+     (2) original (filtered) pulses of A and B,
+     (3) amplitudes (minimum/maximum) of (2),
+     (4) features of A and B and
+     (5) mask of the pulse pairs with valid features in A and B.
+     
+"""
+
+def preprocessPulsePairs(timeA, voltageA, timeB, voltageB,
+                         machineInputA      = DMachineParams(),
+                         machineInputB      = DMachineParams(),
+                         isPositivePolarity = False,
+                         medianFilterA      = True,
+                         windowSizeA        = 5,
+                         medianFilterB      = True,
+                         windowSizeB        = 5,
+                         float32Mode        = False,
+                         workspace          = None):
+    dtype = np.float32 if float32Mode else np.float64
+    
+    if float32Mode and workspace is None:
+        workspace = DPulseWorkspace()
+        
+    timeA = timeA.astype(dtype, copy=not float32Mode)
+    timeB = timeB.astype(dtype, copy=not float32Mode)
+    
+    # median filter, baseline correction and normalization of ML data
+    voltage_normA, validA = preprocessPulses(voltageA, machineInputA, isPositivePolarity, dtype, None if workspace is None else workspace.child('A'))
+    voltage_normB, validB = preprocessPulses(voltageB, machineInputB, isPositivePolarity, dtype, None if workspace is None else workspace.child('B'))
+    
+    # copy of original pulses: median filter (if 'medianFilterA'/'medianFilterB') and baseline correction
+    pulseA_origin = filterPulses(voltageA, machineInputA, medianFilterA, windowSizeA, dtype, None if workspace is None else workspace.child('A'), 'origin')
+    pulseB_origin = filterPulses(voltageB, machineInputB, medianFilterB, windowSizeB, dtype, None if workspace is None else workspace.child('B'), 'origin')
+        
+    # determine pulse height for original data
+    if not isPositivePolarity:
+        amplitudeA_o = np.min(pulseA_origin, axis=1)
+        amplitudeB_o = np.min(pulseB_origin, axis=1)
+    else:
+        amplitudeA_o = np.max(pulseA_origin, axis=1)
+        amplitudeB_o = np.max(pulseB_origin, axis=1)
+        
+    return timeA, timeB, pulseA_origin, pulseB_origin, amplitudeA_o, amplitudeB_o, voltage_normA, voltage_normB, validA & validB
+
+"""
+
+ The stages of the rejection cascade of 'calcLifetimesOfPulsePairs(..)' in the order of their application (cheap checks first):
+     
+ indexTrailer   >> the block of pulse pairs cannot pass the pulse height windows according to the index trailer (see 'phsSegmentsOfPulseStream(..)')
+ amplitudeBound >> the amplitude bound of the raw pulses is below the lower level of a pulse height window (see 'amplitudeBoundOfPulses(..)')
+ phs            >> the amplitudes of the (filtered) original pulses are outside of the pulse height windows
+ peakPosition   >> the peak is outside of the safety region or the pulse cannot be normalized (see 'normalizePulses(..)')
+ classifierA    >> the pulse of detector A is rejected by its machine
+ classifierB    >> the pulse of detector B is rejected by its machine
+ cfd            >> the CF level cannot be determined for the start or stop pulse
+ 
+"""
+
+rejectionStages = ('indexTrailer', 'amplitudeBound', 'phs', 'peakPosition', 'classifierA', 'classifierB', 'cfd')
+
+"""
+
+ This function applies the stages 'amplitudeBound' to 'classifierB' of the rejection cascade (see 'rejectionStages') to a block of pulse pairs 
+ 'voltageA'/'voltageB' (2D arrays of shape (number of pairs, number of cells)) for the union of the pulse height windows 'phsWindows' 
+ (list of (ll_phs_A, ul_phs_A, ll_phs_B, ul_phs_B) [mV] of detector A and B): a pulse pair passes if it is inside of at least one window. 
+ The numbers of rejected pulse pairs are added to the dictionary 'rejected' per stage.
+ 
+ For the description of the other params see 'calcLifetimesOfPulsePairs(..)'.
+ 
+ return: 
+     
+     (1) indices of the accepted pulse pairs in the block,
+     (2) original (filtered) pulses of A and B of (1),
+     (3) amplitudes (minimum/maximum) of (2) and
+     (4) probabilities of the class CORRECT (1) of the machines of A and B for (1) (None if not 'probability').
+     
+"""
+
+def cascadeOfPulsePairs(voltageA, voltageB, phsWindows,
+                        machineInputA      = DMachineParams(),
+                        machineInputB      = DMachineParams(),
+                        isPositivePolarity = False,
+                        medianFilterA      = True,
+                        windowSizeA        = 5,
+                        medianFilterB      = True,
+                        windowSizeB        = 5,
+                        dtype              = np.float64,
+                        workspace          = None,
+                        rejected           = None,
+                        probability        = False):
+    numberOfCells = voltageA.shape[1]
+    
+    workspaceA = None if workspace is None else workspace.child('A')
+    workspaceB = None if workspace is None else workspace.child('B')
+    
+    if rejected is None:
+        rejected = dict.fromkeys(rejectionStages, 0)
+        
+    # (1) amplitude bound of the raw pulses:
+    boundA = amplitudeBoundOfPulses(voltageA)
+    boundB = amplitudeBoundOfPulses(voltageB)
+    
+    inBound = np.zeros(len(voltageA), dtype=bool)
+    
+    for ll_phs_A, ul_phs_A, ll_phs_B, ul_phs_B in phsWindows:
+        inBound |= (boundA >= ll_phs_A) & (boundB >= ll_phs_B)
+        
+    pairs = np.flatnonzero(inBound)
+    
+    rejected['amplitudeBound'] += len(voltageA) - len(pairs)
+    
+    # (2) pulse height windows of the original pulses (median filter and baseline correction):
+    pulseA_origin = filterPulses(voltageA[pairs], machineInputA, medianFilterA, windowSizeA, dtype, workspaceA, 'origin')
+    pulseB_origin = filterPulses(voltageB[pairs], machineInputB, medianFilterB, windowSizeB, dtype, workspaceB, 'origin')
+    
+    if not isPositivePolarity:
+        amplitudeA_o = np.min(pulseA_origin, axis=1)
+        amplitudeB_o = np.min(pulseB_origin, axis=1)
+    else:
+        amplitudeA_o = np.max(pulseA_origin, axis=1)
+        amplitudeB_o = np.max(pulseB_origin, axis=1)
+        
+    __amplitudeA = np.abs(amplitudeA_o)
+    __amplitudeB = np.abs(amplitudeB_o)
+    
+    accept = np.zeros(len(pairs), dtype=bool)
+    
+    for ll_phs_A, ul_phs_A, ll_phs_B, ul_phs_B in phsWindows:
+        accept |= (__amplitudeA >= ll_phs_A) & (__amplitudeA <= ul_phs_A) & (__amplitudeB >= ll_phs_B) & (__amplitudeB <= ul_phs_B)
+        
+    rejected['phs'] += len(accept) - np.count_nonzero(accept)
+    
+    pairs, pulseA_origin, pulseB_origin, amplitudeA_o, amplitudeB_o = pairs[accept], pulseA_origin[accept], pulseB_origin[accept], amplitudeA_o[accept], amplitudeB_o[accept]
+    
+    # (3) safety region of the peak and normalization of ML data (reuse the original pulses if filtered the same way):
+    if medianFilterA == machineInputA.m_medianFilter and (not medianFilterA or windowSizeA == machineInputA.m_windowSize):
+        voltage_normA, __, __, validA = normalizePulses(np.array(pulseA_origin), numberOfCells, isPositivePolarity, workspaceA)
+    else:
+        voltage_normA, validA = preprocessPulses(voltageA[pairs], machineInputA, isPositivePolarity, dtype, workspaceA)
+        
+    if medianFilterB == machineInputB.m_medianFilter and (not medianFilterB or windowSizeB == machineInputB.m_windowSize):
+        voltage_normB, __, __, validB = normalizePulses(np.array(pulseB_origin), numberOfCells, isPositivePolarity, workspaceB)
+    else:
+        voltage_normB, validB = preprocessPulses(voltageB[pairs], machineInputB, isPositivePolarity, dtype, workspaceB)
+        
+    accept = validA & validB
+    
+    rejected['peakPosition'] += len(accept) - np.count_nonzero(accept)
+    
+    # (4) classify ONCE per detector: detector B only for the pulses accepted by the machine of detector A
+    probabilityA = np.zeros(len(accept)) if probability else None
+    probabilityB = np.zeros(len(accept)) if probability else None
+    
+    numberOfValid = np.count_nonzero(accept)
+    
+    if np.any(accept):
+        if probability:
+            prediction, probabilityA[accept] = machineInputA.predictWithProbability(voltage_normA[accept])
+        else:
+            prediction = machineInputA.predict(voltage_normA[accept])
+            
+        accept[accept] = prediction == 1
+        
+    rejected['classifierA'] += numberOfValid - np.count_nonzero(accept)
+    
+    numberOfAcceptedA = np.count_nonzero(accept)
+    
+    if np.any(accept):
+        if probability:
+            prediction, probabilityB[accept] = machineInputB.predictWithProbability(voltage_normB[accept])
+        else:
+            prediction = machineInputB.predict(voltage_normB[accept])
+            
+        accept[accept] = prediction == 1
+        
+    rejected['classifierB'] += numberOfAcceptedA - np.count_nonzero(accept)
+    
+    if probability:
+        probabilityA, probabilityB = probabilityA[accept], probabilityB[accept]
+        
+    return pairs[accept], pulseA_origin[accept], pulseB_origin[accept], amplitudeA_o[accept], amplitudeB_o[accept], probabilityA, probabilityB
+
+"""
+
+ This function determines the lifetimes [ps] of a block of pulse pairs (2D arrays of shape (number of pairs, number of cells)) 
+ which are accepted by the TRAINed machines 'machineInputA'/'machineInputB' and the pulse height windows (PHS). 
+ 
+ For the description of the params see 'createLifetimeSpectrum(..)'. If 'float32Mode' == 'True', the buffers of 'workspace' (DPulseWorkspace()) 
+ are reused for each block of pulse pairs (a new workspace is used if None).
+ 
+ The pulse pairs pass a cascade of rejection stages ordered by their costs (see 'rejectionStages'), so that only the survivors of the 
+ pulse height windows are normalized, only the survivors of the normalization are classified and the machine of detector B only 
+ receives the pulses accepted by the machine of detector A. If the median filter of the original pulses equals the one of the machine, 
+ the filtered original pulses are reused as ML data. The accepted pulse pairs and their lifetimes are the same as without the cascade. 
+ 
+ If a dictionary 'statistics' is given, the number of pulse pairs ('pairs'), the number of rejected pulse pairs per stage and the number 
+ of accepted pulse pairs ('accepted') are added to it.
+ 
+ return: 
+     
+     (1) array of lifetimes [ps] of all accepted pulse pairs.
+     
+"""
+
+def calcLifetimesOfPulsePairs(timeA, voltageA, timeB, voltageB,
+                              machineInputA           = DMachineParams(),
+                              machineInputB           = DMachineParams(),
+                              isPositivePolarity      = False,
+                              B_as_start_A_as_stop    = True,
+                              cf_level_A              = 25.0,
+                              cf_level_B              = 25.0,
+                              ll_phs_start_in_mV      = 250.0, ul_phs_start_in_mV = 450.0,
+                              ll_phs_stop_in_mV       = 50.0,  ul_phs_stop_in_mV  = 150.0,
+                              cubicSpline             = True,
+                              cubicSplineRenderPoints = 200,
+                              analyticCubicSpline     = False,
+                              medianFilterA           = True,
+                              windowSizeA             = 5,
+                              medianFilterB           = True,
+                              windowSizeB             = 5,
+                              float32Mode             = False,
+                              workspace               = None,
+                              statistics              = None):
+    dtype = np.float32 if float32Mode else np.float64
+    
+    if float32Mode and workspace is None:
+        workspace = DPulseWorkspace()
+        
+    rejected = dict.fromkeys(rejectionStages, 0)
+    
+    if B_as_start_A_as_stop:
+        ll_phs_A, ul_phs_A, ll_phs_B, ul_phs_B = ll_phs_stop_in_mV,  ul_phs_stop_in_mV,  ll_phs_start_in_mV, ul_phs_start_in_mV
+    else:
+        ll_phs_A, ul_phs_A, ll_phs_B, ul_phs_B = ll_phs_start_in_mV, ul_phs_start_in_mV, ll_phs_stop_in_mV,  ul_phs_stop_in_mV
+        
+    # (1)-(4) amplitude bound, pulse height windows, normalization and classification:
+    pairs, pulseA_origin, pulseB_origin, amplitudeA_o, amplitudeB_o, __, __ = cascadeOfPulsePairs(voltageA, voltageB, [(ll_phs_A, ul_phs_A, ll_phs_B, ul_phs_B)], machineInputA, machineInputB, isPositivePolarity, 
+                                                                                                  medianFilterA, windowSizeA, medianFilterB, windowSizeB, dtype, workspace, rejected)
+    
+    timeA = timeA[pairs].astype(dtype, copy=False)
+    timeB = timeB[pairs].astype(dtype, copy=False)
     
-    # test
-    score = predictPulses(fileNameCorrectPulses_test, 
-                          fileNameRejectPulses_test, 
-                          isPositivePolarity,  
-                          numberOfPulses_test,
-                          learnedMachine,
-                          False)
+    # (5) calculate lifetimes
+    if B_as_start_A_as_stop:
+        lifetime_in_ps, rejectLT = calcLifetimes(timeB, pulseB_origin, timeA, pulseA_origin, cf_level_B, cf_level_A, amplitudeB_o, amplitudeA_o, isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+    else:
+        lifetime_in_ps, rejectLT = calcLifetimes(timeA, pulseA_origin, timeB, pulseB_origin, cf_level_A, cf_level_B, amplitudeA_o, amplitudeB_o, isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+        
+    rejected['cfd'] = np.count_nonzero(rejectLT)
     
-    return score, learnedMachine
+    if statistics is not None:
+        statistics['pairs']    = statistics.get('pairs', 0) + len(voltageA)
+        statistics['accepted'] = statistics.get('accepted', 0) + len(lifetime_in_ps) - rejected['cfd']
+        
+        for stage in rejectionStages:
+            statistics[stage] = statistics.get(stage, 0) + int(rejected[stage])
+            
+    return lifetime_in_ps[~rejectLT]
 
 """
 
- This function executes a pipeline on a TESTing ('_test') and TRAINing ('_train') set of 
- streamed pulses ('fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx') by varying the 
- number of TRAINed pulses for a given machine definition (classifier) 'machineInput'.
+ The event list (list mode) of 'createLifetimeSpectrum(..)' (see 'eventListFileName') is a binary file of a 32 byte header 
+ followed by ONE record per pulse pair with valid features and CF times in both detectors, independent of the classification 
+ and the pulse height windows (PHS):
+     
+ pairIndex                  >> index of the pulse pair in the pulse stream (counted from the first pulse pair received for live data)
+ timeA, timeB               >> CF times [ns] of detector A and B (CF levels 'cf_level_A' and 'cf_level_B' of the header)
+ amplitudeA, amplitudeB     >> absolute pulse heights [mV] of detector A and B
+ probabilityA, probabilityB >> probabilities of the class CORRECT (1) of the machines of detector A and B
+ acceptA, acceptB           >> decisions of the machines of detector A and B ('predict(..)')
+ 
+ The spectrum can be rebuilt from an event list with other bin widths, offsets, PHS windows, start/stop assignments or 
+ probability thresholds without reading the pulse stream again (see 'lifetimeSpectrumOfEvents(..)').
+ 
+"""
 
- The list 'numberOfPulses_train' defines the region of N pulses used for the TRAINing cycle, f.e.: 
+lifetimeEventListMagic = b'DPLE'
+
+lifetimeEventListHeaderDType = np.dtype([('magic',              'S4'),
+                                         ('version',            '<u4'),
+                                         ('cf_level_A',         '<f8'),
+                                         ('cf_level_B',         '<f8'),
+                                         ('isPositivePolarity', '<u4'),
+                                         ('__',                 '<u4')])
+
+lifetimeEventDType = np.dtype([('pairIndex',    '<i8'),
+                               ('timeA',        '<f8'),
+                               ('timeB',        '<f8'),
+                               ('amplitudeA',   '<f8'),
+                               ('amplitudeB',   '<f8'),
+                               ('probabilityA', '<f4'),
+                               ('probabilityB', '<f4'),
+                               ('acceptA',      'u1'),
+                               ('acceptB',      'u1')])
+
+"""
+
+ This function returns the decisions ('predict(..)') and the probabilities of the class CORRECT (1) of the TRAINed machine 
+ 'machineInput' (DMachineParams()) for the features 'x_array' (see 'DMachineParams.predictWithProbability(..)').
+ 
+"""
+
+def classifyPulsesWithProbability(x_array, machineInput = DMachineParams()):
+    prediction, probability = machineInput.predictWithProbability(x_array)
+    
+    return prediction == 1, probability
+
+"""
+
+ This function determines the event lists (see 'lifetimeEventDType') of a block of pulse pairs (2D arrays of shape (number of pairs, number of cells)) 
+ for each pair of CF levels (cf_level_A, cf_level_B) in 'cfLevels'. 'firstPair' is the index of the first pulse pair of the block in the pulse stream.
+ 
+ The pulse pairs are preprocessed and classified only once and the CF times are determined only once per CF level and detector. 
+ For the description of the other params see 'createLifetimeSpectrum(..)'. 
+ 
+ If 'phsWindows' (list of (B_as_start_A_as_stop, ll_phs_start_in_mV, ul_phs_start_in_mV, ll_phs_stop_in_mV, ul_phs_stop_in_mV)) is not empty, 
+ only the pulse pairs accepted by both machines and by at least one of the pulse height windows are timed and listed: the pulse pairs pass 
+ the rejection cascade of 'calcLifetimesOfPulsePairs(..)' (see 'cascadeOfPulsePairs(..)') with the union of the pulse height windows as 
+ pulse height stage. If a dictionary 'statistics' is given, the rejection counts per stage are added to it, where 'cfd' and 'accepted' 
+ refer to the first pair of CF levels in 'cfLevels' (before the pulse height window of each configuration is applied).
+ 
+ Otherwise (event list), all pulse pairs with valid features are classified and timed, so that the cascade is bypassed and no 
+ statistics are collected.
+ 
+ return: 
      
- [2, 50, 2] means: looping from 2 to (=)50 with an increment of 2. 
+     (1) dictionary of the event lists with the pairs of CF levels as keys.
+     
+"""
+
+def calcEventListsOfPulsePairs(timeA, voltageA, timeB, voltageB,
+                               cfLevels                = [(25.0, 25.0)],
+                               firstPair               = 0,
+                               phsWindows              = [],
+                               machineInputA           = DMachineParams(),
+                               machineInputB           = DMachineParams(),
+                               isPositivePolarity      = False,
+                               cubicSpline             = True,
+                               cubicSplineRenderPoints = 200,
+                               analyticCubicSpline     = False,
+                               medianFilterA           = True,
+                               windowSizeA             = 5,
+                               medianFilterB           = True,
+                               windowSizeB             = 5,
+                               float32Mode             = False,
+                               workspace               = None,
+                               statistics              = None):
+    rejected = dict.fromkeys(rejectionStages, 0)
+    
+    if phsWindows:
+        dtype = np.float32 if float32Mode else np.float64
+        
+        if float32Mode and workspace is None:
+            workspace = DPulseWorkspace()
+            
+        # the pulse height windows of detector A and B
+        windows = [(ll_stop, ul_stop, ll_start, ul_start) if B_as_start_A_as_stop else (ll_start, ul_start, ll_stop, ul_stop) for B_as_start_A_as_stop, ll_start, ul_start, ll_stop, ul_stop in phsWindows]
+        
+        pairs, pulseA_origin, pulseB_origin, amplitudeA_o, amplitudeB_o, probabilityA, probabilityB = cascadeOfPulsePairs(voltageA, voltageB, windows, machineInputA, machineInputB, isPositivePolarity, 
+                                                                                                                          medianFilterA, windowSizeA, medianFilterB, windowSizeB, dtype, workspace, rejected, True)
+        
+        pairIndex = firstPair + pairs
+        
+        timeA = timeA[pairs].astype(dtype, copy=False)
+        timeB = timeB[pairs].astype(dtype, copy=False)
+        
+        acceptA = np.ones(len(pairs), dtype=bool)
+        acceptB = np.ones(len(pairs), dtype=bool)
+    else:
+        timeA, timeB, pulseA_origin, pulseB_origin, amplitudeA_o, amplitudeB_o, voltage_normA, voltage_normB, valid = preprocessPulsePairs(timeA, voltageA, timeB, voltageB, machineInputA, machineInputB, isPositivePolarity, medianFilterA, windowSizeA, medianFilterB, windowSizeB, float32Mode, workspace)
+        
+        pairIndex = firstPair + np.flatnonzero(valid)
+        
+        acceptA, probabilityA = classifyPulsesWithProbability(voltage_normA[valid], machineInputA)
+        acceptB, probabilityB = classifyPulsesWithProbability(voltage_normB[valid], machineInputB)
+        
+        timeA, pulseA_origin, amplitudeA_o = timeA[valid], pulseA_origin[valid], amplitudeA_o[valid]
+        timeB, pulseB_origin, amplitudeB_o = timeB[valid], pulseB_origin[valid], amplitudeB_o[valid]
+    
+    cfdTimesA = {}
+    cfdTimesB = {}
+    
+    eventLists = {}
+    
+    for cf_level_A, cf_level_B in cfLevels:
+        if (cf_level_A, cf_level_B) in eventLists:
+            continue
+        
+        if not cf_level_A in cfdTimesA:
+            cfdTimesA[cf_level_A] = calcCFDTimes(timeA, pulseA_origin, amplitudeA_o, cf_level_A, isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+            
+        if not cf_level_B in cfdTimesB:
+            cfdTimesB[cf_level_B] = calcCFDTimes(timeB, pulseB_origin, amplitudeB_o, cf_level_B, isPositivePolarity, cubicSpline, cubicSplineRenderPoints, analyticCubicSpline)
+            
+        cfdTimeA, rejectA = cfdTimesA[cf_level_A]
+        cfdTimeB, rejectB = cfdTimesB[cf_level_B]
+        
+        timed = ~(rejectA | rejectB)
+        
+        events = np.zeros(np.count_nonzero(timed), dtype=lifetimeEventDType)
+        
+        events['pairIndex']    = pairIndex[timed]
+        events['timeA']        = cfdTimeA[timed]
+        events['timeB']        = cfdTimeB[timed]
+        events['amplitudeA']   = np.abs(amplitudeA_o[timed])
+        events['amplitudeB']   = np.abs(amplitudeB_o[timed])
+        events['probabilityA'] = probabilityA[timed]
+        events['probabilityB'] = probabilityB[timed]
+        events['acceptA']      = acceptA[timed]
+        events['acceptB']      = acceptB[timed]
+        
+        eventLists[(cf_level_A, cf_level_B)] = events
+        
+        if len(eventLists) == 1:
+            rejected['cfd'] = len(timed) - len(events)
+            
+    if statistics is not None and phsWindows:
+        statistics['pairs']    = statistics.get('pairs', 0) + len(voltageA)
+        statistics['accepted'] = statistics.get('accepted', 0) + len(pairIndex) - rejected['cfd']
+        
+        for stage in rejectionStages:
+            statistics[stage] = statistics.get(stage, 0) + int(rejected[stage])
+            
+    return eventLists
+
+"""
+
+ This function determines the event list (see 'lifetimeEventDType') of a block of pulse pairs (2D arrays of shape (number of pairs, number of cells)). 
+ 'firstPair' is the index of the first pulse pair of the block in the pulse stream.
  
- The number of TRAINed pulses 'numberOfPulses_train' is equally applied for CORRECT and REJECT pulses.
+ For the description of the params see 'createLifetimeSpectrum(..)'. Other than in 'calcLifetimesOfPulsePairs(..)', the CF times are determined 
+ for all pulse pairs with valid features, so that neither the classification nor the pulse height windows (PHS) are applied.
+ 
+"""
+
+def calcEventsOfPulsePairs(timeA, voltageA, timeB, voltageB,
+                           firstPair               = 0,
+                           machineInputA           = DMachineParams(),
+                           machineInputB           = DMachineParams(),
+                           isPositivePolarity      = False,
+                           cf_level_A              = 25.0,
+                           cf_level_B              = 25.0,
+                           cubicSpline             = True,
+                           cubicSplineRenderPoints = 200,
+                           analyticCubicSpline     = False,
+                           medianFilterA           = True,
+                           windowSizeA             = 5,
+                           medianFilterB           = True,
+                           windowSizeB             = 5,
+                           float32Mode             = False,
+                           workspace               = None):
+    eventLists = calcEventListsOfPulsePairs(timeA, voltageA, timeB, voltageB, [(cf_level_A, cf_level_B)], firstPair, [], machineInputA, machineInputB, isPositivePolarity, 
+                                            cubicSpline, cubicSplineRenderPoints, analyticCubicSpline, medianFilterA, windowSizeA, medianFilterB, windowSizeB, float32Mode, workspace)
+    
+    return eventLists[(cf_level_A, cf_level_B)]
+
+"""
+
+ This function determines the lifetimes [ps] of the events 'events' (see 'lifetimeEventDType') which are accepted by the 
+ machines and the pulse height windows (PHS) in the same way as 'calcLifetimesOfPulsePairs(..)'. 
+ 
+ If 'probabilityThresholdA'/'probabilityThresholdB' >= 0, an event is accepted by the machine of detector A/B if its 
+ probability of the class CORRECT (1) is >= the threshold instead of the stored decision.
+ 
+"""
+
+def lifetimesOfEvents(events, 
+                      B_as_start_A_as_stop  = True,
+                      ll_phs_start_in_mV    = 250.0, ul_phs_start_in_mV = 450.0,
+                      ll_phs_stop_in_mV     = 50.0,  ul_phs_stop_in_mV  = 150.0,
+                      probabilityThresholdA = -1.0,
+                      probabilityThresholdB = -1.0):
+    acceptA = (events['probabilityA'] >= probabilityThresholdA) if probabilityThresholdA >= 0 else (events['acceptA'] != 0)
+    acceptB = (events['probabilityB'] >= probabilityThresholdB) if probabilityThresholdB >= 0 else (events['acceptB'] != 0)
+    
+    if B_as_start_A_as_stop:
+        start, stop = 'B', 'A'
+    else:
+        start, stop = 'A', 'B'
+        
+    amplitudeStart = events['amplitude' + start]
+    amplitudeStop  = events['amplitude' + stop]
+    
+    accept = acceptA & acceptB & (amplitudeStart >= ll_phs_start_in_mV) & (amplitudeStart <= ul_phs_start_in_mV) & (amplitudeStop >= ll_phs_stop_in_mV) & (amplitudeStop <= ul_phs_stop_in_mV)
+    
+    return 1000.0*(events['time' + stop][accept] - events['time' + start][accept])
+
+"""
+
+ This function bins the lifetimes 'lifetime_in_ps' [ps] into a lifetime spectrum of 'numberOfBins' bins of 'binWidth_in_ps' [ps] 
+ shifted by 'offset_in_ps' [ps]. Lifetimes outside of the spectrum are discarded.
+ 
+"""
+
+def binLifetimes(lifetime_in_ps, binWidth_in_ps = 5, numberOfBins = 28000, offset_in_ps = 0.0):
+    overall_region_in_ps = numberOfBins*binWidth_in_ps
+    
+    lifetime_in_ps = np.asarray(lifetime_in_ps, dtype=np.float64) + offset_in_ps
+    lifetime_in_ps = lifetime_in_ps[np.isfinite(lifetime_in_ps)]
+    
+    index = (((lifetime_in_ps/overall_region_in_ps)*numberOfBins)-1).astype(np.int64) # truncation as (int)
+    index = index[(index >= 0) & (index < numberOfBins)]
+    
+    return np.bincount(index, minlength=numberOfBins).astype(np.float64)
+
+"""
+
+ This function writes the header of an event list (see 'lifetimeEventDType') to the opened file 'file'.
+ 
+"""
+
+def writeLifetimeEventListHeader(file, cf_level_A = 25.0, cf_level_B = 25.0, isPositivePolarity = False):
+    header = np.zeros(1, dtype=lifetimeEventListHeaderDType)
+    
+    header['magic']              = lifetimeEventListMagic
+    header['version']            = 1
+    header['cf_level_A']         = cf_level_A
+    header['cf_level_B']         = cf_level_B
+    header['isPositivePolarity'] = isPositivePolarity
+    
+    header.tofile(file)
+
+"""
 
+ This function opens the event list 'fileName' (see 'lifetimeEventDType') written by 'createLifetimeSpectrum(..)'. 
+ The records are mapped into memory (not read).
+ 
  return: 
      
-     (1) list, which contains x-axis data: 'numberOfPulses_train',
-     (2) list, which contains the prediction accuracies [0.0-1.0] for each 'numberOfPulses_train' (1).
+     (1) header (see 'lifetimeEventListHeaderDType') and
+     (2) array of events.
+     
+"""
+
+def readLifetimeEvents(fileName = '/events'):
+    header = np.fromfile(fileName, dtype=lifetimeEventListHeaderDType, count=1)
+    
+    if not len(header) or not header['magic'][0] == lifetimeEventListMagic:
+        raise IOError('{0} is no event list'.format(fileName))
+    
+    numberOfEvents = (os.path.getsize(fileName) - lifetimeEventListHeaderDType.itemsize)//lifetimeEventDType.itemsize
+    
+    if not numberOfEvents:
+        return header[0], np.zeros(0, dtype=lifetimeEventDType)
+    
+    return header[0], np.memmap(fileName, dtype=lifetimeEventDType, mode='r', offset=lifetimeEventListHeaderDType.itemsize, shape=(numberOfEvents,))
+
+"""
+
+ This function rebuilds a lifetime spectrum from the event list 'eventList' (file name or array of events, see 'lifetimeEventDType') 
+ without reading the pulse stream again. The events are processed in chunks of 'chunkSize' events.
+ 
+ For the description of the params see 'createLifetimeSpectrum(..)' and 'lifetimesOfEvents(..)'. 
+ The CF levels are those of the run which has written the event list.
  
+ return: 
+     
+     (1) lifetime spectrum.
+     
 """
 
-def runPipelineNPulses(fileNameCorrectPulses_train = '/correct_train', 
-                       fileNameRejectPulses_train  = '/reject_train', 
-                       fileNameCorrectPulses_test  = '/correct_test', 
-                       fileNameRejectPulses_test   = '/correct_test', 
-                       numberOfPulses_train        = [2, 50, 1],
-                       numberOfPulses_test         = 1000,
-                       isPositivePolarity          = False,
-                       machineInput                = DMachineParams(),
-                       debug                       = True):
-   mlInput = machineInput.copy()
-   
-   plArrX   = []
-   plArrY   = []
-   
-   size = (numberOfPulses_train[1] + numberOfPulses_train[2])/numberOfPulses_train[2]
-   counter = 0
+def lifetimeSpectrumOfEvents(eventList             = '/events',
+                             binWidth_in_ps        = 5,
+                             numberOfBins          = 28000,
+                             offset_in_ps          = 0.0,
+                             B_as_start_A_as_stop  = True,
+                             ll_phs_start_in_mV    = 250.0, ul_phs_start_in_mV = 450.0,
+                             ll_phs_stop_in_mV     = 50.0,  ul_phs_stop_in_mV  = 150.0,
+                             probabilityThresholdA = -1.0,
+                             probabilityThresholdB = -1.0,
+                             chunkSize             = 10000000):
+    if isinstance(eventList, str):
+        __, eventList = readLifetimeEvents(eventList)
+        
+    lifetimeSpectrum = np.zeros(numberOfBins)
     
-   for N in range(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]): 
-       counter += 1
-       
-       score, __   = trainAndTest(fileNameCorrectPulses_train, 
-                                  fileNameRejectPulses_train,
-                                  fileNameCorrectPulses_test, 
-                                  fileNameRejectPulses_test,
-                                  N,
-                                  N,
-                                  numberOfPulses_test,
-                                  isPositivePolarity,
-                                  mlInput)
-       plArrX. append(N)
-       plArrY. append(score)
-       
-       if debug:
-           sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, size, 100.0*counter/size))
-       
-   return plArrX, plArrY
+    for first in range(0, len(eventList), chunkSize):
+        lifetime_in_ps = lifetimesOfEvents(eventList[first:first+chunkSize], B_as_start_A_as_stop, ll_phs_start_in_mV, ul_phs_start_in_mV, ll_phs_stop_in_mV, ul_phs_stop_in_mV, probabilityThresholdA, probabilityThresholdB)
+        
+        lifetimeSpectrum += binLifetimes(lifetime_in_ps, binWidth_in_ps, numberOfBins, offset_in_ps)
+        
+    return lifetimeSpectrum
+
+"""
+
+ This function returns the partial lifetime spectrum of a block of pulse pairs (see 'calcLifetimesOfPulsePairs(..)'). 
+ 
+ If 'eventList' == 'True', the event list of the block is determined (see 'calcEventsOfPulsePairs(..)') and the partial 
+ lifetime spectrum is binned from it. 'firstPair' is the index of the first pulse pair of the block in the pulse stream.
+ 
+ If 'configurations' (see 'spectrumConfigurationsOf(..)') is given, the event lists of the block are determined for all CF levels 
+ at once (see 'calcEventListsOfPulsePairs(..)') and binned into one partial lifetime spectrum per configuration.
+ 
+ The rejection counts per stage are added to 'statistics' (see 'calcLifetimesOfPulsePairs(..)' and 'calcEventListsOfPulsePairs(..)') if not 'eventList'.
+ 
+ return: 
+     
+     (1) partial lifetime spectrum (list of partial lifetime spectra if 'configurations') and
+     (2) event list of the block (None if not 'eventList').
+     
+"""
+
+def lifetimeSpectrumOfBlock(timeA, voltageA, timeB, voltageB, binning, lifetimeParams, workspace = None, eventList = False, firstPair = 0, configurations = None, statistics = None):
+    if not eventList and not configurations:
+        return binLifetimes(calcLifetimesOfPulsePairs(timeA, voltageA, timeB, voltageB, workspace=workspace, statistics=statistics, **lifetimeParams), **binning), None
+    
+    p = lifetimeParams
+    
+    if not configurations:
+        configurations = [dict(binning, **p)]
+        
+    # without event list: time only the pulse pairs which might be accepted by any configuration
+    phsWindows = [] if eventList else [(c['B_as_start_A_as_stop'], c['ll_phs_start_in_mV'], c['ul_phs_start_in_mV'], c['ll_phs_stop_in_mV'], c['ul_phs_stop_in_mV']) for c in configurations]
+    
+    eventLists = calcEventListsOfPulsePairs(timeA, voltageA, timeB, voltageB, [(c['cf_level_A'], c['cf_level_B']) for c in configurations], firstPair, phsWindows, p['machineInputA'], p['machineInputB'], p['isPositivePolarity'], 
+                                            p['cubicSpline'], p['cubicSplineRenderPoints'], p['analyticCubicSpline'], p['medianFilterA'], p['windowSizeA'], p['medianFilterB'], p['windowSizeB'], p['float32Mode'], workspace, statistics)
+    
+    partialSpectra = []
+    
+    for c in configurations:
+        lifetime_in_ps = lifetimesOfEvents(eventLists[(c['cf_level_A'], c['cf_level_B'])], c['B_as_start_A_as_stop'], c['ll_phs_start_in_mV'], c['ul_phs_start_in_mV'], c['ll_phs_stop_in_mV'], c['ul_phs_stop_in_mV'])
+        
+        partialSpectra.append(binLifetimes(lifetime_in_ps, c['binWidth_in_ps'], c['numberOfBins'], c['offset_in_ps']))
+        
+    if not eventList:
+        return partialSpectra, None
+    
+    return partialSpectra[0], eventLists[(p['cf_level_A'], p['cf_level_B'])]
+
+"""
+
+ This generator yields the partial lifetime spectra of the blocks of pulse pairs 'blocks' (timeA, voltageA, timeB, voltageB) 
+ of live data (see 'iterSharedMemoryPulseBlocks(..)' and 'iterFollowPulseBlocks(..)'). 
+ 
+ yields: 
+     
+     (1) partial lifetime spectrum, 
+     (2) number of pulse pairs processed for (1) and 
+     (3) event list of the pulse pairs (None if not 'eventList').
+     
+ If 'configurations' is given, (1) is a list of partial lifetime spectra (see 'lifetimeSpectrumOfBlock(..)'). 
+ The rejection counts per stage are added to 'statistics' (see 'lifetimeSpectrumOfBlock(..)').
+     
+"""
+
+def iterLifetimeSpectraOfPulseBlocks(blocks, binning, lifetimeParams, eventList = False, configurations = None, statistics = None):
+    workspace = DPulseWorkspace() if lifetimeParams.get('float32Mode', False) else None
+    
+    firstPair = 0
+    
+    for timeA, voltageA, timeB, voltageB in blocks:
+        partialSpectrum, events = lifetimeSpectrumOfBlock(timeA, voltageA, timeB, voltageB, binning, lifetimeParams, workspace, eventList, firstPair, configurations, statistics)
+        
+        yield partialSpectrum, len(voltageA), events
+        
+        firstPair += len(voltageA)
+
+"""
+
+ This function splits the pulse pairs of 'reader' (see 'DPulseStreamReader') into segments according to its index trailer. 
+ A segment is marked to be skipped if none of its pulse pairs can pass the pulse height windows (PHS) of 'lifetimeParams' 
+ (see 'calcLifetimesOfPulsePairs(..)'): the amplitude bound of the index entry of the start or stop detector is below the 
+ lower level of its PHS window. The amplitude bound holds for any median filter and baseline correction applied.
+ 
+ return: 
+     
+     (1) list of segments (first pair, number of pairs, skip?) covering all pulse pairs.
+     
+"""
+
+def phsSegmentsOfPulseStream(reader, lifetimeParams):
+    numberOfPairs = reader.numberOfPulses()
+    
+    # a dataset (see 'DPulseStreamDataset') has no index of its own
+    if reader.m_indexFooter is None or not int(reader.m_indexFooter['pairs']) or not reader.m_pairs:
+        return [(0, numberOfPairs, False)]
+    
+    entries = reader.m_indexEntries
+    
+    first = (entries['offsetInBytes'].astype(np.int64) - reader.m_headerBytes)//reader.recordBytes()
+    count = entries['numberOfRecords'].astype(np.int64)
+    
+    # small margin for the amplitude bound rounded to float32
+    maxAmplitude = entries['maxAmplitude'].astype(np.float64)*(1.0 + 1e-6) + 1e-6
+    
+    start, stop = (1, 0) if lifetimeParams.get('B_as_start_A_as_stop', True) else (0, 1)
+    
+    skip = (maxAmplitude[:, start] < lifetimeParams.get('ll_phs_start_in_mV', 250.0)) | (maxAmplitude[:, stop] < lifetimeParams.get('ll_phs_stop_in_mV', 50.0))
+    
+    segments = []
+    
+    nextPair = 0
+    
+    for f, c, sk in zip(first, count, skip):
+        f = int(f)
+        c = int(min(c, numberOfPairs - f))
+        
+        if f < nextPair or c <= 0: # inconsistent index: do not skip anything
+            return [(0, numberOfPairs, False)]
+        
+        if f > nextPair:
+            segments.append((nextPair, f - nextPair, False))
+            
+        segments.append((f, c, bool(sk)))
+        
+        nextPair = f + c
+        
+    if nextPair < numberOfPairs:
+        segments.append((nextPair, numberOfPairs - nextPair, False))
+        
+    return segments
+
+"""
+
+ This generator yields the partial lifetime spectra of the pulse pairs [start:start+count] of 'pulseStreamFile' in blocks 
+ of at most 'blockSize' pulse pairs. Blocks which cannot pass the pulse height windows are skipped without reading 
+ (see 'phsSegmentsOfPulseStream(..)'), unless the event list is determined ('eventList' == 'True', see 'lifetimeSpectrumOfBlock(..)').
+ 
+ If 'pulseStreamFile' consists of several files (see 'pulseStreamSegments(..)'), the files in front of 'start' are not opened.
+ 
+ If 'count' == -1 (default), all pulse pairs from 'start' until the end of the stream are processed.
+ 
+ yields: 
+     
+     (1) partial lifetime spectrum, 
+     (2) number of pulse pairs processed for (1) and
+     (3) event list of the pulse pairs (None if not 'eventList').
+     
+ If 'configurations' is given, (1) is a list of partial lifetime spectra (see 'lifetimeSpectrumOfBlock(..)') and a block 
+ is only skipped if it cannot pass the pulse height windows of any configuration. 
+ The rejection counts per stage, including the pulse pairs of skipped blocks ('indexTrailer'), are added to 'statistics' (see 'lifetimeSpectrumOfBlock(..)').
+     
+"""
+
+def iterLifetimeSpectrumBlocks(pulseStreamFile, blockSize, binning, lifetimeParams, start = 0, count = -1, eventList = False, configurations = None, statistics = None):
+    firstPair = 0 # first pulse pair of the segment in the pulse stream
+    
+    workspace = DPulseWorkspace() if lifetimeParams.get('float32Mode', False) else None
+    
+    for segmentFileName, numberOfRecords in pulseStreamSegments(pulseStreamFile, pairs=True):
+        if not count == -1 and firstPair >= start + count:
+            break
+        
+        if firstPair + numberOfRecords <= start:
+            firstPair += numberOfRecords
+            continue
+        
+        reader = DPulseStreamReader(segmentFileName, pairs=True)
+        
+        numberOfPairs = reader.numberOfPulses()
+        
+        stop = numberOfPairs if count == -1 else min(start + count - firstPair, numberOfPairs)
+        
+        try:
+            if eventList:
+                segments = [(0, numberOfPairs, False)]
+            elif configurations:
+                # skip a block only if it is skipped for all configurations (same index --> same segments)
+                segmentsOfConfigurations = [phsSegmentsOfPulseStream(reader, c) for c in configurations]
+                
+                segments = [(blockStart, blockCount, all(segmentsOfConfiguration[k][2] for segmentsOfConfiguration in segmentsOfConfigurations)) for k, (blockStart, blockCount, __) in enumerate(segmentsOfConfigurations[0])]
+            else:
+                segments = phsSegmentsOfPulseStream(reader, lifetimeParams)
+            
+            for blockStart, blockCount, skip in segments:
+                first = max(start - firstPair, blockStart)
+                last  = min(stop, blockStart + blockCount)
+                
+                if first >= last:
+                    continue
+                
+                if skip and statistics is not None:
+                    statistics['pairs']        = statistics.get('pairs', 0) + last - first
+                    statistics['indexTrailer'] = statistics.get('indexTrailer', 0) + last - first
+                    
+                if skip and configurations:
+                    yield [np.zeros(c['numberOfBins']) for c in configurations], last - first, None
+                    continue
+                
+                if skip:
+                    yield np.zeros(binning['numberOfBins']), last - first, None
+                    continue
+                
+                for block in range(first, last, blockSize):
+                    timeA, voltageA, timeB, voltageB = reader.readBlock(block, min(blockSize, last - block))
+                    
+                    partialSpectrum, events = lifetimeSpectrumOfBlock(timeA, voltageA, timeB, voltageB, binning, lifetimeParams, workspace, eventList, firstPair + block, configurations, statistics)
+                    
+                    yield partialSpectrum, len(voltageA), events
+        finally:
+            reader.close()
+            
+        firstPair += numberOfPairs
 
 """
 
- This function executes a pipeline on a TESTing ('_test') and TRAINing ('_train') set of 
- streamed pulses ('fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx') by varying the 
- window size of the applied median filter (note: odd numbers are required!) for a given machine 
- definition (classifier) 'machineInput'.
-
- The list 'medianFilterIncr' defines the window size region used for the TRAINing cycle, f.e.: 
-     
- [3, 31, 2] means: looping from 3 to (=)31 with an increment of 2 to consider ODD numbers.
- 
- Note: the median filter requires ODD window sizes for each step in the pipeline.
-
- The number of TRAINed pulses 'numberOfPulses_train' is equally applied for CORRECT and REJECT pulses.
- 
- return: 
+ These functions are executed by the worker processes of 'createLifetimeSpectrum(..)' if 'numberOfProcesses' > 1: 
      
-     (1) list, which contains x-axis data: 'medianFilterIncr',
-     (2) list, which contains the prediction accuracies [0.0-1.0] for each 'medianFilterIncr' (1).
+ Each worker process receives the TRAINed machines and the settings only once (initializer) and returns 
+ the partial lifetime spectrum of a range of pulse pairs [startPair:startPair+numberOfPairs] in the pulse stream.
  
 """
 
-def runPipelineMedianWindow(fileNameCorrectPulses_train = '/correct_train', 
-                            fileNameRejectPulses_train  = '/reject_train', 
-                            fileNameCorrectPulses_test  = '/correct_test', 
-                            fileNameRejectPulses_test   = '/correct_test', 
-                            numberOfPulses_train        = 15,
-                            numberOfPulses_test         = 1000,
-                            isPositivePolarity          = False,
-                            machineInput                = DMachineParams(),
-                            medianFilterIncr            = [3, 31, 2],
-                            debug                       = True):
-   mlInput = machineInput.copy()
+workerLifetimeSpectrum = {}
+
+def initLifetimeSpectrumWorker(pulseStreamFile, blockSize, binning, lifetimeParams, eventList = False, configurations = None):
+    workerLifetimeSpectrum['pulseStreamFile'] = pulseStreamFile
+    workerLifetimeSpectrum['blockSize']       = blockSize
+    workerLifetimeSpectrum['binning']         = binning
+    workerLifetimeSpectrum['lifetimeParams']  = lifetimeParams
+    workerLifetimeSpectrum['eventList']       = eventList
+    workerLifetimeSpectrum['configurations']  = configurations
     
-   plArrX   = []
-   plArrY   = []
-   
-   size = (medianFilterIncr[1] + medianFilterIncr[2])/medianFilterIncr[2]
-   counter = 0
-   
-   for N in range(medianFilterIncr[0], medianFilterIncr[1] + medianFilterIncr[2], medianFilterIncr[2]): 
-       mlInput.m_windowSize = N 
-       
-       counter += 1
-       
-       score, __   = trainAndTest(fileNameCorrectPulses_train, 
-                                  fileNameRejectPulses_train,
-                                  fileNameCorrectPulses_test, 
-                                  fileNameRejectPulses_test,
-                                  numberOfPulses_train,
-                                  numberOfPulses_train,
-                                  numberOfPulses_test,
-                                  isPositivePolarity,
-                                  mlInput)
-       plArrX. append(N)
-       plArrY. append(score)
-       
-       if debug:
-           sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, size, 100.0*counter/size))
-            
-   return plArrX, plArrY
+def lifetimeSpectrumOfRange(startPair, numberOfPairs):
+    binning        = workerLifetimeSpectrum['binning']
+    lifetimeParams = workerLifetimeSpectrum['lifetimeParams']
+    eventList      = workerLifetimeSpectrum['eventList']
+    configurations = workerLifetimeSpectrum['configurations']
+    
+    if configurations:
+        lifetimeSpectrum = [np.zeros(c['numberOfBins']) for c in configurations]
+    else:
+        lifetimeSpectrum = np.zeros(binning['numberOfBins'])
+    
+    events = []
+    
+    statistics = {}
+    
+    for partialSpectrum, __, partialEvents in iterLifetimeSpectrumBlocks(workerLifetimeSpectrum['pulseStreamFile'], workerLifetimeSpectrum['blockSize'], binning, lifetimeParams, startPair, numberOfPairs, eventList, configurations, statistics):
+        if configurations:
+            for spectrum, partial in zip(lifetimeSpectrum, partialSpectrum):
+                spectrum += partial
+        else:
+            lifetimeSpectrum += partialSpectrum
+        
+        if partialEvents is not None:
+            events.append(partialEvents)
+        
+    return lifetimeSpectrum, numberOfPairs, np.concatenate(events) if events else None, statistics
 
 """
 
- This function combines functions: runPipelineNPulses(..) and runPipelineMedianWindow(..).
+ This generator yields the partial lifetime spectra of the pulse pairs of 'pulseStreamFile' processed in parallel by 
+ 'numberOfProcesses' worker processes, i.e. the pulse stream is split into ranges of fixed-size pulse pairs. 
+ The ranges do not cross the files of a manifest or dataset (see 'pulseStreamSegments(..)'), so that the files are processed concurrently.
+ 
+ yields: 
+     
+     (1) partial lifetime spectrum, 
+     (2) number of pulse pairs processed for (1) and
+     (3) event list of the pulse pairs (None if not 'eventList').
+     
+ If 'configurations' is given, (1) is a list of partial lifetime spectra (see 'lifetimeSpectrumOfBlock(..)'). 
+ The rejection counts per stage of all worker processes are added to 'statistics' (see 'lifetimeSpectrumOfBlock(..)').
  
+ The ranges are submitted lazily (at most two per worker process are pending). If the generator is closed (e.g. 'targetCounts' reached), 
+ the pending ranges are cancelled and only the ranges already in progress are finished (and discarded).
+     
 """
 
-def runPipelineGrid(fileNameCorrectPulses_train = '/correct_train', 
-                    fileNameRejectPulses_train  = '/reject_train', 
-                    fileNameCorrectPulses_test  = '/correct_test', 
-                    fileNameRejectPulses_test   = '/correct_test', 
-                    numberOfPulses_train        = [2, 50, 1],
-                    medianFilterIncr            = [3, 31, 2],
-                    numberOfPulses_test         = 1000,
-                    isPositivePolarity          = False,
-                    machineInput                = DMachineParams(),
-                    debug                       = True):
-    mlInput = machineInput.copy()
+def iterLifetimeSpectraParallel(pulseStreamFile, numberOfPairs, numberOfProcesses, blockSize, binning, lifetimeParams, eventList = False, configurations = None, statistics = None):
+    numberOfRanges = max(1, min(numberOfPairs//blockSize, 8*numberOfProcesses))
+    pairsPerRange  = -(-numberOfPairs//numberOfRanges) # ceil
     
-    _plArrY   = []
-   
-    _xAxis    = np.arange(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]) # number of pulses (N CORRECT = N REJECT)
-    _yAxis    = np.arange(medianFilterIncr[0],     medianFilterIncr[1] + medianFilterIncr[2],         medianFilterIncr[2])     # median filter window size
+    ranges = []
     
-    counter = 0
+    firstPair = 0
     
-    for N_m in range(medianFilterIncr[0], medianFilterIncr[1] + medianFilterIncr[2], medianFilterIncr[2]):
-        mlInput.m_windowSize = N_m
+    for __, numberOfRecords in pulseStreamSegments(pulseStreamFile, pairs=True):
+        lastPair = firstPair + numberOfRecords
         
-        plArrY   = []
+        ranges += [(startPair, min(pairsPerRange, lastPair - startPair)) for startPair in range(firstPair, lastPair, pairsPerRange)]
         
-        for N_p in range(numberOfPulses_train[0], numberOfPulses_train[1] + numberOfPulses_train[2], numberOfPulses_train[2]): 
-           counter += 1
-            
-           score, __   = trainAndTest(fileNameCorrectPulses_train, 
-                                      fileNameRejectPulses_train,
-                                      fileNameCorrectPulses_test, 
-                                      fileNameRejectPulses_test,
-                                      N_p,
-                                      N_p,
-                                      numberOfPulses_test,
-                                      isPositivePolarity,
-                                      mlInput)
-           
-           if debug:
-               sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, len(_xAxis)*len(_yAxis), 100.0*counter/(len(_xAxis)*len(_yAxis))))
-            
-           plArrY.append(score)
-           
-        _plArrY. append(plArrY)
+        firstPair = lastPair
         
-    return _xAxis, _yAxis, _plArrY
+    with ProcessPoolExecutor(max_workers=numberOfProcesses, initializer=initLifetimeSpectrumWorker, initargs=(pulseStreamFile, blockSize, binning, lifetimeParams, eventList, configurations)) as executor:
+        pending   = set()
+        nextRange = 0
+        
+        try:
+            while nextRange < len(ranges) or pending:
+                while nextRange < len(ranges) and len(pending) < 2*numberOfProcesses:
+                    pending.add(executor.submit(lifetimeSpectrumOfRange, *ranges[nextRange]))
+                    
+                    nextRange += 1
+                    
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    partialSpectrum, numberOfPairsInRange, events, partialStatistics = future.result()
+                    
+                    if statistics is not None:
+                        for key, value in partialStatistics.items():
+                            statistics[key] = statistics.get(key, 0) + value
+                            
+                    yield partialSpectrum, numberOfPairsInRange, events
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
 """
 
- This function executes a pipeline on a TESTing ('_test') and TRAINing ('_train') set of 
- streamed pulses ('fileNameCorrectPulses_xx' and 'fileNameRejectPulses_xx') by varying the 
- number of CORRECT pulses vs. the number of REJECT pulses for a given machine 
- definition (classifier) 'machineInput'.
+ The settings of 'createLifetimeSpectrum(..)' which might differ between the spectra created from a single pass over the 
+ pulse stream (see 'spectrumConfigurations') and the name of the output file of each spectrum.
+ 
+"""
 
- The list 'numberOfPulsesCorrect_xxx' defines the number of pulses used for the TRAINing cycle, f.e.: 
-     
- [3, 31, 2] means: looping from 3 to (=)31 with an increment of 2.
+spectrumConfigurationKeys = ('binWidth_in_ps', 'numberOfBins', 'offset_in_ps', 
+                             'B_as_start_A_as_stop', 
+                             'cf_level_A', 'cf_level_B', 
+                             'll_phs_start_in_mV', 'ul_phs_start_in_mV', 
+                             'll_phs_stop_in_mV',  'ul_phs_stop_in_mV', 
+                             'outputName')
+
+"""
+
+ This function completes the spectrum configurations 'spectrumConfigurations' (list of dictionaries with keys of 'spectrumConfigurationKeys') 
+ with the settings 'binning' and 'lifetimeParams' of 'createLifetimeSpectrum(..)'. The k-th spectrum is stored in the file 
+ 'outputName_k' unless its configuration contains an 'outputName'.
  
  return: 
      
-     (1) list, which contains x-axis data: 'numberOfPulsesCorrect_train',
-     (2) list, which contains y-axis data: 'fileNameRejectPulses_train',
-     (3) list, which contains the prediction accuracies [0.0-1.0] for each point (x,y).
-     (4) point (x,y) of the best prediction accuracy and the repsective accuracy score [0.0-1.0].
- 
+     (1) list of complete spectrum configurations.
+     
 """
 
-def runPipelineGrid2(fileNameCorrectPulses_train = '/correct_train', 
-                     fileNameRejectPulses_train  = '/reject_train', 
-                     fileNameCorrectPulses_test  = '/correct_test', 
-                     fileNameRejectPulses_test   = '/correct_test', 
-                     numberOfPulsesCorrect_train = [2, 50, 1],
-                     numberOfPulsesReject_train  = [2, 50, 1],
-                     numberOfPulses_test         = 1000,
-                     isPositivePolarity          = False,
-                     machineInput                = DMachineParams(),
-                     debug                       = True):
-    mlInput = machineInput.copy()
-    
-    _plArrY   = []
-   
-    _xAxis    = np.arange(numberOfPulsesCorrect_train[0], numberOfPulsesCorrect_train[1] + numberOfPulsesCorrect_train[2], numberOfPulsesCorrect_train[2]) # number of pulses: CORRECT
-    _yAxis    = np.arange(numberOfPulsesReject_train[0],  numberOfPulsesReject_train[1] + numberOfPulsesReject_train[2],   numberOfPulsesReject_train[2])  # number of pulses: REJECT
+def spectrumConfigurationsOf(spectrumConfigurations, binning, lifetimeParams, outputName = '/spectrum'):
+    configurations = []
     
-    bestList  = [0.0, 0, 0]
-    maxScore  = -1.0       
-
-    counter = 0              
-                         
-    for N_r in range(numberOfPulsesReject_train[0], numberOfPulsesReject_train[1] + numberOfPulsesReject_train[2], numberOfPulsesReject_train[2]):
-        plArrY   = []
+    for k, spectrumConfiguration in enumerate(spectrumConfigurations):
+        unknownKeys = sorted(set(spectrumConfiguration) - set(spectrumConfigurationKeys))
         
-        for N_c in range(numberOfPulsesCorrect_train[0], numberOfPulsesCorrect_train[1] + numberOfPulsesCorrect_train[2], numberOfPulsesCorrect_train[2]): 
-           counter += 1
-           
-           score, __   = trainAndTest(fileNameCorrectPulses_train, 
-                                      fileNameRejectPulses_train,
-                                      fileNameCorrectPulses_test, 
-                                      fileNameRejectPulses_test,
-                                      N_c,
-                                      N_r,
-                                      numberOfPulses_test,
-                                      isPositivePolarity,
-                                      mlInput)
-           
-           if debug:
-               sys.stdout.write('\rprogress: [{0}/{1}] = {2}%'.format(counter, len(_xAxis)*len(_yAxis), 100.0*counter/(len(_xAxis)*len(_yAxis))))
-             
-           if score >= maxScore:
-               maxScore    = score
-               
-               bestList[0] = score
-               bestList[1] = N_c
-               bestList[2] = N_r
-           
-           plArrY.append(score)
-           
-        _plArrY. append(plArrY)
+        if unknownKeys:
+            raise ValueError('spectrum configuration {0}: unsupported settings {1} (supported: {2})'.format(k, unknownKeys, spectrumConfigurationKeys))
         
-    return _xAxis, _yAxis, _plArrY, bestList
+        configuration = dict(binning, outputName='{0}_{1}'.format(outputName, k))
+        
+        for key in spectrumConfigurationKeys:
+            if key in lifetimeParams:
+                configuration[key] = lifetimeParams[key]
+                
+        configuration.update(spectrumConfiguration)
+        
+        configurations.append(configuration)
+        
+    return configurations
 
 """
 
@@ -1494,6 +4525,11 @@ def runPipelineGrid2(fileNameCorrectPulses_train = '/correct_train',
  using the TRAINned/learned machines 'machineInputA' and 'machineInputB' for detector A and B respectively. 
  The resulting lifetime spectrum is stored in the file 'outputName' after each 100 counts acquired.
  
+ If 'pulseStreamFile' has an index trailer, blocks of pulse pairs which cannot pass the pulse height windows are skipped 
+ (see 'phsSegmentsOfPulseStream(..)').
+ 
+ 'pulseStreamFile' might be a manifest, glob pattern or list of pulse-stream files (see 'DPulseStreamDataset'), which is processed as ONE pulse stream.
+ 
  params: 
      
    'isPositivePolarity'                   >> pulse polarity: 'True' for (+)  and 'False' for (-)
@@ -1507,10 +4543,51 @@ def runPipelineGrid2(fileNameCorrectPulses_train = '/correct_train',
    ll_phs_stop_in_mV,  ul_phs_stop_in_mV  >> lower/upper level in absolute values of millivolts [mV] for the accepted pulse heights (amplitudes) of the stop branch
    cubicSpline                            >> if 'True', a cubic spline with a render depth of 'cubicSplineRenderPoints' between two neighbouring sampling points is applied for the determination of the CF level,
    cubicSplineRenderPoints                >> see 'cubicSpline'
+   analyticCubicSpline                    >> if 'True' (and 'cubicSpline' == 'True'), the CF level is solved in closed form on a cubic spline fitted to the local neighbourhood of the CF level (see 'calcCFDTimeCubicSpline(..)')
    medianFilterA                          >> if 'True', a median filter is applied with the given window size 'windowSizeA' on the pulse data of detector A
    windowSizeA                            >> see 'medianFilterA'
    medianFilterB                          >> if 'True', a median filter is applied with the given window size 'windowSizeB' on the pulse data of detector B
    windowSizeB                            >> see 'medianFilterB'
+   blockSize                              >> number of pulse pairs processed at once
+   numberOfProcesses                      >> if > 1, the pulse stream is split into ranges of pulse pairs, which are processed by 'numberOfProcesses' worker processes. 
+                                             The partial lifetime spectra are summed up to the final lifetime spectrum.
+                                             Note: on Windows, the calling script must be protected by 'if __name__ == '__main__':'.
+   sharedMemoryName                       >> if not '', the pulse pairs are consumed live from the shared memory ring buffer 'sharedMemoryName' (see 'iterSharedMemoryPulseBlocks(..)') 
+                                             instead of 'pulseStreamFile' until the producer closes the ring or no pulse pair is received for 'idleTimeout_in_s' seconds
+   idleTimeout_in_s                       >> see 'sharedMemoryName' and 'follow'
+   follow                                 >> if 'True', 'pulseStreamFile' is followed while it is still written (see 'iterFollowPulseBlocks(..)'): the lifetime spectrum is updated 
+                                             with the pulse pairs appended each 'pollInterval_in_s' seconds until the file 'sentinelFileName' exists (if not '') 
+                                             or the file has not grown for 'idleTimeout_in_s' seconds
+   sentinelFileName, pollInterval_in_s    >> see 'follow'
+   targetCounts                           >> if > 0, the lifetime spectrum is finished as soon as it contains 'targetCounts' counts (with 'numberOfProcesses' > 1, the 
+                                             pending ranges of pulse pairs are cancelled, see 'iterLifetimeSpectraParallel(..)')
+   float32Mode                            >> if 'True', the pulse pairs are processed as float32 (the type stored in the pulse stream) instead of float64 from the reader 
+                                             through the preprocessing, the classifier input and the CF timing using reusable workspace buffers (see 'DPulseWorkspace'). 
+                                             Only the CF level crossing is solved in float64. This halves the memory traffic per pulse pair. 
+                                             Accuracy (compared to float64, asserted by tests/test_float32Mode.py): the lifetimes differ by < 1e-4 ps (linear CF interpolation 
+                                             and cubic spline), the features by < 1e-6 and the classifier scores by < 1e-5 (measured: up to 5e-5 ps, 2e-7 and 5e-6), so that 
+                                             only pulse pairs directly at the decision boundary, at the edge of a PHS window or at a bin edge may end up differently.
+   eventListFileName                      >> if not '', an event list (list mode) with ONE record per pulse pair with valid features and CF times is written to 'eventListFileName' 
+                                             (see 'lifetimeEventDType'), from which spectra with other bin widths, offsets, PHS windows, start/stop assignments or probability 
+                                             thresholds are rebuilt without reading the pulse stream again (see 'lifetimeSpectrumOfEvents(..)'). Blocks are not skipped by the index trailer 
+                                             and the CF times are determined for all pulse pairs (not only the accepted ones). With 'numberOfProcesses' > 1, the records are 
+                                             not ordered by 'pairIndex'. If the processing fails or is interrupted, the records written so far are kept 
+                                             as '<eventListFileName>.partial' (incomplete), so that no incomplete file is left under 'eventListFileName'.
+   spectrumConfigurations                 >> if not empty, a list of spectrum configurations (dictionaries), each overriding some of the settings of 'spectrumConfigurationKeys' 
+                                             (bin width, number of bins, offset, start/stop assignment, CF levels, PHS windows and the output file, default: 'outputName_k'). 
+                                             All spectra are created from a single pass: each pulse pair is read, filtered and classified once and timed once per CF level 
+                                             (see 'calcEventListsOfPulsePairs(..)'). Blocks are skipped by the index trailer only if no configuration can accept them. 
+                                             The progress, 'targetCounts' and the plot refer to the first spectrum. Cannot be combined with 'eventListFileName'.
+   statistics                             >> if a dictionary is given, the number of pulse pairs ('pairs'), the number of pulse pairs rejected per stage of the rejection cascade 
+                                             (see 'rejectionStages' and 'calcLifetimesOfPulsePairs(..)') and the number of accepted pulse pairs ('accepted') are added to it. 
+                                             If 'debug', the rejection counts are printed at the end. With 'spectrumConfigurations', the pulse pairs pass the cascade with the union 
+                                             of all pulse height windows (see 'calcEventListsOfPulsePairs(..)'), so that 'phs' counts the pulse pairs outside of all windows and 'cfd'/'accepted' 
+                                             refer to the CF levels of the first spectrum before its own window is applied. Not collected with 'eventListFileName' (the event list 
+                                             bypasses the cascade: all pulse pairs with valid features are classified and timed).
+ 
+ return: 
+     
+     (1) lifetime spectrum (list of lifetime spectra if 'spectrumConfigurations').
  
 """
 
@@ -1529,207 +4606,183 @@ def createLifetimeSpectrum(machineInputA           = DMachineParams(),
                            ll_phs_stop_in_mV       = 50.0,  ul_phs_stop_in_mV  = 150.0,
                            cubicSpline             = True,
                            cubicSplineRenderPoints = 200,
+                           analyticCubicSpline     = False,
                            medianFilterA           = True,
                            windowSizeA             = 5,
                            medianFilterB           = True,
                            windowSizeB             = 5,
-                           debug                   = True):
-    # (1) retrieve classifier:
-    classifierA = machineInputA.m_classifier
-    classifierB = machineInputB.m_classifier
+                           debug                   = True,
+                           blockSize               = 1000,
+                           numberOfProcesses       = 1,
+                           sharedMemoryName        = '',
+                           idleTimeout_in_s        = 10.0,
+                           follow                  = False,
+                           sentinelFileName        = '',
+                           pollInterval_in_s       = 1.0,
+                           targetCounts            = -1,
+                           float32Mode             = False,
+                           eventListFileName       = '',
+                           spectrumConfigurations  = [],
+                           statistics              = None):
+    # (1) collect the settings of the binning and the lifetime determination:
+    binning        = dict(binWidth_in_ps          = binWidth_in_ps,
+                          numberOfBins            = numberOfBins,
+                          offset_in_ps            = offset_in_ps)
+    
+    lifetimeParams = dict(machineInputA           = machineInputA,
+                          machineInputB           = machineInputB,
+                          isPositivePolarity      = isPositivePolarity,
+                          B_as_start_A_as_stop    = B_as_start_A_as_stop,
+                          cf_level_A              = cf_level_A,
+                          cf_level_B              = cf_level_B,
+                          ll_phs_start_in_mV      = ll_phs_start_in_mV, ul_phs_start_in_mV = ul_phs_start_in_mV,
+                          ll_phs_stop_in_mV       = ll_phs_stop_in_mV,  ul_phs_stop_in_mV  = ul_phs_stop_in_mV,
+                          cubicSpline             = cubicSpline,
+                          cubicSplineRenderPoints = cubicSplineRenderPoints,
+                          analyticCubicSpline     = analyticCubicSpline,
+                          medianFilterA           = medianFilterA,
+                          windowSizeA             = windowSizeA,
+                          medianFilterB           = medianFilterB,
+                          windowSizeB             = windowSizeB,
+                          float32Mode             = float32Mode)
+    
+    configurations = spectrumConfigurationsOf(spectrumConfigurations, binning, lifetimeParams, outputName)
+    
+    if configurations and eventListFileName:
+        raise ValueError('an event list cannot be written together with several spectrum configurations')
     
     # (2) open pulse stream and read header to extract necessary information:
-    fileSize = os.path.getsize(pulseStreamFile)
+    if sharedMemoryName:
+        fileSize = 0 # unknown for live data
         
-    with open(pulseStreamFile, "rb") as streamFile:
-        numberOfCells, sweepInNanoseconds, frequencyInGHz = readHeader(streamFile)
+        reader = DPulseStreamSharedMemoryReader(sharedMemoryName)
         
-        if debug:
-            print('number of cells:  {0}'.format(numberOfCells))
-            print('sweep in ns:      {0}'.format(sweepInNanoseconds))
-            print('frequency in GHz: {0}\n'.format(frequencyInGHz))
+        numberOfPairs = -1
+    elif follow:
+        fileSize = 0 # unknown for live data
         
-        readBytes  = 32                #header offset
-        pulseBytes = 4*numberOfCells*4 #pulse pair size
+        reader = waitForPulseStream(pulseStreamFile, True, idleTimeout_in_s, pollInterval_in_s, sentinelFileName)
         
-        lifetimeSpectrum        = np.zeros(numberOfBins)
-        overall_region_in_ps    = numberOfBins*binWidth_in_ps
+        numberOfPairs = -1
+    else:
+        fileSize = pulseStreamSizeInBytes(pulseStreamFile)
         
-        countsInSpectrum        = 0
-
-        while True:
-            x_arrayA = []
-            x_arrayB = []
-            
-            timeA, pulseA = readPulse(streamFile, numberOfCells)
+        reader = openPulseStream(pulseStreamFile, pairs=True)
+        
+        numberOfPairs = reader.numberOfPulses()
+        
+    numberOfCells = reader.m_numberOfCells
+    
+    if debug:
+        print('number of cells:  {0}'.format(numberOfCells))
+        print('sweep in ns:      {0}'.format(reader.m_sweepInNanoseconds))
+        print('frequency in GHz: {0}\n'.format(reader.m_frequencyInGHz))
+        
+    reader.close()
+    
+    readBytes  = 0 if sharedMemoryName else reader.m_headerBytes #header offset
+    pulseBytes = reader.m_recordDType.itemsize #pulse pair size
+    
+    lifetimeSpectra         = [np.zeros(c['numberOfBins']) for c in configurations]
+    lifetimeSpectrum        = lifetimeSpectra[0] if configurations else np.zeros(numberOfBins)
+    
+    countsInSpectrum        = 0
+    
+    eventList = bool(eventListFileName)
+    
+    if statistics is None and debug:
+        statistics = {}
+    
+    if eventList:
+        eventListFile = open(eventListFileName, 'wb')
+        
+    try:
+        if eventList:
+            writeLifetimeEventListHeader(eventListFile, cf_level_A, cf_level_B, isPositivePolarity)
             
-            if not len(pulseA):
-                break
+        # (3) calculate and bin the lifetimes of the accepted pulse pairs (block-wise or in parallel):
+        if sharedMemoryName:
+            partialSpectra = iterLifetimeSpectraOfPulseBlocks(iterSharedMemoryPulseBlocks(sharedMemoryName, blockSize, idleTimeout_in_s=idleTimeout_in_s), binning, lifetimeParams, eventList, configurations, statistics)
+        elif follow:
+            partialSpectra = iterLifetimeSpectraOfPulseBlocks(iterFollowPulseBlocks(pulseStreamFile, blockSize, True, -1, idleTimeout_in_s, pollInterval_in_s, sentinelFileName), binning, lifetimeParams, eventList, configurations, statistics)
+        elif numberOfProcesses > 1:
+            partialSpectra = iterLifetimeSpectraParallel(pulseStreamFile, numberOfPairs, numberOfProcesses, blockSize, binning, lifetimeParams, eventList, configurations, statistics)
+        else:
+            partialSpectra = iterLifetimeSpectrumBlocks(pulseStreamFile, blockSize, binning, lifetimeParams, eventList=eventList, configurations=configurations, statistics=statistics)
+        
+        for partialSpectrum, numberOfPairsRead, events in partialSpectra:
+            if configurations:
+                for spectrum, partial in zip(lifetimeSpectra, partialSpectrum):
+                    spectrum += partial
+                    
+                partialSpectrum = partialSpectrum[0] # the counts refer to the first spectrum
+            else:
+                lifetimeSpectrum += partialSpectrum
             
-            timeB, pulseB = readPulse(streamFile, numberOfCells)
+            if events is not None:
+                events.tofile(eventListFile)
             
-            if not len(pulseB):
-                break
+            readBytes += numberOfPairsRead*pulseBytes
             
-            readBytes += pulseBytes
+            countsInSpectrumBefore = countsInSpectrum
+            countsInSpectrum      += int(np.sum(partialSpectrum))
             
-            # hold copy of original pulses
-            pulseA_origin = np.zeros(numberOfCells)
-            pulseB_origin = np.zeros(numberOfCells)
+            if countsInSpectrum == countsInSpectrumBefore:
+                continue
             
-            pulseA_origin[:] = pulseA
-            pulseB_origin[:] = pulseB
+            rb = (readBytes/1024)/1000
+            fs = (fileSize/1024)/1000
             
-            # apply median filter on ML data?:
-            if machineInputA.m_medianFilter:
-                pulseA = medfilt(pulseA, machineInputA.m_windowSize)
-                
-            if machineInputB.m_medianFilter:
-                pulseB = medfilt(pulseB, machineInputB.m_windowSize)
-                
-            # apply median filter on original data?:
-            if medianFilterA:
-                pulseA_origin = medfilt(pulseA_origin, windowSizeA)
+            if debug and (sharedMemoryName or follow):
+                sys.stdout.write('\rbytes read: {0} MB (live) >> integral counts: {1}'.format(rb, countsInSpectrum))
+            elif debug:
+                pe = 100.0*(rb/fs)
+                es = (fs*countsInSpectrum/rb)/1000000
                 
-            if medianFilterB:
-                pulseB_origin = medfilt(pulseB_origin, windowSizeB)
+                sys.stdout.write('\rbytes read: [{0}/{1}] MB ({2} %) >> integral counts: {3} << est. counts in spectrum: {4} Mio.'.format(rb, fs, pe, countsInSpectrum, es))
                 
-            # correct for baseline?:
-            if machineInputA.m_correctForBaseline:
-                meanA_pre      = np.mean(pulseA[machineInputA.m_startCell:machineInputA.m_cellRegion])
-                meanA_post     = np.mean(pulseA[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
-                
-                stddevA_pre    = np.std(pulseA[machineInputA.m_startCell:machineInputA.m_cellRegion])
-                stddevA_post   = np.std(pulseA[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
-                
-                meanA_pre_o    = np.mean(pulseA_origin[machineInputA.m_startCell:machineInputA.m_cellRegion])
-                meanA_post_o   = np.mean(pulseA_origin[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
-                
-                stddevA_pre_o  = np.std(pulseA_origin[machineInputA.m_startCell:machineInputA.m_cellRegion])
-                stddevA_post_o = np.std(pulseA_origin[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
-                 
-                meanA   = 0.0
-                meanA_o = 0.0
-                
-                if np.abs(stddevA_pre) < np.abs(stddevA_post):
-                    meanA = meanA_pre
-                else:
-                    meanA = meanA_post
-                    
-                if np.abs(stddevA_pre_o) < np.abs(stddevA_post_o):
-                    meanA_o = meanA_pre_o
-                else:
-                    meanA_o = meanA_post_o
-                    
-                pulseA        -= meanA
-                pulseA_origin -= meanA_o
-                                
-            if machineInputB.m_correctForBaseline:
-                meanB_pre      = np.mean(pulseB[machineInputB.m_startCell:machineInputB.m_cellRegion])
-                meanB_post     = np.mean(pulseB[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
-                
-                stddevB_pre    = np.std(pulseB[machineInputB.m_startCell:machineInputB.m_cellRegion])
-                stddevB_post   = np.std(pulseB[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
-                
-                meanB_pre_o    = np.mean(pulseB_origin[machineInputB.m_startCell:machineInputB.m_cellRegion])
-                meanB_post_o   = np.mean(pulseB_origin[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
-                
-                stddevB_pre_o  = np.std(pulseB_origin[machineInputB.m_startCell:machineInputB.m_cellRegion])
-                stddevB_post_o = np.std(pulseB_origin[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
-                
-                meanB   = 0.0
-                meanB_o = 0.0
-                
-                if np.abs(stddevB_pre) < np.abs(stddevB_post):
-                    meanB = meanB_pre
-                else:
-                    meanB = meanB_post
-                    
-                if np.abs(stddevB_pre_o) < np.abs(stddevB_post_o):
-                    meanB_o = meanB_pre_o
-                else:
-                    meanB_o = meanB_post_o
+            # outsave (each 100 counts)
+            if countsInSpectrum//100 > countsInSpectrumBefore//100 and configurations: 
+                for c, spectrum in zip(configurations, lifetimeSpectra):
+                    np.savetxt(c['outputName'] + '.txt', spectrum, fmt='%0d', newline='\n', header='counts [#]\n');
+            elif countsInSpectrum//100 > countsInSpectrumBefore//100: 
+                np.savetxt(outputName + '.txt', lifetimeSpectrum, fmt='%0d', newline='\n', header='counts [#]\n');
                     
-                pulseB        -= meanB
-                pulseB_origin -= meanB_o
+            # plot (each 100000 counts)
+            if countsInSpectrum//100000 > countsInSpectrumBefore//100000:
+                plt.semilogy(lifetimeSpectrum,'ro')
+                plt.show()
                 
-            # determine pulse height for original data
-            if not isPositivePolarity:
-                amplitudeA_o = np.min(pulseA_origin)
-                amplitudeB_o = np.min(pulseB_origin)
-            else:
-                amplitudeA_o = np.max(pulseA_origin)
-                amplitudeB_o = np.max(pulseB_origin)
+            if targetCounts > 0 and countsInSpectrum >= targetCounts:
+                partialSpectra.close()
                 
-            _pulseA = np.zeros(numberOfCells)
-            _pulseB = np.zeros(numberOfCells)
-            
-            _pulseA[:] = pulseA
-            _pulseB[:] = pulseB
-            
-            voltage_normA, __, __, validA = normalizeData(_pulseA, numberOfCells, isPositivePolarity)
-            voltage_normB, __, __, validB = normalizeData(_pulseB, numberOfCells, isPositivePolarity)
-            
-            if not validA or not validB:
-                continue
-            
-            x_arrayA.append(voltage_normA)
-            resultA = classifierA.predict(x_arrayA)
-            
-            x_arrayB.append(voltage_normB)
-            resultB = classifierB.predict(x_arrayB)
+                break
+    except BaseException:
+        # the records written so far are kept, but marked as incomplete
+        if eventList:
+            eventListFile.close()
             
-            if not (resultA[0] == 1 and resultB[0] == 1):
-                continue
+            os.replace(eventListFileName, eventListFileName + '.partial')
             
+        raise
+    finally:
+        if eventList:
+            eventListFile.close()
             
-            __amplitudeA = np.abs(amplitudeA_o)
-            __amplitudeB = np.abs(amplitudeB_o)
-                
-            acceptForLTSpec = False
+    if debug and statistics:
+        print('\n\nrejected pulse pairs per stage (of {0} pulse pairs):'.format(statistics.get('pairs', 0)))
+        
+        for stage in rejectionStages:
+            print('{0:<16}{1}'.format(stage + ':', statistics.get(stage, 0)))
             
-            #plt.plot(pulseA_origin, 'ro', pulseB_origin, 'bo')
-            #plt.show()
+        print('{0:<16}{1}\n'.format('accepted:', statistics.get('accepted', 0)))
+        
+    if configurations:
+        for c, spectrum in zip(configurations, lifetimeSpectra):
+            np.savetxt(c['outputName'], spectrum, fmt='%0d', newline='\n', header='counts [#]\n')
             
-            if B_as_start_A_as_stop:
-                acceptForLTSpec = (__amplitudeB >= ll_phs_start_in_mV and __amplitudeB <= ul_phs_start_in_mV) and (__amplitudeA >= ll_phs_stop_in_mV and __amplitudeA <= ul_phs_stop_in_mV)
-            else:
-                acceptForLTSpec = (__amplitudeA >= ll_phs_start_in_mV and __amplitudeA <= ul_phs_start_in_mV) and (__amplitudeB >= ll_phs_stop_in_mV and __amplitudeB <= ul_phs_stop_in_mV)
-                    
-            # (3) calculate lifetime
-            lifetime_in_ps = 0.0
-            rejectLT       = True
-
-            if acceptForLTSpec and B_as_start_A_as_stop:
-                lifetime_in_ps, rejectLT = calcLifetime(timeB, pulseB_origin, timeA, pulseA_origin, cf_level_B, cf_level_A, amplitudeB_o, amplitudeA_o, isPositivePolarity, cubicSpline, cubicSplineRenderPoints)
-            elif acceptForLTSpec and not B_as_start_A_as_stop:
-                lifetime_in_ps, rejectLT = calcLifetime(timeA, pulseA_origin, timeB, pulseB_origin, cf_level_A, cf_level_B, amplitudeA_o, amplitudeB_o, isPositivePolarity, cubicSpline, cubicSplineRenderPoints)
-                    
-            # (4) bin lifetimes
-            if acceptForLTSpec and not rejectLT:
-                lifetime_in_ps += offset_in_ps
-                index = (int)(((lifetime_in_ps/overall_region_in_ps)*numberOfBins)-1)
-                
-                if index >= 0 and index < numberOfBins:
-                    lifetimeSpectrum[index] += 1
-                    countsInSpectrum        += 1
+        return lifetimeSpectra
                     
-                    rb = (readBytes/1024)/1000
-                    fs = (fileSize/1024)/1000
-                    pe = 100.0*(rb/fs)
-                    es = (fs*countsInSpectrum/rb)/1000000
-                                         
-                    if debug:
-                        sys.stdout.write('\rbytes read: [{0}/{1}] MB ({2} %) >> integral counts: {3} << est. counts in spectrum: {4} Mio.'.format(rb, fs, pe, countsInSpectrum, es))
-                        
-                    # outsave
-                    if not countsInSpectrum % 100: 
-                        np.savetxt(outputName + '.txt', lifetimeSpectrum, fmt='%0d', newline='\n', header='counts [#]\n');
-                            
-                    # plot
-                    if not countsInSpectrum % 100000:
-                        plt.semilogy(lifetimeSpectrum,'ro')
-                        plt.show()
-                        
-        streamFile.close()
-        np.savetxt(outputName, lifetimeSpectrum, fmt='%0d', newline='\n', header='counts [#]\n')
+    np.savetxt(outputName, lifetimeSpectrum, fmt='%0d', newline='\n', header='counts [#]\n')
+    
+    return lifetimeSpectrum
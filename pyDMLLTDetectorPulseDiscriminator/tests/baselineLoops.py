@@ -0,0 +1,570 @@
+"""
+
+ The per-pulse loop implementations of the initial release, against which the block-wise (vectorized) implementations are tested.
+ The functions are copied unchanged apart from their names.
+
+"""
+
+import struct
+
+import numpy as np
+
+from scipy.signal import medfilt
+from scipy.interpolate import CubicSpline
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams
+
+"""
+
+ see 'readPulse(..)': the traces are read by 4 byte chunks.
+
+"""
+
+def readPulseLoop(file, numberOfCells):
+    time = np.zeros(numberOfCells)
+    volt = np.zeros(numberOfCells)
+
+    aborted   = False
+    resort    = False
+    priorTime = -1e10
+
+    for i in range (0, numberOfCells):
+        byteChunk = file.read(4)
+
+        if not byteChunk:
+            aborted = True
+            break
+
+        if (time[i] < priorTime):
+            resort = True
+
+        time[i] = struct.unpack('f', byteChunk)[0]
+        priorTime = time[i]
+
+    if aborted:
+        time = np.zeros(0)
+
+    if resort:
+        time = np.sort(time)
+
+    aborted = False
+
+    for i in range (0, numberOfCells):
+        byteChunk = file.read(4)
+
+        if not byteChunk:
+            aborted = True
+            break
+
+        volt[i] = struct.unpack('f', byteChunk)[0]
+
+    if aborted:
+        volt = np.zeros(0)
+
+    return time, volt
+
+"""
+
+ see 'normalizeData(..)'
+
+"""
+
+def normalizeDataLoop(voltage, numberOfCells, polarity):
+    arg = 0
+
+    valid = True
+
+    if not polarity: #negative
+        arg = np.argmin(voltage)
+    else:            #positive
+        arg = np.argmax(voltage)
+
+    minMaxValue = voltage[arg]
+    minMaxArg   = arg
+
+    # safety region (may adjust this region for your purposes)
+    if minMaxArg < 0.02*numberOfCells or minMaxArg > 0.92*numberOfCells:
+        valid = False
+
+        np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)), minMaxValue, minMaxArg, valid
+
+    voltage /= np.abs(sum(voltage))
+
+    if not polarity: #negative
+        arg = np.argmin(voltage)
+    else:            #positive
+        arg = np.argmax(voltage)
+
+    if arg < 0 or arg >= numberOfCells:
+        valid = False
+
+        return voltage, minMaxValue, minMaxArg, valid
+
+    if voltage[arg] == 0.0: # prevent by zero division
+        valid = False
+
+        return voltage, 0.0, minMaxArg, valid
+
+    voltage /= voltage[arg]
+
+    return np.roll(np.roll(voltage, numberOfCells-arg), (int)(numberOfCells/2)), minMaxValue, minMaxArg, valid
+
+"""
+
+ The preprocessing of a single pulse (float64) of 'predictPulses(..)': median filter, baseline correction and normalization.
+
+"""
+
+def preprocessPulseLoop(pulse, mlInput, isPositivePolarity):
+    numberOfCells = len(pulse)
+
+    pulse = np.array(pulse, dtype=np.float64)
+
+    # apply median filter?:
+    if mlInput.m_medianFilter:
+        pulse = medfilt(pulse, mlInput.m_windowSize)
+
+    # correct for baseline?:
+    if mlInput.m_correctForBaseline:
+        stddev_pre  = np.std(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
+        stddev_post = np.std(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
+
+        mean = 0.0
+
+        if np.abs(stddev_pre) < np.abs(stddev_post):
+            mean = np.mean(pulse[mlInput.m_startCell:mlInput.m_cellRegion])
+        else:
+            mean = np.mean(pulse[numberOfCells-1-mlInput.m_startCell-mlInput.m_cellRegion:numberOfCells-1-mlInput.m_startCell])
+
+        pulse -= mean
+
+    # normalize pulse data
+    voltage_norm, __, __, valid = normalizeDataLoop(pulse, numberOfCells, isPositivePolarity)
+
+    return voltage_norm, valid
+
+"""
+
+ see 'calcLifetime(..)': the CF levels are searched by loops over the cells (and the rendered points of the cubic spline).
+
+"""
+
+def calcLifetimeLoop(xStart                  = [],
+                     yStart                  = [],
+                     xStop                   = [],
+                     yStop                   = [],
+                     cfd_level_start         = 25.0,
+                     cfd_level_stop          = 25.0,
+                     amplitudeStart          = 0.0,
+                     amplitudeStop           = 0.0,
+                     isPositivePolarity      = False,
+                     cubicSpline             = True,
+                     cubicSplineRenderPoints = 200):
+    timeStart = 0.0
+    timeStop  = 0.0
+
+    cfdVoltageStart = cfd_level_start*0.01*amplitudeStart
+    cfdVoltageStop  = cfd_level_stop *0.01*amplitudeStop
+
+    rejectStart = True
+    rejectStop  = True
+
+    # using cubic spline interpolation?
+    if cubicSpline:
+        #negative polarity
+        if not isPositivePolarity:
+            argStart = np.argmin(yStart)
+            argStop  = np.argmin(yStop)
+
+            # start branch
+            index = -1
+
+            for i in range(argStart, 0, -1):
+                if yStart[i] <= cfdVoltageStart and yStart[i-1] >= cfdVoltageStart:
+                    index = i
+                    break
+
+            if not index <= 2:
+                xRenderPoints = np.zeros(cubicSplineRenderPoints)
+                yCubicValues  = np.zeros(cubicSplineRenderPoints)
+
+                time_lower = xStart[index-1]
+                time_upper = xStart[index]
+
+                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
+
+                spline = CubicSpline(xStart, yStart)
+
+                for cubic in range(0, cubicSplineRenderPoints):
+                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
+                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
+
+                for i in range(cubicSplineRenderPoints-1, 0, -1):
+                    if yCubicValues[i] <= cfdVoltageStart and yCubicValues[i-1] >= cfdVoltageStart:
+                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
+                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
+
+                        if slope >= 0 or i <= 2:
+                            break
+
+                        timeStart   = (cfdVoltageStart - intercept)/slope
+                        rejectStart = False
+
+            # stop branch
+            index = -1
+
+            for i in range(argStop, 0, -1):
+                if yStop[i] <= cfdVoltageStop and yStop[i-1] >= cfdVoltageStop:
+                    index = i
+                    break
+
+            if not index <= 2:
+                xRenderPoints = np.zeros(cubicSplineRenderPoints)
+                yCubicValues  = np.zeros(cubicSplineRenderPoints)
+
+                time_lower = xStop[index-1]
+                time_upper = xStop[index]
+
+                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
+
+                spline = CubicSpline(xStop, yStop)
+
+                for cubic in range(0, cubicSplineRenderPoints):
+                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
+                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
+
+                for i in range(cubicSplineRenderPoints-1, 0, -1):
+                    if yCubicValues[i] <= cfdVoltageStop and yCubicValues[i-1] >= cfdVoltageStop:
+                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
+                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
+
+                        if slope >= 0 or i <= 2:
+                            break
+
+                        timeStop   = (cfdVoltageStop - intercept)/slope
+                        rejectStop = False
+
+        #positive polarity
+        else:
+            argStart = np.argmax(yStart)
+            argStop  = np.argmax(yStop)
+
+            # start branch
+            index = -1
+
+            for i in range(argStart, 0, -1):
+                if yStart[i] >= cfdVoltageStart and yStart[i-1] <= cfdVoltageStart:
+                    index = i
+                    break
+
+            if not index <= 2:
+                xRenderPoints = np.zeros(cubicSplineRenderPoints)
+                yCubicValues  = np.zeros(cubicSplineRenderPoints)
+
+                time_lower = xStart[index-1]
+                time_upper = xStart[index]
+
+                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
+
+                spline = CubicSpline(xStart, yStart)
+
+                for cubic in range(0, cubicSplineRenderPoints):
+                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
+                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
+
+                for i in range(cubicSplineRenderPoints-1, 0, -1):
+                    if yCubicValues[i] >= cfdVoltageStart and yCubicValues[i-1] <= cfdVoltageStart:
+                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
+                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
+
+                        if slope <= 0 or i <= 2:
+                            break
+
+                        timeStart   = (cfdVoltageStart - intercept)/slope
+                        rejectStart = False
+
+            # stop branch
+            index = -1
+
+            for i in range(argStop, 0, -1):
+                if yStop[i] >= cfdVoltageStop and yStop[i-1] <= cfdVoltageStop:
+                    index = i
+                    break
+
+            if not index <= 2:
+                xRenderPoints = np.zeros(cubicSplineRenderPoints)
+                yCubicValues  = np.zeros(cubicSplineRenderPoints)
+
+                time_lower = xStop[index-1]
+                time_upper = xStop[index]
+
+                timeIncr = np.abs(time_upper - time_lower)/float(cubicSplineRenderPoints)
+
+                spline = CubicSpline(xStop, yStop)
+
+                for cubic in range(0, cubicSplineRenderPoints):
+                    xRenderPoints[cubic] = time_lower + float(cubic)*timeIncr
+                    yCubicValues[cubic]  = spline(xRenderPoints[cubic])
+
+                for i in range(cubicSplineRenderPoints-1, 0, -1):
+                    if yCubicValues[i] >= cfdVoltageStop and yCubicValues[i-1] <= cfdVoltageStop:
+                        slope     = (yCubicValues[i-1]-yCubicValues[i])/(xRenderPoints[i-1]-xRenderPoints[i])
+                        intercept = yCubicValues[i] - slope*xRenderPoints[i]
+
+                        if slope <= 0 or i <= 2:
+                            break
+
+                        timeStop   = (cfdVoltageStop - intercept)/slope
+                        rejectStop = False
+
+    # linear interpolation
+    else:
+        #negative polarity
+        if not isPositivePolarity:
+            argStart = np.argmin(yStart)
+            argStop  = np.argmin(yStop)
+
+            for i in range(argStart, 0, -1):
+                if yStart[i] <= cfdVoltageStart and yStart[i-1] >= cfdVoltageStart:
+                    slope     = (yStart[i-1]-yStart[i])/(xStart[i-1]-xStart[i])
+                    intercept = yStart[i] - slope*xStart[i]
+
+                    if slope >= 0 or i <= 2:
+                        break
+
+                    timeStart   = (cfdVoltageStart - intercept)/slope
+                    rejectStart = False
+
+            for i in range(argStop, 0, -1):
+                if yStop[i] <= cfdVoltageStop and yStop[i-1] >= cfdVoltageStop:
+                    slope     = (yStop[i-1]-yStop[i])/(xStop[i-1]-xStop[i])
+                    intercept = yStop[i] - slope*xStop[i]
+
+                    if slope >= 0 or i <= 2:
+                        break
+
+                    timeStop   = (cfdVoltageStop - intercept)/slope
+                    rejectStop = False
+        #positive polarity
+        else:
+            argStart = np.argmax(yStart)
+            argStop  = np.argmax(yStop)
+
+            for i in range(argStart, 0, -1):
+                if yStart[i] >= cfdVoltageStart and yStart[i-1] <= cfdVoltageStart:
+                    slope     = (yStart[i-1]-yStart[i])/(xStart[i-1]-xStart[i])
+                    intercept = yStart[i] - slope*xStart[i]
+
+                    if slope <= 0 or i <= 2:
+                        break
+
+                    timeStart   = (cfdVoltageStart - intercept)/slope
+                    rejectStart = False
+
+            for i in range(argStop, 0, -1):
+                if yStop[i] >= cfdVoltageStop and yStop[i-1] <= cfdVoltageStop:
+                    slope     = (yStop[i-1]-yStop[i])/(xStop[i-1]-xStop[i])
+                    intercept = yStop[i] - slope*xStop[i]
+
+                    if slope <= 0 or i <= 2:
+                        break
+
+                    timeStop   = (cfdVoltageStop - intercept)/slope
+                    rejectStop = False
+
+    return 1000.0*(timeStop - timeStart), (rejectStart or rejectStop)
+
+"""
+
+ see 'createLifetimeSpectrum(..)': each pulse pair is preprocessed, classified and timed on its own. The intermediate output 
+ (progress, text file and plot) is omitted and the lifetime spectrum is returned.
+
+"""
+
+def lifetimeSpectrumLoop(machineInputA           = DMachineParams(),
+                         machineInputB           = DMachineParams(),
+                         pulseStreamFile         = '/pulsePairStream',
+                         isPositivePolarity      = False,
+                         binWidth_in_ps          = 5,
+                         numberOfBins            = 28000,
+                         offset_in_ps            = 0.0,
+                         B_as_start_A_as_stop    = True,
+                         cf_level_A              = 25.0,
+                         cf_level_B              = 25.0,
+                         ll_phs_start_in_mV      = 250.0, ul_phs_start_in_mV = 450.0,
+                         ll_phs_stop_in_mV       = 50.0,  ul_phs_stop_in_mV  = 150.0,
+                         cubicSpline             = True,
+                         cubicSplineRenderPoints = 200,
+                         medianFilterA           = True,
+                         windowSizeA             = 5,
+                         medianFilterB           = True,
+                         windowSizeB             = 5):
+    # (1) retrieve classifier:
+    classifierA = machineInputA.m_classifier
+    classifierB = machineInputB.m_classifier
+
+    # (2) open pulse stream and read header to extract necessary information:
+    with open(pulseStreamFile, "rb") as streamFile:
+        numberOfCells = struct.unpack('8x16xi4x', streamFile.read(32))[0]
+
+        lifetimeSpectrum        = np.zeros(numberOfBins)
+        overall_region_in_ps    = numberOfBins*binWidth_in_ps
+
+        countsInSpectrum        = 0
+
+        while True:
+            x_arrayA = []
+            x_arrayB = []
+
+            timeA, pulseA = readPulseLoop(streamFile, numberOfCells)
+
+            if not len(pulseA):
+                break
+
+            timeB, pulseB = readPulseLoop(streamFile, numberOfCells)
+
+            if not len(pulseB):
+                break
+
+            # hold copy of original pulses
+            pulseA_origin = np.zeros(numberOfCells)
+            pulseB_origin = np.zeros(numberOfCells)
+
+            pulseA_origin[:] = pulseA
+            pulseB_origin[:] = pulseB
+
+            # apply median filter on ML data?:
+            if machineInputA.m_medianFilter:
+                pulseA = medfilt(pulseA, machineInputA.m_windowSize)
+
+            if machineInputB.m_medianFilter:
+                pulseB = medfilt(pulseB, machineInputB.m_windowSize)
+
+            # apply median filter on original data?:
+            if medianFilterA:
+                pulseA_origin = medfilt(pulseA_origin, windowSizeA)
+
+            if medianFilterB:
+                pulseB_origin = medfilt(pulseB_origin, windowSizeB)
+
+            # correct for baseline?:
+            if machineInputA.m_correctForBaseline:
+                meanA_pre      = np.mean(pulseA[machineInputA.m_startCell:machineInputA.m_cellRegion])
+                meanA_post     = np.mean(pulseA[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
+
+                stddevA_pre    = np.std(pulseA[machineInputA.m_startCell:machineInputA.m_cellRegion])
+                stddevA_post   = np.std(pulseA[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
+
+                meanA_pre_o    = np.mean(pulseA_origin[machineInputA.m_startCell:machineInputA.m_cellRegion])
+                meanA_post_o   = np.mean(pulseA_origin[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
+
+                stddevA_pre_o  = np.std(pulseA_origin[machineInputA.m_startCell:machineInputA.m_cellRegion])
+                stddevA_post_o = np.std(pulseA_origin[numberOfCells-1-machineInputA.m_startCell-machineInputA.m_cellRegion:numberOfCells-1-machineInputA.m_startCell])
+
+                meanA   = 0.0
+                meanA_o = 0.0
+
+                if np.abs(stddevA_pre) < np.abs(stddevA_post):
+                    meanA = meanA_pre
+                else:
+                    meanA = meanA_post
+
+                if np.abs(stddevA_pre_o) < np.abs(stddevA_post_o):
+                    meanA_o = meanA_pre_o
+                else:
+                    meanA_o = meanA_post_o
+
+                pulseA        -= meanA
+                pulseA_origin -= meanA_o
+
+            if machineInputB.m_correctForBaseline:
+                meanB_pre      = np.mean(pulseB[machineInputB.m_startCell:machineInputB.m_cellRegion])
+                meanB_post     = np.mean(pulseB[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
+
+                stddevB_pre    = np.std(pulseB[machineInputB.m_startCell:machineInputB.m_cellRegion])
+                stddevB_post   = np.std(pulseB[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
+
+                meanB_pre_o    = np.mean(pulseB_origin[machineInputB.m_startCell:machineInputB.m_cellRegion])
+                meanB_post_o   = np.mean(pulseB_origin[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
+
+                stddevB_pre_o  = np.std(pulseB_origin[machineInputB.m_startCell:machineInputB.m_cellRegion])
+                stddevB_post_o = np.std(pulseB_origin[numberOfCells-1-machineInputB.m_startCell-machineInputB.m_cellRegion:numberOfCells-1-machineInputB.m_startCell])
+
+                meanB   = 0.0
+                meanB_o = 0.0
+
+                if np.abs(stddevB_pre) < np.abs(stddevB_post):
+                    meanB = meanB_pre
+                else:
+                    meanB = meanB_post
+
+                if np.abs(stddevB_pre_o) < np.abs(stddevB_post_o):
+                    meanB_o = meanB_pre_o
+                else:
+                    meanB_o = meanB_post_o
+
+                pulseB        -= meanB
+                pulseB_origin -= meanB_o
+
+            # determine pulse height for original data
+            if not isPositivePolarity:
+                amplitudeA_o = np.min(pulseA_origin)
+                amplitudeB_o = np.min(pulseB_origin)
+            else:
+                amplitudeA_o = np.max(pulseA_origin)
+                amplitudeB_o = np.max(pulseB_origin)
+
+            _pulseA = np.zeros(numberOfCells)
+            _pulseB = np.zeros(numberOfCells)
+
+            _pulseA[:] = pulseA
+            _pulseB[:] = pulseB
+
+            voltage_normA, __, __, validA = normalizeDataLoop(_pulseA, numberOfCells, isPositivePolarity)
+            voltage_normB, __, __, validB = normalizeDataLoop(_pulseB, numberOfCells, isPositivePolarity)
+
+            if not validA or not validB:
+                continue
+
+            x_arrayA.append(voltage_normA)
+            resultA = classifierA.predict(x_arrayA)
+
+            x_arrayB.append(voltage_normB)
+            resultB = classifierB.predict(x_arrayB)
+
+            if not (resultA[0] == 1 and resultB[0] == 1):
+                continue
+
+
+            __amplitudeA = np.abs(amplitudeA_o)
+            __amplitudeB = np.abs(amplitudeB_o)
+
+            acceptForLTSpec = False
+
+            #plt.plot(pulseA_origin, 'ro', pulseB_origin, 'bo')
+            #plt.show()
+
+            if B_as_start_A_as_stop:
+                acceptForLTSpec = (__amplitudeB >= ll_phs_start_in_mV and __amplitudeB <= ul_phs_start_in_mV) and (__amplitudeA >= ll_phs_stop_in_mV and __amplitudeA <= ul_phs_stop_in_mV)
+            else:
+                acceptForLTSpec = (__amplitudeA >= ll_phs_start_in_mV and __amplitudeA <= ul_phs_start_in_mV) and (__amplitudeB >= ll_phs_stop_in_mV and __amplitudeB <= ul_phs_stop_in_mV)
+
+            # (3) calculate lifetime
+            lifetime_in_ps = 0.0
+            rejectLT       = True
+
+            if acceptForLTSpec and B_as_start_A_as_stop:
+                lifetime_in_ps, rejectLT = calcLifetimeLoop(timeB, pulseB_origin, timeA, pulseA_origin, cf_level_B, cf_level_A, amplitudeB_o, amplitudeA_o, isPositivePolarity, cubicSpline, cubicSplineRenderPoints)
+            elif acceptForLTSpec and not B_as_start_A_as_stop:
+                lifetime_in_ps, rejectLT = calcLifetimeLoop(timeA, pulseA_origin, timeB, pulseB_origin, cf_level_A, cf_level_B, amplitudeA_o, amplitudeB_o, isPositivePolarity, cubicSpline, cubicSplineRenderPoints)
+
+            # (4) bin lifetimes
+            if acceptForLTSpec and not rejectLT:
+                lifetime_in_ps += offset_in_ps
+                index = (int)(((lifetime_in_ps/overall_region_in_ps)*numberOfBins)-1)
+
+                if index >= 0 and index < numberOfBins:
+                    lifetimeSpectrum[index] += 1
+                    countsInSpectrum        += 1
+
+    return lifetimeSpectrum
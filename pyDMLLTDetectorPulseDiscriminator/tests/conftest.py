@@ -0,0 +1,31 @@
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams, trainPulses
+from syntheticPulses import syntheticPulses, syntheticPulsePairs, writePulseStream
+
+@pytest.fixture(scope='session')
+def pulseStreams(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('streams')
+
+    rng = np.random.default_rng(1)
+
+    return dict(correct      = writePulseStream(str(directory/'correct.drs4DataStream'),      syntheticPulses(rng, 300, False)),
+                reject       = writePulseStream(str(directory/'reject.drs4DataStream'),       syntheticPulses(rng, 300, True)),
+                correct_test = writePulseStream(str(directory/'correct_test.drs4DataStream'), syntheticPulses(rng, 200, False)),
+                reject_test  = writePulseStream(str(directory/'reject_test.drs4DataStream'),  syntheticPulses(rng, 200, True)),
+                pairs        = writePulseStream(str(directory/'pairs.drs4DataStream'),        syntheticPulsePairs(rng, 600)))
+
+@pytest.fixture(scope='session')
+def trainedMachine(pulseStreams):
+    return trainPulses(pulseStreams['correct'], pulseStreams['reject'], '', False, -1, -1, DMachineParams(), False)
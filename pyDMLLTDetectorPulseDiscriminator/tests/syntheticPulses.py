@@ -0,0 +1,185 @@
+"""
+
+ Synthetic detector pulses and pulse-stream files (see 'pulseStreamHeaderDType' and 'pulseRecordDType(..)') for the tests.
+
+ CORRECT pulses are single (negative) pulses of a fixed shape, REJECT pulses are pile-ups or pulses with a slow rise.
+ All traces are of type(float32) as stored in the pulse stream.
+
+"""
+
+import os
+
+import numpy as np
+
+from DMLLTDetectorPulseDiscriminator import (pulseStreamHeaderDType, pulseRecordDType, pulseStreamIndexEntryDType, pulseStreamIndexFooterDType,
+                                             pulseStreamIndexMagic)
+
+numberOfCells      = 1024
+sweepInNanoseconds = 200.0
+frequencyInGHz     = 5.12
+
+"""
+
+ This function returns a sorted time axis [ns] with a small jitter of the sampling points.
+
+"""
+
+def syntheticTimeAxis(rng, numberOfCells = numberOfCells):
+    time = np.arange(numberOfCells)*(sweepInNanoseconds/numberOfCells) + rng.normal(0.0, 0.005, numberOfCells)
+
+    return np.sort(time).astype(np.float32)
+
+def pulseShape(time, t0, width):
+    x = np.clip(time - t0, 0.0, None)/width
+
+    shape = x*x*np.exp(-2.0*x)
+
+    return shape/max(shape.max(), 1e-12)
+
+"""
+
+ This function returns 'n' pulses (time, voltage) as 2D arrays of shape (n, number of cells).
+
+"""
+
+def syntheticPulses(rng, n, reject = False, amplitudes = (50.0, 500.0), positions = (40.0, 80.0), numberOfCells = numberOfCells):
+    time    = np.empty((n, numberOfCells), dtype=np.float32)
+    voltage = np.empty((n, numberOfCells), dtype=np.float32)
+
+    for i in range(n):
+        t  = syntheticTimeAxis(rng, numberOfCells)
+        t0 = rng.uniform(*positions)
+
+        amplitude = rng.uniform(*amplitudes)
+
+        v = rng.normal(0.8, 1.5, numberOfCells)
+
+        if not reject:
+            v -= amplitude*pulseShape(t, t0, 1.0)
+        elif i%2:
+            v -= amplitude*(pulseShape(t, t0, 1.0) + rng.uniform(0.3, 1.0)*pulseShape(t, t0 + rng.uniform(3.0, 20.0), 1.0))
+        else:
+            v -= amplitude*pulseShape(t, t0, 3.0)
+
+        time[i], voltage[i] = t, v
+
+    return time, voltage
+
+"""
+
+ This function returns 'n' pulse pairs (timeA, voltageA, timeB, voltageB): B is the start (high amplitudes), A the stop pulse
+ (low amplitudes) delayed by the lifetime. 20% of the stop pulses are REJECT pulses.
+
+"""
+
+def syntheticPulsePairs(rng, n, numberOfCells = numberOfCells):
+    timeB, voltageB = syntheticPulses(rng, n, False, (150.0, 500.0), (40.0, 60.0), numberOfCells)
+    timeA, voltageA = syntheticPulses(rng, n, False, (30.0, 200.0), (40.0, 60.0), numberOfCells)
+
+    reject = rng.random(n) < 0.2
+
+    if np.any(reject):
+        timeA[reject], voltageA[reject] = syntheticPulses(rng, np.count_nonzero(reject), True, (30.0, 200.0), (40.0, 60.0), numberOfCells)
+
+    return timeA, voltageA, timeB, voltageB
+
+"""
+
+ This function writes a pulse-stream file: 'traces' = (time, voltage) or (timeA, voltageA, timeB, voltageB).
+ Version 2 streams store the time axis of the first pulse only once behind the header.
+
+"""
+
+def writePulseStream(fileName, traces, version = 1, trailingBytes = b''):
+    pairs = len(traces) == 4
+
+    n, cells = traces[1].shape
+
+    header = np.zeros(1, dtype=pulseStreamHeaderDType)
+
+    header['version']            = version
+    header['sweepInNanoseconds'] = sweepInNanoseconds
+    header['frequencyInGHz']     = frequencyInGHz
+    header['numberOfCells']      = cells
+
+    records = np.zeros(n, dtype=pulseRecordDType(cells, pairs, version))
+
+    for name, trace in zip(('timeA', 'voltageA', 'timeB', 'voltageB') if pairs else ('time', 'voltage'), traces):
+        if name in records.dtype.names:
+            records[name] = trace
+
+    with open(fileName, 'wb') as file:
+        header.tofile(file)
+
+        if version == 2:
+            np.asarray(traces[0][0], dtype='<f4').tofile(file)
+
+        records.tofile(file)
+
+        file.write(trailingBytes)
+
+    return fileName
+
+"""
+
+ This function returns the index trailer (see 'readIndexTrailer(..)') of the pulses 'voltage' (or the pulse pairs 'voltage' = (voltageA, voltageB)) 
+ written as records of 'recordBytes' behind 'headerBytes' in blocks of 'recordsPerBlock' pulses.
+
+"""
+
+def indexTrailer(voltage, recordsPerBlock, headerBytes, recordBytes):
+    voltages = voltage if isinstance(voltage, tuple) else (voltage,)
+
+    n = len(voltages[0])
+
+    first = np.arange(0, n, recordsPerBlock)
+
+    entries = np.zeros(len(first), dtype=pulseStreamIndexEntryDType)
+
+    entries['offsetInBytes']   = headerBytes + first*recordBytes
+    entries['numberOfRecords'] = np.minimum(recordsPerBlock, n - first)
+
+    for k, v in enumerate(voltages):
+        amplitudeBound = np.maximum(v.max(axis=1), 0.0) - np.minimum(v.min(axis=1), 0.0)
+
+        entries['minVoltage'][:, k]   = np.minimum.reduceat(v.min(axis=1), first)
+        entries['maxVoltage'][:, k]   = np.maximum.reduceat(v.max(axis=1), first)
+        entries['minAmplitude'][:, k] = np.minimum.reduceat(amplitudeBound, first)
+        entries['maxAmplitude'][:, k] = np.maximum.reduceat(amplitudeBound, first)
+
+    footer = np.zeros(1, dtype=pulseStreamIndexFooterDType)
+
+    footer['magic']              = pulseStreamIndexMagic
+    footer['version']            = 1
+    footer['numberOfRecords']    = n
+    footer['numberOfBlocks']     = len(entries)
+    footer['recordsPerBlock']    = recordsPerBlock
+    footer['trailerSizeInBytes'] = entries.nbytes + footer.nbytes
+    footer['pairs']              = len(voltages) == 2
+
+    return entries.tobytes() + footer.tobytes()
+
+"""
+
+ This function writes the pulses (or pulse pairs) 'traces' (see 'writePulseStream(..)') as segment files '<fileName>.000000', 
+ '<fileName>.000001', ... of at most 'recordsPerSegment' records and the manifest 'fileName' listing them in the format 
+ of the C++ API (see 'DPulseStreamManager::writeManifest()').
+
+"""
+
+def writePulseStreamManifest(fileName, traces, recordsPerSegment, version = 1):
+    n = len(traces[1])
+
+    lines = ['# DPulseStream manifest 1\n', '# segment\trecords\tbytes\n']
+
+    for k, first in enumerate(range(0, n, recordsPerSegment)):
+        segmentFileName = '{0}.{1:06d}'.format(fileName, k)
+
+        writePulseStream(segmentFileName, tuple(trace[first:first + recordsPerSegment] for trace in traces), version)
+
+        lines.append('{0}\t{1}\t{2}\n'.format(os.path.basename(segmentFileName), min(recordsPerSegment, n - first), os.path.getsize(segmentFileName)))
+
+    with open(fileName, 'w') as file:
+        file.writelines(lines)
+
+    return fileName
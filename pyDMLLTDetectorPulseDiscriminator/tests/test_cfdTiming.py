@@ -0,0 +1,68 @@
+"""
+
+ The block-wise CF timing (see 'calcCFDTimes(..)' and 'calcLifetimes(..)') must yield the lifetimes and reject flags of the 
+ per-pulse loops of the initial release (see 'calcLifetime(..)').
+
+"""
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import calcLifetimes, calcCFDTimes
+from baselineLoops import calcLifetimeLoop
+from syntheticPulses import syntheticPulses
+
+@pytest.fixture(scope='module')
+def pulses():
+    rng = np.random.default_rng(16)
+
+    # small pulses cross the CF level several times in the noise
+    timeStart, voltageStart = syntheticPulses(rng, 120, False, (5.0, 500.0), (40.0, 60.0), 256)
+    timeStop,  voltageStop  = syntheticPulses(rng, 120, False, (5.0, 500.0), (40.0, 60.0), 256)
+
+    # the minimum at the first cells is rejected
+    voltageStop[0, 1] = -1000.0
+
+    return timeStart.astype(np.float64), voltageStart.astype(np.float64), timeStop.astype(np.float64), voltageStop.astype(np.float64)
+
+@pytest.mark.parametrize('cubicSpline', [False, True])
+@pytest.mark.parametrize('isPositivePolarity', [False, True])
+def test_lifetimes(pulses, cubicSpline, isPositivePolarity):
+    timeStart, voltageStart, timeStop, voltageStop = pulses
+
+    if isPositivePolarity:
+        voltageStart, voltageStop = -voltageStart, -voltageStop
+
+    amplitude      = np.max if isPositivePolarity else np.min
+    amplitudeStart = amplitude(voltageStart, axis=1)
+    amplitudeStop  = amplitude(voltageStop,  axis=1)
+
+    lifetimes, reject = calcLifetimes(timeStart, voltageStart, timeStop, voltageStop, 25.0, 30.0, amplitudeStart, amplitudeStop, isPositivePolarity, cubicSpline, 50)
+
+    for k in range(len(voltageStart)):
+        lifetimeLoop, rejectLoop = calcLifetimeLoop(timeStart[k], voltageStart[k], timeStop[k], voltageStop[k], 25.0, 30.0, amplitudeStart[k], amplitudeStop[k], isPositivePolarity, cubicSpline, 50)
+
+        assert reject[k] == rejectLoop
+        assert np.isclose(lifetimes[k], lifetimeLoop, rtol=0.0, atol=1e-9)
+
+    assert reject[0] and 0 < np.count_nonzero(reject) < len(reject)
+
+def test_cfdTimes(pulses):
+    timeStart, voltageStart, timeStop, voltageStop = pulses
+
+    amplitudeStart = np.min(voltageStart, axis=1)
+    amplitudeStop  = np.min(voltageStop,  axis=1)
+
+    timesStart, rejectStart = calcCFDTimes(timeStart, voltageStart, amplitudeStart, 25.0, False, False)
+    timesStop,  rejectStop  = calcCFDTimes(timeStop,  voltageStop,  amplitudeStop,  25.0, False, False)
+
+    # the largest start pulse as reference: the lifetimes of the loop are the CF times of the stop pulses relative to it
+    ref = np.argmin(amplitudeStart)
+
+    assert not rejectStart[ref]
+
+    for k in range(len(voltageStop)):
+        lifetimeLoop, rejectLoop = calcLifetimeLoop(timeStart[ref], voltageStart[ref], timeStop[k], voltageStop[k], 25.0, 25.0, amplitudeStart[ref], amplitudeStop[k], False, False)
+
+        assert rejectStop[k] == rejectLoop
+        assert np.isclose(1000.0*(timesStop[k] - timesStart[ref]), lifetimeLoop, rtol=0.0, atol=1e-9)
@@ -0,0 +1,129 @@
+"""
+
+ The compiled predictors (see 'compileClassifier(..)') must predict the same labels and probabilities (within 'tolerance') as sklearn.
+
+"""
+
+import numpy as np
+import pytest
+
+from sklearn.naive_bayes import GaussianNB
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.linear_model import LogisticRegression
+
+from DMLLTDetectorPulseDiscriminator import (DMachineParams, DCompiledClassifier, compileClassifier, compiledClassifierDeviation,
+                                             calibratedEstimatorOf, verificationSamplesOf, readValidPulses)
+
+tolerance = 1e-6
+
+def randomData(rng, numberOfSamples = 600, numberOfFeatures = 40, numberOfClasses = 2):
+    centers = rng.normal(0.0, 1.0, (numberOfClasses, numberOfFeatures))
+    scales  = rng.uniform(0.2, 2.0, (numberOfClasses, numberOfFeatures))
+
+    y_array = rng.integers(0, numberOfClasses, numberOfSamples)
+    x_array = centers[y_array] + scales[y_array]*rng.normal(0.0, 1.0, (numberOfSamples, numberOfFeatures))
+
+    return x_array, y_array
+
+def assertSamePrediction(classifier, compiled, x_array):
+    probability         = classifier.predict_proba(x_array)
+    probabilityCompiled = compiled.predict_proba(x_array)
+
+    assert np.max(np.abs(probability - probabilityCompiled)) <= tolerance
+
+    # labels of pulses, whose class probabilities are equal within 'tolerance', are ties
+    sortedProbability = np.sort(probability, axis=1)
+
+    decided = (sortedProbability[:, -1] - sortedProbability[:, -2]) > tolerance
+
+    assert np.array_equal(classifier.predict(x_array)[decided], compiled.predict(x_array)[decided])
+
+@pytest.mark.parametrize('classifier', [GaussianNB(),
+                                        CalibratedClassifierCV(GaussianNB(), cv=2, method='isotonic'),
+                                        CalibratedClassifierCV(GaussianNB(), cv=5, method='isotonic'),
+                                        CalibratedClassifierCV(GaussianNB(), cv=3, method='sigmoid'),
+                                        CalibratedClassifierCV(GaussianNB(), cv=2, method='isotonic', ensemble=False)])
+def test_binary(classifier):
+    rng = np.random.default_rng(3)
+
+    x_train, y_train = randomData(rng)
+    x_test,  __      = randomData(rng, 2000)
+
+    classifier.fit(x_train, y_train)
+
+    compiled = compileClassifier(classifier, x_test, tolerance)
+
+    assert isinstance(compiled, DCompiledClassifier)
+    assert np.array_equal(compiled.classes_, classifier.classes_)
+
+    assertSamePrediction(classifier, compiled, x_test)
+    assertSamePrediction(classifier, compiled, x_test.astype(np.float32))
+
+    assert compiled.score(x_train, y_train) == classifier.score(x_train, y_train)
+
+    if isinstance(classifier, CalibratedClassifierCV):
+        assert all(isinstance(calibratedEstimatorOf(calibrated), GaussianNB) for calibrated in classifier.calibrated_classifiers_)
+
+def test_multiClass():
+    rng = np.random.default_rng(4)
+
+    x_train, y_train = randomData(rng, numberOfClasses=4)
+    x_test,  __      = randomData(rng, 2000, numberOfClasses=4)
+
+    classifier = GaussianNB().fit(x_train, y_train)
+
+    assertSamePrediction(classifier, compileClassifier(classifier, x_test, tolerance), x_test)
+
+def test_verification():
+    rng = np.random.default_rng(5)
+
+    x_train, y_train = randomData(rng)
+
+    classifier = CalibratedClassifierCV(GaussianNB(), cv=2, method='isotonic').fit(x_train, y_train)
+
+    # verified by default on samples of the gaussian classes
+    compiled = compileClassifier(classifier)
+
+    maxDeviation, agreement = compiledClassifierDeviation(classifier, compiled, verificationSamplesOf(classifier), tolerance)
+
+    assert maxDeviation <= tolerance and agreement == 1.0
+
+    # a compiled predictor deviating from sklearn is detected (swapped classes)
+    compiled.m_weights, compiled.m_bias = -compiled.m_weights, -compiled.m_bias
+
+    maxDeviation, agreement = compiledClassifierDeviation(classifier, compiled, x_train, tolerance)
+
+    assert maxDeviation > tolerance and agreement < 1.0
+
+    with pytest.raises(ValueError):
+        compileClassifier(LogisticRegression().fit(x_train, y_train))
+
+    with pytest.raises(ValueError):
+        compileClassifier(GaussianNB())
+
+def test_machine(pulseStreams, trainedMachine):
+    x_array = np.concatenate((readValidPulses(pulseStreams['correct_test']), readValidPulses(pulseStreams['reject_test'])))
+
+    machine = DMachineParams(preClassifier=GaussianNB(), preRejectThreshold=0.2, preAcceptThreshold=0.8)
+
+    machine.m_classifier = trainedMachine.m_classifier
+
+    x_correct = readValidPulses(pulseStreams['correct'])
+    x_reject  = readValidPulses(pulseStreams['reject'])
+
+    x_train = np.concatenate((x_correct, x_reject))
+    y_train = np.concatenate((np.ones(len(x_correct), dtype=int), np.zeros(len(x_reject), dtype=int)))
+
+    machine.m_preClassifier.fit(x_train, y_train)
+
+    compiled = machine.compile(x_array)
+
+    assert isinstance(compiled.m_classifier, DCompiledClassifier) and isinstance(compiled.m_preClassifier, DCompiledClassifier)
+
+    prediction,         probability         = machine. predictWithProbability(x_array)
+    predictionCompiled, probabilityCompiled = compiled.predictWithProbability(x_array)
+
+    assert np.array_equal(prediction, predictionCompiled)
+    assert np.max(np.abs(probability - probabilityCompiled)) <= tolerance
+
+    assert np.array_equal(machine.predict(x_array), compiled.predict(x_array))
@@ -0,0 +1,125 @@
+"""
+
+ The feature cache (see 'DFeatureCache') must return exactly the features of 'readValidPulses(..)'.
+
+"""
+
+import os
+
+import numpy as np
+
+from DMLLTDetectorPulseDiscriminator import DFeatureCache, DMachineParams, readValidPulses
+from syntheticPulses import syntheticPulses, writePulseStream
+
+def cacheEntries(cache):
+    return sorted(name for name in os.listdir(cache.m_cacheDirectory) if name.endswith('.npz'))
+
+def cacheSizeInBytes(cache):
+    return sum(os.path.getsize(os.path.join(cache.m_cacheDirectory, name)) for name in cacheEntries(cache))
+
+def test_hit(pulseStreams, tmp_path):
+    cache = DFeatureCache(str(tmp_path/'cache'), prefetchPulses=-1)
+
+    for numberOfPulses in (100, 100, -1):
+        assert np.array_equal(cache.readValidPulses(pulseStreams['correct'], numberOfPulses), readValidPulses(pulseStreams['correct'], numberOfPulses))
+
+    # the entire pulse stream is read on the first miss
+    assert cache.m_misses == 1 and cache.m_hits == 2
+
+    # other preprocessing settings do not share the entry
+    machine = DMachineParams(windowSize=7)
+
+    assert np.array_equal(cache.readValidPulses(pulseStreams['correct'], 100, machineInput=machine), readValidPulses(pulseStreams['correct'], 100, machineInput=machine))
+    assert cache.m_misses == 2 and len(cacheEntries(cache)) == 2
+
+def test_rewrittenStream(tmp_path):
+    rng = np.random.default_rng(21)
+
+    fileName = writePulseStream(str(tmp_path/'pulses.drs4DataStream'), syntheticPulses(rng, 40))
+
+    cache = DFeatureCache(str(tmp_path/'cache'))
+
+    cache.readValidPulses(fileName)
+
+    writePulseStream(fileName, syntheticPulses(rng, 30))
+
+    # the new size (and modification time) invalidates the entry
+    x_array = cache.readValidPulses(fileName)
+
+    assert cache.m_misses == 2 and cache.m_hits == 0
+    assert len(x_array) == 30 and np.array_equal(x_array, readValidPulses(fileName))
+
+def test_prefetch(pulseStreams, tmp_path):
+    fileName = pulseStreams['correct']
+
+    cache = DFeatureCache(str(tmp_path/'cache'), prefetchPulses=150)
+
+    def read(numberOfPulses):
+        x_array = cache.readValidPulses(fileName, numberOfPulses)
+
+        assert np.array_equal(x_array, readValidPulses(fileName, numberOfPulses))
+
+        return cache.m_hits, cache.m_misses
+
+    # 150 of 300 pulses are prefetched (incomplete entry)
+    assert read(100) == (0, 1)
+    assert read(150) == (1, 1)
+
+    # larger requests are misses
+    assert read(200) == (1, 2)
+    assert read(180) == (2, 2)
+    assert read(-1)  == (2, 3)
+
+    # the complete entry serves all requests
+    assert read(1000) == (3, 3)
+    assert read(-1)   == (4, 3)
+
+    # the prefetch exceeds the pulse stream: the entry is complete
+    cache = DFeatureCache(str(tmp_path/'cache2'), prefetchPulses=1000)
+
+    assert read(10) == (0, 1)
+    assert read(-1) == (1, 1)
+
+def test_eviction(pulseStreams, tmp_path):
+    fileNames = [pulseStreams[name] for name in ('correct', 'reject', 'correct_test')]
+
+    cache = DFeatureCache(str(tmp_path/'cache'), prefetchPulses=-1)
+
+    cache.readValidPulses(fileNames[0])
+
+    entrySizeInBytes = cacheSizeInBytes(cache)
+
+    # room for two entries
+    cache = DFeatureCache(str(tmp_path/'cache'), maxSizeInMB=2.5*entrySizeInBytes/(1024*1024), prefetchPulses=-1)
+
+    cache.readValidPulses(fileNames[1])
+
+    entries = cacheEntries(cache)
+
+    assert len(entries) == 2 and cacheSizeInBytes(cache) <= cache.m_maxSizeInBytes
+
+    first = cache.entryFileName(cache.key(fileNames[0]))
+
+    os.utime(first, (1000.0, 1000.0))
+    os.utime(cache.entryFileName(cache.key(fileNames[1])), (2000.0, 2000.0))
+
+    # the hit marks the first entry as recently used: the second one is evicted
+    cache.readValidPulses(fileNames[0])
+    cache.readValidPulses(fileNames[2])
+
+    assert cacheEntries(cache) == sorted(os.path.basename(cache.entryFileName(cache.key(name))) for name in (fileNames[0], fileNames[2]))
+    assert cacheSizeInBytes(cache) <= cache.m_maxSizeInBytes
+
+    # the npz overhead counts: two entries do not fit into 2 x entry size - 1 byte
+    cache = DFeatureCache(str(tmp_path/'tightCache'), maxSizeInMB=(2*entrySizeInBytes - 1)/(1024*1024), prefetchPulses=-1)
+
+    cache.readValidPulses(fileNames[0])
+    cache.readValidPulses(fileNames[1])
+
+    assert len(cacheEntries(cache)) == 1 and cacheSizeInBytes(cache) <= cache.m_maxSizeInBytes
+
+    # entries larger than the cache are not stored
+    cache = DFeatureCache(str(tmp_path/'smallCache'), maxSizeInMB=0.5*entrySizeInBytes/(1024*1024), prefetchPulses=-1)
+
+    assert np.array_equal(cache.readValidPulses(fileNames[1]), readValidPulses(fileNames[1]))
+    assert not os.listdir(cache.m_cacheDirectory)
@@ -0,0 +1,65 @@
+"""
+
+ Accuracy of 'float32Mode' compared to the float64 path on synthetic pulse pairs (see 'createLifetimeSpectrum(..)'):
+ lifetimes < 1e-4 ps, features < 1e-6 and classifier scores < 1e-5.
+
+"""
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import (DPulseWorkspace, preprocessPulses, classifyPulsesWithProbability, calcEventsOfPulsePairs,
+                                             calcLifetimesOfPulsePairs, createLifetimeSpectrum)
+from syntheticPulses import syntheticPulsePairs
+
+maxLifetimeDeviation_in_ps = 1e-4
+maxFeatureDeviation        = 1e-6
+maxScoreDeviation          = 1e-5
+
+@pytest.fixture(scope='module')
+def pulsePairs():
+    return syntheticPulsePairs(np.random.default_rng(7), 400)
+
+def test_features_and_scores(pulsePairs, trainedMachine):
+    timeA, voltageA, timeB, voltageB = pulsePairs
+
+    for voltage in (voltageA, voltageB):
+        features64, valid64 = preprocessPulses(voltage, trainedMachine, False, np.float64)
+        features32, valid32 = preprocessPulses(voltage, trainedMachine, False, np.float32, DPulseWorkspace())
+
+        assert features32.dtype == np.float32
+        assert np.array_equal(valid64, valid32)
+        assert np.max(np.abs(features64[valid64] - features32[valid32])) < maxFeatureDeviation
+
+        __, probability64 = classifyPulsesWithProbability(features64[valid64], trainedMachine)
+        __, probability32 = classifyPulsesWithProbability(features32[valid32], trainedMachine)
+
+        assert np.max(np.abs(probability64 - probability32)) < maxScoreDeviation
+
+@pytest.mark.parametrize('cubicSpline, analyticCubicSpline', [(False, False), (True, False), (True, True)])
+def test_lifetimes(pulsePairs, trainedMachine, cubicSpline, analyticCubicSpline):
+    events64 = calcEventsOfPulsePairs(*pulsePairs, 0, trainedMachine, trainedMachine, cubicSpline=cubicSpline, cubicSplineRenderPoints=50, analyticCubicSpline=analyticCubicSpline)
+    events32 = calcEventsOfPulsePairs(*pulsePairs, 0, trainedMachine, trainedMachine, cubicSpline=cubicSpline, cubicSplineRenderPoints=50, analyticCubicSpline=analyticCubicSpline, float32Mode=True)
+
+    assert len(events64) > 0.5*len(pulsePairs[0])
+    assert np.array_equal(events64['pairIndex'], events32['pairIndex'])
+
+    lifetimes64 = 1000.0*(events64['timeA'] - events64['timeB'])
+    lifetimes32 = 1000.0*(events32['timeA'] - events32['timeB'])
+
+    assert np.max(np.abs(lifetimes64 - lifetimes32)) < maxLifetimeDeviation_in_ps
+
+    lifetimes64 = calcLifetimesOfPulsePairs(*pulsePairs, trainedMachine, trainedMachine, cubicSpline=cubicSpline, cubicSplineRenderPoints=50, analyticCubicSpline=analyticCubicSpline)
+    lifetimes32 = calcLifetimesOfPulsePairs(*pulsePairs, trainedMachine, trainedMachine, cubicSpline=cubicSpline, cubicSplineRenderPoints=50, analyticCubicSpline=analyticCubicSpline, float32Mode=True)
+
+    assert len(lifetimes64) > 0 and len(lifetimes64) == len(lifetimes32)
+    assert np.max(np.abs(lifetimes64 - lifetimes32)) < maxLifetimeDeviation_in_ps
+
+def test_spectrum(pulseStreams, trainedMachine, tmp_path):
+    params = dict(outputName=str(tmp_path/'spectrum'), binWidth_in_ps=50, numberOfBins=400, cubicSpline=False, debug=False, blockSize=128)
+
+    spectrum64 = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], **params)
+    spectrum32 = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], float32Mode=True, **params)
+
+    assert np.sum(spectrum64) > 0
+    assert np.array_equal(spectrum64, spectrum32)
@@ -0,0 +1,58 @@
+"""
+
+ Following a growing pulse-stream file (see 'iterFollowPulseBlocks(..)'): the beginning of an index trailer, which is
+ still written, must not be streamed as records.
+
+"""
+
+import threading
+
+import numpy as np
+
+from DMLLTDetectorPulseDiscriminator import DPulseStreamReader, pulseStreamHeaderDType, pulseStreamIndexEntryDType, pulseRecordDType, iterFollowPulseBlocks
+from syntheticPulses import syntheticPulses, writePulseStream, indexTrailer
+
+def test_partialTrailer(tmp_path):
+    fileName = str(tmp_path/'pulses.drs4DataStream')
+
+    time, voltage = syntheticPulses(np.random.default_rng(11), 60, numberOfCells=64)
+
+    recordBytes = pulseRecordDType(64).itemsize
+    trailer     = indexTrailer(voltage, 2, pulseStreamHeaderDType.itemsize, recordBytes)
+
+    # the trailer is visible in parts: its beginning covers more than two records
+    partial = len(trailer) - 3*pulseStreamIndexEntryDType.itemsize
+
+    assert partial > 2*recordBytes
+
+    writePulseStream(fileName, (time, voltage), trailingBytes=trailer[:partial])
+
+    reader = DPulseStreamReader(fileName)
+
+    assert reader.numberOfPulses() == 60 + partial//recordBytes and not reader.hasIndexTrailer()
+
+    assert reader.refresh(stableOnly=True) == 0
+
+    with open(fileName, 'ab') as file:
+        file.write(trailer[partial:])
+
+    assert reader.refresh(stableOnly=True) == 60 and reader.hasIndexTrailer()
+    assert reader.numberOfPulses() == 60
+
+    # the remaining bytes of the trailer are appended while the file is followed
+    writePulseStream(fileName, (time, voltage), trailingBytes=trailer[:partial])
+
+    def completeTrailer():
+        with open(fileName, 'ab') as file:
+            file.write(trailer[partial:])
+
+    writer = threading.Timer(0.05, completeTrailer)
+    writer.start()
+
+    try:
+        blocks = list(iterFollowPulseBlocks(fileName, 25, idleTimeout_in_s=10.0, pollInterval_in_s=0.5))
+    finally:
+        writer.join()
+
+    assert [len(v) for t, v in blocks] == [25, 25, 10]
+    assert np.array_equal(np.concatenate([v for t, v in blocks]), voltage)
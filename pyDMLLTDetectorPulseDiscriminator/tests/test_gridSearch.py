@@ -0,0 +1,24 @@
+"""
+
+ The parallel grid search (see 'runPipelineGrid(..)' and 'runPipelineGrid2(..)') must yield the scores of the serial execution.
+
+"""
+
+from sklearn.naive_bayes import GaussianNB
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams, DFeatureCache, runPipelineGrid, runPipelineGrid2
+
+def test_parallel(pulseStreams, tmp_path):
+    fileNames = (pulseStreams['correct'], pulseStreams['reject'], pulseStreams['correct_test'], pulseStreams['reject_test'])
+
+    machine = DMachineParams(preClassifier=GaussianNB(), preRejectThreshold=0.2, preAcceptThreshold=0.8)
+
+    serial   = runPipelineGrid(*fileNames, [5, 25, 10], [3, 5, 2], 100, False, machine, False)
+    parallel = runPipelineGrid(*fileNames, [5, 25, 10], [3, 5, 2], 100, False, machine, False, DFeatureCache(str(tmp_path/'cache')), numberOfProcesses=2)
+
+    assert parallel[2] == serial[2]
+
+    serial   = runPipelineGrid2(*fileNames, [5, 25, 10], [5, 15, 10], 100, False, machine, False)
+    parallel = runPipelineGrid2(*fileNames, [5, 25, 10], [5, 15, 10], 100, False, machine, False, numberOfProcesses=2)
+
+    assert parallel[2] == serial[2] and parallel[3] == serial[3]
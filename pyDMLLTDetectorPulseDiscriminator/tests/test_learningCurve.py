@@ -0,0 +1,23 @@
+"""
+
+ The single-pass learning curve (see 'runLearningCurveNPulses(..)') must yield the scores of 'runPipelineNPulses(..)'.
+
+"""
+
+import pytest
+
+from sklearn.naive_bayes import GaussianNB
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams, runPipelineNPulses
+
+@pytest.mark.parametrize('classifier', [None, GaussianNB()], ids=['calibrated', 'partialFit'])
+@pytest.mark.parametrize('numberOfPulses_train', [[2, 50, 4], [40, 2, -3]], ids=['ascending', 'descending'])
+def test_learningCurve(pulseStreams, classifier, numberOfPulses_train):
+    fileNames = (pulseStreams['correct'], pulseStreams['reject'], pulseStreams['correct_test'], pulseStreams['reject_test'])
+
+    machine = DMachineParams() if classifier is None else DMachineParams(classifier=classifier)
+
+    pipeline = runPipelineNPulses(*fileNames, numberOfPulses_train, 100, False, machine, False)
+    curve    = runPipelineNPulses(*fileNames, numberOfPulses_train, 100, False, machine, False, learningCurve=True)
+
+    assert curve == pipeline
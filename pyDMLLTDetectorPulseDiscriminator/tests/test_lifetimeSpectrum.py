@@ -0,0 +1,94 @@
+"""
+
+ 'createLifetimeSpectrum(..)': parallel processing, 'targetCounts' and the event list.
+
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import DMLLTDetectorPulseDiscriminator
+
+from DMLLTDetectorPulseDiscriminator import (createLifetimeSpectrum, lifetimeEventListHeaderDType, lifetimeEventDType, readLifetimeEvents,
+                                             lifetimeSpectrumOfEvents)
+
+def spectrumParams(tmp_path):
+    return dict(outputName=str(tmp_path/'spectrum'), binWidth_in_ps=50, numberOfBins=400, cubicSpline=False, debug=False, blockSize=25,
+                ll_phs_start_in_mV=150.0, ul_phs_start_in_mV=500.0, ll_phs_stop_in_mV=30.0, ul_phs_stop_in_mV=200.0)
+
+def test_parallel(pulseStreams, trainedMachine, tmp_path):
+    spectrum         = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], **spectrumParams(tmp_path))
+    spectrumParallel = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], numberOfProcesses=2, **spectrumParams(tmp_path))
+
+    assert np.sum(spectrum) > 0
+    assert np.array_equal(spectrum, spectrumParallel)
+
+def test_targetCountsParallel(pulseStreams, trainedMachine, tmp_path):
+    statistics = {}
+
+    spectrum = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], numberOfProcesses=2, targetCounts=20, statistics=statistics, **spectrumParams(tmp_path))
+
+    # the pending ranges are cancelled as soon as the target is reached
+    assert np.sum(spectrum) >= 20
+    assert statistics['pairs'] < 600
+
+def test_eventListInterrupted(pulseStreams, trainedMachine, tmp_path, monkeypatch):
+    eventListFileName = str(tmp_path/'events')
+
+    createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], eventListFileName=eventListFileName, **spectrumParams(tmp_path))
+
+    assert (os.path.getsize(eventListFileName) - lifetimeEventListHeaderDType.itemsize)//lifetimeEventDType.itemsize > 0
+    assert not os.path.exists(eventListFileName + '.partial')
+
+    lifetimeSpectrumOfBlock = DMLLTDetectorPulseDiscriminator.lifetimeSpectrumOfBlock
+
+    # the processing fails after the first block
+    def failingLifetimeSpectrumOfBlock(*args):
+        if args[8] > 0:
+            raise MemoryError
+
+        return lifetimeSpectrumOfBlock(*args)
+
+    monkeypatch.setattr(DMLLTDetectorPulseDiscriminator, 'lifetimeSpectrumOfBlock', failingLifetimeSpectrumOfBlock)
+
+    with pytest.raises(MemoryError):
+        createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], eventListFileName=eventListFileName, **spectrumParams(tmp_path))
+
+    assert not os.path.exists(eventListFileName)
+
+    events = np.fromfile(eventListFileName + '.partial', dtype=lifetimeEventDType, offset=lifetimeEventListHeaderDType.itemsize)
+
+    assert len(events) > 0 and np.all(events['pairIndex'] < 25)
+
+@pytest.mark.parametrize('changes', [dict(binWidth_in_ps=20, numberOfBins=900, offset_in_ps=120.0),
+                                     dict(ll_phs_start_in_mV=250.0, ul_phs_start_in_mV=450.0, ll_phs_stop_in_mV=50.0, ul_phs_stop_in_mV=150.0),
+                                     dict(B_as_start_A_as_stop=False, ll_phs_start_in_mV=30.0, ul_phs_start_in_mV=200.0, ll_phs_stop_in_mV=150.0, ul_phs_stop_in_mV=500.0)],
+                         ids=['binning', 'phsWindows', 'AasStart'])
+def test_eventList(pulseStreams, trainedMachine, tmp_path, changes):
+    eventListFileName = str(tmp_path/'events')
+
+    spectrum = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], eventListFileName=eventListFileName, **spectrumParams(tmp_path))
+
+    header, events = readLifetimeEvents(eventListFileName)
+
+    assert header['cf_level_A'] == 25.0 and header['cf_level_B'] == 25.0 and not header['isPositivePolarity']
+
+    params = spectrumParams(tmp_path)
+
+    binning = ('binWidth_in_ps', 'numberOfBins', 'offset_in_ps', 'B_as_start_A_as_stop', 'll_phs_start_in_mV', 'ul_phs_start_in_mV', 'll_phs_stop_in_mV', 'ul_phs_stop_in_mV')
+
+    # the event list reproduces the run, which has written it
+    assert np.array_equal(lifetimeSpectrumOfEvents(eventListFileName, **{key: params[key] for key in binning if key in params}), spectrum)
+
+    params.update(changes)
+
+    spectrumOfEvents = lifetimeSpectrumOfEvents(events, chunkSize=100, **{key: params[key] for key in binning if key in params})
+
+    assert np.sum(spectrumOfEvents) > 0
+    assert np.array_equal(spectrumOfEvents, createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], **params))
+
+def test_noEventList(pulseStreams):
+    with pytest.raises(IOError):
+        readLifetimeEvents(pulseStreams['pairs'])
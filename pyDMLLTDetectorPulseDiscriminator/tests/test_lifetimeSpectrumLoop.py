@@ -0,0 +1,30 @@
+"""
+
+ The block-wise lifetime spectrum (see 'createLifetimeSpectrum(..)') must be identical to the spectrum of the per-pair loop of 
+ the initial release.
+
+"""
+
+import pytest
+
+import numpy as np
+
+from DMLLTDetectorPulseDiscriminator import createLifetimeSpectrum
+from baselineLoops import lifetimeSpectrumLoop
+
+@pytest.mark.parametrize('cubicSpline, B_as_start_A_as_stop', [(False, True), (True, True), (False, False)])
+def test_spectrum(pulseStreams, trainedMachine, tmp_path, cubicSpline, B_as_start_A_as_stop):
+    params = dict(binWidth_in_ps=25, numberOfBins=800, offset_in_ps=10000.0, B_as_start_A_as_stop=B_as_start_A_as_stop, cf_level_A=30.0, cf_level_B=20.0,
+                  ll_phs_start_in_mV=150.0, ul_phs_start_in_mV=500.0, ll_phs_stop_in_mV=30.0, ul_phs_stop_in_mV=200.0, cubicSpline=cubicSpline,
+                  cubicSplineRenderPoints=20, windowSizeA=3)
+
+    if not B_as_start_A_as_stop:
+        params.update(ll_phs_start_in_mV=30.0, ul_phs_start_in_mV=200.0, ll_phs_stop_in_mV=150.0, ul_phs_stop_in_mV=500.0)
+
+    spectrum = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], str(tmp_path/'spectrum'), debug=False, blockSize=64, **params)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spectrumLoop = lifetimeSpectrumLoop(trainedMachine, trainedMachine, pulseStreams['pairs'], **params)
+
+    assert np.sum(spectrumLoop) > 100
+    assert np.array_equal(spectrum, spectrumLoop)
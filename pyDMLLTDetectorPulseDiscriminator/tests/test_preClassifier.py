@@ -0,0 +1,36 @@
+"""
+
+ The machine with a pre-classifier (see 'DMachineParams').
+
+"""
+
+import numpy as np
+import pytest
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams, readValidPulses, trainPulses, trainPulsesOnline
+
+def test_partialFitUnsupported(pulseStreams):
+    machine = DMachineParams(classifier=GaussianNB(), preClassifier=LogisticRegression())
+
+    with pytest.raises(ValueError, match='pre-classifier'):
+        trainPulsesOnline(pulseStreams['correct'], pulseStreams['reject'], '', False, 100, machine, False)
+
+    with pytest.raises(ValueError, match='classifier'):
+        DMachineParams().partialFit(np.zeros((2, 4)), np.array([0, 1]))
+
+def test_listInput(pulseStreams):
+    machine = DMachineParams(preClassifier=LogisticRegression(max_iter=1000), preRejectThreshold=0.2, preAcceptThreshold=0.8)
+
+    machine = trainPulses(pulseStreams['correct'], pulseStreams['reject'], '', False, 100, 100, machine, False)
+
+    x_array = np.concatenate((readValidPulses(pulseStreams['correct_test'], 50), readValidPulses(pulseStreams['reject_test'], 50)))
+
+    prediction, probability = machine.predictWithProbability(x_array)
+
+    predictionOfList, probabilityOfList = machine.predictWithProbability(x_array.tolist())
+
+    assert np.array_equal(predictionOfList, prediction) and np.array_equal(probabilityOfList, probability)
+    assert np.array_equal(machine.predict(x_array.tolist()), prediction)
@@ -0,0 +1,45 @@
+"""
+
+ The block-wise preprocessing (see 'preprocessPulses(..)') must yield the features and the validity of the per-pulse loop 
+ of the initial release (median filter, baseline correction and normalization, see 'normalizeData(..)').
+
+"""
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams, preprocessPulses, DPulseWorkspace
+from baselineLoops import preprocessPulseLoop
+from syntheticPulses import syntheticPulses
+
+@pytest.mark.parametrize('medianFilter, windowSize, correctForBaseline', [(True, 5, True), (True, 11, False), (False, 5, True), (False, 5, False)])
+@pytest.mark.parametrize('isPositivePolarity', [False, True])
+def test_preprocessing(medianFilter, windowSize, correctForBaseline, isPositivePolarity):
+    rng = np.random.default_rng(15)
+
+    __, voltage = syntheticPulses(rng, 100, numberOfCells=512)
+
+    if isPositivePolarity:
+        voltage = -voltage
+
+    # pulses outside of the safety region and empty pulses are invalid
+    voltage[0] = np.roll(voltage[0], 500 - np.argmax(np.abs(voltage[0])))
+    voltage[1] = 0.0
+
+    machine = DMachineParams(medianFilter=medianFilter, windowSize=windowSize, correctForBaseline=correctForBaseline)
+
+    features, valid = preprocessPulses(voltage, machine, isPositivePolarity)
+
+    featuresWorkspace, validWorkspace = preprocessPulses(voltage, machine, isPositivePolarity, workspace=DPulseWorkspace())
+
+    for k in range(len(voltage)):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            featuresLoop, validLoop = preprocessPulseLoop(voltage[k], machine, isPositivePolarity)
+
+        assert valid[k] == validLoop == validWorkspace[k]
+
+        if validLoop:
+            assert np.allclose(features[k], featuresLoop, rtol=1e-12, atol=1e-12)
+            assert np.array_equal(features[k], featuresWorkspace[k])
+
+    assert not valid[0] and not valid[1] and np.count_nonzero(valid) > 90
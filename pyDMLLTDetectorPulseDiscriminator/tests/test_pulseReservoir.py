@@ -0,0 +1,81 @@
+"""
+
+ The reservoir sample of the TRAINing pulses (see 'DPulseReservoir' and 'buildReservoirTrainingSet(..)') must equal the 
+ sequential algorithm R drawing from the same generator.
+
+"""
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import DPulseReservoir, buildReservoirTrainingSet, readValidPulses
+
+"""
+
+ This function returns the reservoir sample of 'capacity' out of the pulses 'x_array' (algorithm R, one draw per pulse).
+
+"""
+
+def reservoirLoop(x_array, capacity, rng):
+    samples = np.empty((min(capacity, len(x_array)), x_array.shape[1]), dtype=np.float32)
+
+    for i in range(len(x_array)):
+        if i < capacity:
+            samples[i] = x_array[i]
+        else:
+            slot = rng.integers(0, i + 1)
+
+            if slot < capacity:
+                samples[slot] = x_array[i]
+
+    return samples
+
+@pytest.mark.parametrize('blockSize', [1, 7, 100, 5000])
+def test_add(blockSize):
+    x_array = np.random.default_rng(0).normal(size=(5000, 16)).astype(np.float32)
+
+    reservoir = DPulseReservoir(50, 16, 9)
+
+    for first in range(0, len(x_array), blockSize):
+        reservoir.add(x_array[first:first + blockSize])
+
+    # large blocks draw several pulses for the same slot: the last draw wins
+    assert len(reservoir) == 50 and reservoir.m_numberOfPulses == 5000
+    assert np.array_equal(reservoir.samples(), reservoirLoop(x_array, 50, np.random.default_rng(9)))
+
+def test_trainingSet(pulseStreams):
+    x_reject  = readValidPulses(pulseStreams['reject'])
+    x_correct = readValidPulses(pulseStreams['correct'])
+
+    x_array, y_array = buildReservoirTrainingSet(pulseStreams['correct'], pulseStreams['reject'], 40, blockSize=64, seed=2)
+
+    rng = np.random.default_rng(2)
+
+    assert x_array.dtype == np.float32
+    assert np.array_equal(y_array, np.repeat([0, 1], 40))
+    assert np.array_equal(x_array, np.concatenate((reservoirLoop(x_reject, 40, rng), reservoirLoop(x_correct, 40, rng))))
+
+def test_capacityLargerThanStream(pulseStreams):
+    x_reject  = readValidPulses(pulseStreams['reject_test'])
+    x_correct = readValidPulses(pulseStreams['correct_test'])
+
+    x_array, y_array = buildReservoirTrainingSet(pulseStreams['correct_test'], pulseStreams['reject_test'], 1000, blockSize=64, seed=2)
+
+    assert x_array.dtype == np.float32 and x_array.shape == (len(x_reject) + len(x_correct), x_reject.shape[1])
+    assert np.array_equal(y_array, np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(len(x_correct), dtype=int))))
+    assert np.array_equal(x_array, np.concatenate((x_reject, x_correct)).astype(np.float32))
+
+def test_partialRejectReservoir(pulseStreams):
+    x_reject  = readValidPulses(pulseStreams['reject_test'])
+    x_correct = readValidPulses(pulseStreams['correct'])
+
+    capacity = (len(x_reject) + len(x_correct))//2
+
+    assert len(x_reject) < capacity < len(x_correct)
+
+    # the sampled CORRECT pulses are moved in place to the end of the REJECT pulses
+    x_array, y_array = buildReservoirTrainingSet(pulseStreams['correct'], pulseStreams['reject_test'], capacity, blockSize=64, seed=2)
+
+    assert x_array.dtype == np.float32 and x_array.shape == (len(x_reject) + capacity, x_reject.shape[1])
+    assert np.array_equal(y_array, np.concatenate((np.zeros(len(x_reject), dtype=int), np.ones(capacity, dtype=int))))
+    assert np.array_equal(x_array, np.concatenate((x_reject.astype(np.float32), reservoirLoop(x_correct, capacity, np.random.default_rng(2)))))
@@ -0,0 +1,102 @@
+"""
+
+ Several pulse-stream files as one pulse sequence (see 'DPulseStreamDataset').
+
+"""
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import (DPulseStreamDataset, DPulseStreamReader, pulseStreamHeaderDType, pulseRecordDType, openPulseStream,
+                                             expandPulseStreamFileNames, readValidPulses, createLifetimeSpectrum, isPulseStreamManifest)
+from syntheticPulses import syntheticPulses, writePulseStream, writePulseStreamManifest, indexTrailer
+
+def test_indexTrailers(tmp_path):
+    rng = np.random.default_rng(12)
+
+    recordBytes = pulseRecordDType(64).itemsize
+
+    traces = [syntheticPulses(rng, n, numberOfCells=64) for n in (30, 20)]
+
+    fileNames = [str(tmp_path/'pulses_{0}.drs4DataStream'.format(k)) for k in range(2)]
+
+    for fileName, (time, voltage) in zip(fileNames, traces):
+        writePulseStream(fileName, (time, voltage), trailingBytes=indexTrailer(voltage, 8, pulseStreamHeaderDType.itemsize, recordBytes))
+
+    dataset = openPulseStream(fileNames)
+
+    assert isinstance(dataset, DPulseStreamDataset)
+    assert dataset.hasIndexTrailer() and dataset.m_indexFooter is None
+    assert dataset.files() == [(fileNames[0], 30), (fileNames[1], 20)]
+
+    time, voltage = dataset.readBlock(25, 10)
+
+    assert np.array_equal(voltage, np.concatenate((traces[0][1][25:], traces[1][1][:5])))
+
+    dataset.close()
+
+    # the trailer of one file is missing
+    writePulseStream(fileNames[1], traces[1])
+
+    dataset = DPulseStreamDataset(fileNames)
+
+    assert not dataset.hasIndexTrailer()
+    assert dataset.numberOfPulses() == 50
+
+def test_fileNameWithGlobCharacters(pulseStreams, tmp_path):
+    fileName = str(tmp_path/'run[1].drs4DataStream')
+
+    with open(pulseStreams['correct'], 'rb') as source, open(fileName, 'wb') as file:
+        file.write(source.read())
+
+    reader = openPulseStream(fileName)
+
+    assert isinstance(reader, DPulseStreamReader)
+    assert reader.numberOfPulses() == 300
+
+    reader.close()
+
+    assert expandPulseStreamFileNames(fileName) == [(fileName, -1, -1)]
+    assert np.array_equal(readValidPulses(fileName, 100), readValidPulses(pulseStreams['correct'], 100))
+
+    # a pattern still matches the file, if no file of this name exists
+    assert expandPulseStreamFileNames(str(tmp_path/'run*.drs4DataStream')) == [(fileName, -1, -1)]
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_manifest(tmp_path, version):
+    time, voltage = syntheticPulses(np.random.default_rng(13), 50, numberOfCells=64)
+
+    fileName = writePulseStreamManifest(str(tmp_path/'run.drs4DataStream'), (time, voltage), 20, version)
+
+    assert isPulseStreamManifest(fileName)
+    assert expandPulseStreamFileNames(fileName)[2][:2] == (fileName + '.000002', 10)
+
+    dataset = openPulseStream(fileName)
+
+    assert isinstance(dataset, DPulseStreamDataset)
+    assert dataset.numberOfPulses() == 50 and [n for __, n in dataset.files()] == [20, 20, 10]
+
+    # a block crossing the border of the segments 0/1 and 1/2
+    blockTime, blockVoltage = dataset.readBlock(15, 30)
+
+    assert np.array_equal(blockVoltage, voltage[15:45])
+    # version 2: each segment stores the time axis of its first record
+    assert np.array_equal(blockTime, np.repeat(time[[0, 20, 40]], [5, 20, 5], axis=0) if version == 2 else time[15:45])
+
+    dataset.close()
+
+def test_manifestLifetimeSpectrum(pulseStreams, trainedMachine, tmp_path):
+    reader = openPulseStream(pulseStreams['pairs'], True)
+
+    fileName = writePulseStreamManifest(str(tmp_path/'pairs.drs4DataStream'), reader.readBlock(), 128)
+
+    reader.close()
+
+    params = dict(outputName=str(tmp_path/'spectrum'), binWidth_in_ps=50, numberOfBins=400, cubicSpline=False, debug=False, blockSize=50,
+                  ll_phs_start_in_mV=150.0, ul_phs_start_in_mV=500.0, ll_phs_stop_in_mV=30.0, ul_phs_stop_in_mV=200.0)
+
+    spectrum = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], **params)
+
+    assert np.sum(spectrum) > 0
+    assert np.array_equal(createLifetimeSpectrum(trainedMachine, trainedMachine, fileName, **params), spectrum)
+    assert np.array_equal(createLifetimeSpectrum(trainedMachine, trainedMachine, fileName, numberOfProcesses=2, **params), spectrum)
@@ -0,0 +1,150 @@
+"""
+
+ Pulse-stream files written through the documented data types (see 'pulseStreamHeaderDType', 'pulseRecordDType(..)' and the 
+ index trailer 'pulseStreamIndexEntryDType'/'pulseStreamIndexFooterDType') must be read back unchanged by 'readPulse(..)' 
+ and 'DPulseStreamReader'.
+
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import (DPulseStreamReader, pulseStreamHeaderDType, pulseRecordDType, pulseStreamIndexEntryDType, pulseStreamIndexFooterDType,
+                                             readHeader, readPulse, readIndexTrailer, phsSegmentsOfPulseStream)
+from baselineLoops import readPulseLoop
+from syntheticPulses import syntheticPulses, syntheticPulsePairs, writePulseStream, indexTrailer, sweepInNanoseconds, frequencyInGHz
+
+def unsortedPulses(rng, n, numberOfCells = 256):
+    time, voltage = syntheticPulses(rng, n, numberOfCells=numberOfCells)
+
+    # time traces of the DRS4 may be unsorted
+    time[::3, [10, 11]] = time[::3, [11, 10]]
+
+    return time, voltage
+
+def test_readPulse(tmp_path):
+    fileName = str(tmp_path/'pulses.drs4DataStream')
+
+    time, voltage = unsortedPulses(np.random.default_rng(13), 20)
+
+    # the last pulse is incomplete
+    writePulseStream(fileName, (time, voltage), trailingBytes=np.zeros(300, dtype='<f4').tobytes())
+
+    with open(fileName, 'rb') as file, open(fileName, 'rb') as fileLoop:
+        assert readHeader(file) == readHeader(fileLoop) == (256, sweepInNanoseconds, frequencyInGHz)
+
+        for k in range(21):
+            t,     v     = readPulse(file, 256)
+            tLoop, vLoop = readPulseLoop(fileLoop, 256)
+
+            assert np.array_equal(t, tLoop) and np.array_equal(v, vLoop)
+
+            if k < 20:
+                assert np.array_equal(t, np.sort(time[k])) and np.array_equal(v, voltage[k])
+
+        assert len(v) == 0 and len(t) == 256
+
+def test_version1(tmp_path):
+    fileName = str(tmp_path/'pulses.drs4DataStream')
+
+    time, voltage = unsortedPulses(np.random.default_rng(14), 30)
+
+    writePulseStream(fileName, (time, voltage))
+
+    reader = DPulseStreamReader(fileName)
+
+    assert reader.numberOfPulses() == 30 and not reader.hasIndexTrailer()
+
+    t, v = reader.readBlock(5, 20)
+
+    assert np.array_equal(t, np.sort(time[5:25], axis=1)) and np.array_equal(v, voltage[5:25])
+
+    t, v = reader.readPulses([2, 29])
+
+    assert np.array_equal(v, voltage[[2, 29]])
+
+    reader.close()
+
+@pytest.mark.parametrize('pairs', [False, True])
+def test_version2(tmp_path, pairs):
+    rng = np.random.default_rng(17)
+
+    traces = syntheticPulsePairs(rng, 40, 128) if pairs else syntheticPulses(rng, 40, numberOfCells=128)
+
+    # version 2 streams share the time axis (unsorted) of the first pulse
+    timeAxis = traces[0][0].copy()
+
+    timeAxis[[5, 6]] = timeAxis[[6, 5]]
+
+    traces = tuple(np.broadcast_to(timeAxis, trace.shape) if k%2 == 0 else trace for k, trace in enumerate(traces))
+
+    fileNames = [writePulseStream(str(tmp_path/'pulses_v{0}.drs4DataStream'.format(version)), traces, version) for version in (1, 2)]
+
+    for version, fileName in zip((1, 2), fileNames):
+        header = np.fromfile(fileName, dtype=pulseStreamHeaderDType, count=1)[0]
+
+        assert int(header['version']) == version and int(header['numberOfCells']) == 128
+
+        timeAxisBytes = 4*128 if version == 2 else 0
+
+        assert os.path.getsize(fileName) == pulseStreamHeaderDType.itemsize + timeAxisBytes + 40*pulseRecordDType(128, pairs, version).itemsize
+
+    readers = [DPulseStreamReader(fileName, pairs) for fileName in fileNames]
+
+    assert readers[1].m_headerBytes == pulseStreamHeaderDType.itemsize + 4*128 and readers[1].numberOfPulses() == 40
+
+    block, blockVersion2 = [reader.readBlock(3, 30) for reader in readers]
+
+    for k, (trace, traceVersion2) in enumerate(zip(block, blockVersion2)):
+        expected = np.sort(traces[k][3:33], axis=1) if k%2 == 0 else traces[k][3:33]
+
+        assert np.array_equal(trace, expected) and np.array_equal(traceVersion2, expected)
+
+    assert np.array_equal(readers[1].readPulses([0, 39])[-1], traces[-1][[0, 39]])
+
+    for reader in readers:
+        reader.close()
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_indexTrailer(tmp_path, version):
+    fileName = str(tmp_path/'pairs.drs4DataStream')
+
+    timeA, voltageA, timeB, voltageB = syntheticPulsePairs(np.random.default_rng(18), 50, 128)
+
+    if version == 2:
+        timeA, timeB = np.broadcast_to(timeA[0], timeA.shape), np.broadcast_to(timeA[0], timeB.shape)
+
+    # the start pulses (B) of the second block cannot pass a PHS window from 1 mV
+    voltageB[10:20] *= 0.001
+
+    headerBytes = pulseStreamHeaderDType.itemsize + (4*128 if version == 2 else 0)
+    trailer     = indexTrailer((voltageA, voltageB), 10, headerBytes, pulseRecordDType(128, True, version).itemsize)
+
+    writePulseStream(fileName, (timeA, voltageA, timeB, voltageB), version, trailer)
+
+    footer, entries = readIndexTrailer(fileName, headerBytes)
+
+    assert len(trailer) == 5*pulseStreamIndexEntryDType.itemsize + pulseStreamIndexFooterDType.itemsize
+    assert footer.tobytes() == trailer[-pulseStreamIndexFooterDType.itemsize:] and entries.tobytes() == trailer[:-pulseStreamIndexFooterDType.itemsize]
+    assert int(footer['numberOfRecords']) == 50 and int(footer['pairs']) == 1
+
+    reader = DPulseStreamReader(fileName, pairs=True)
+
+    assert reader.hasIndexTrailer() and reader.numberOfPulses() == 50
+    assert np.array_equal(reader.readBlock(40)[3], voltageB[40:])
+
+    segments = phsSegmentsOfPulseStream(reader, dict(ll_phs_start_in_mV=1.0, ll_phs_stop_in_mV=1.0))
+
+    assert segments == [(0, 10, False), (10, 10, True), (20, 10, False), (30, 10, False), (40, 10, False)]
+
+    reader.close()
+
+    # a trailer with a wrong magic number is part of the records
+    corrupted = bytearray(trailer)
+    corrupted[-pulseStreamIndexFooterDType.itemsize] ^= 0xff
+
+    writePulseStream(fileName, (timeA, voltageA, timeB, voltageB), version, bytes(corrupted))
+
+    assert readIndexTrailer(fileName, headerBytes) == (None, None)
@@ -0,0 +1,45 @@
+"""
+
+ The rejection cascade (see 'rejectionStages') must yield the same spectra and statistics for the single spectrum and the
+ multi-configuration path (see 'calcEventListsOfPulsePairs(..)').
+
+"""
+
+import os
+
+import numpy as np
+
+from DMLLTDetectorPulseDiscriminator import rejectionStages, pulseRecordDType, createLifetimeSpectrum
+
+def test_configurations(pulseStreams, trainedMachine, tmp_path):
+    params = dict(outputName=str(tmp_path/'spectrum'), binWidth_in_ps=50, numberOfBins=400, cubicSpline=False, debug=False, blockSize=128,
+                  ll_phs_start_in_mV=150.0, ul_phs_start_in_mV=500.0, ll_phs_stop_in_mV=30.0, ul_phs_stop_in_mV=150.0)
+
+    statistics = {}
+
+    spectrum = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], statistics=statistics, **params)
+
+    statisticsConfigurations = {}
+
+    spectra = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], statistics=statisticsConfigurations,
+                                     spectrumConfigurations=[dict(), dict(ll_phs_stop_in_mV=100.0, ul_phs_stop_in_mV=200.0, cf_level_A=30.0)], **params)
+
+    assert np.sum(spectrum) > 0
+    assert np.array_equal(spectrum, spectra[0])
+
+    # the second window adds the stop pulses of 150-200 mV
+    assert statisticsConfigurations['phs'] <= statistics['phs']
+
+    for stage in ('indexTrailer', 'peakPosition', 'classifierA', 'classifierB'):
+        assert statisticsConfigurations[stage] >= statistics[stage]
+
+    for s in (statistics, statisticsConfigurations):
+        assert s['pairs'] == (os.path.getsize(pulseStreams['pairs']) - 32)//pulseRecordDType(1024, True).itemsize
+        assert sum(s[stage] for stage in rejectionStages) + s['accepted'] == s['pairs']
+
+    statisticsSingle = {}
+
+    spectra = createLifetimeSpectrum(trainedMachine, trainedMachine, pulseStreams['pairs'], statistics=statisticsSingle, spectrumConfigurations=[dict()], **params)
+
+    assert np.array_equal(spectrum, spectra[0])
+    assert statisticsSingle == statistics
@@ -0,0 +1,86 @@
+"""
+
+ The random sample of valid pulses for TRAINing (see 'sampleValidPulses(..)' and 'readTrainingPulses(..)').
+
+"""
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import DMachineParams, openPulseStream, preprocessPulses, readTrainingPulses, readValidPulses, sampleValidPulses
+from syntheticPulses import syntheticPulses, writePulseStream
+
+"""
+
+ This function writes 100 pulses, of which the pulses 'invalid' are empty (invalid, see 'normalizeData(..)').
+
+"""
+
+def writeSamplingStream(fileName, invalid = ()):
+    time, voltage = syntheticPulses(np.random.default_rng(5), 100)
+
+    voltage[list(invalid)] = 0.0
+
+    return writePulseStream(fileName, (time, voltage))
+
+@pytest.mark.parametrize('sampling', ['uniform', 'stratified'])
+def test_seed(tmp_path, sampling):
+    fileName = writeSamplingStream(str(tmp_path/'pulses.drs4DataStream'), range(0, 100, 7))
+
+    x_array, indexes = sampleValidPulses(fileName, 20, sampling=sampling, seed=3)
+
+    assert len(x_array) == 20 and np.all(np.diff(indexes) > 0)
+
+    x_again, indexesAgain = sampleValidPulses(fileName, 20, sampling=sampling, seed=3)
+
+    assert np.array_equal(indexesAgain, indexes) and np.array_equal(x_again, x_array)
+    assert not np.array_equal(sampleValidPulses(fileName, 20, sampling=sampling, seed=4)[1], indexes)
+
+    # the features are those of the sampled pulses
+    reader = openPulseStream(fileName)
+
+    features, valid = preprocessPulses(reader.readPulses(indexes)[1], DMachineParams())
+
+    reader.close()
+
+    assert np.all(valid) and np.array_equal(x_array, features)
+
+    assert np.array_equal(readTrainingPulses(fileName, 20, sampling=sampling, seed=3), x_array)
+
+def test_stratified(tmp_path):
+    # the pulses drawn first (see 'sampleValidPulses(..)': one offset per stratum of 10 pulses)
+    drawn = 10*np.arange(10) + np.random.default_rng(3).integers(0, np.full(10, 10))
+
+    fileName = writeSamplingStream(str(tmp_path/'pulses.drs4DataStream'), drawn[::2])
+
+    __, indexes = sampleValidPulses(fileName, 10, sampling='stratified', seed=3)
+
+    assert np.array_equal(indexes//10, np.arange(10))
+
+    # invalid pulses are replaced by their successors within the stratum
+    successors = 10*np.arange(10) + (drawn%10 + 1)%10
+
+    assert np.array_equal(indexes[::2], successors[::2]) and np.array_equal(indexes[1::2], drawn[1::2])
+
+@pytest.mark.parametrize('sampling', ['uniform', 'stratified'])
+def test_notEnoughValidPulses(tmp_path, sampling):
+    # the pulses 30-99 are invalid, i.e. the strata 3-9 contain no valid pulse
+    fileName = writeSamplingStream(str(tmp_path/'pulses.drs4DataStream'), range(30, 100))
+
+    numberOfPulses = 50 if sampling == 'uniform' else 10
+
+    x_array, indexes = sampleValidPulses(fileName, numberOfPulses, sampling=sampling, seed=1)
+
+    assert len(x_array) == len(indexes) == (30 if sampling == 'uniform' else 3)
+    assert np.all(indexes < 30)
+
+    if sampling == 'uniform':
+        assert np.array_equal(x_array, readValidPulses(fileName))
+
+def test_readTrainingPulses(tmp_path):
+    fileName = writeSamplingStream(str(tmp_path/'pulses.drs4DataStream'), range(0, 100, 7))
+
+    assert np.array_equal(readTrainingPulses(fileName, 20), readValidPulses(fileName, 20))
+
+    with pytest.raises(ValueError):
+        readTrainingPulses(fileName, 20, sampling='random')
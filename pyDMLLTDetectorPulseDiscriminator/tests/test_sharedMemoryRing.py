@@ -0,0 +1,140 @@
+"""
+
+ A pulse pair ring buffer laid out as by the C++ API (see 'sharedMemoryRingControlDType') must be consumed unchanged by 
+ 'DPulseStreamSharedMemoryReader' and 'iterSharedMemoryPulseBlocks(..)', also across the end of the ring.
+
+"""
+
+import os
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+import pytest
+
+from DMLLTDetectorPulseDiscriminator import (DPulseStreamSharedMemoryReader, sharedMemoryRingControlDType, sharedMemoryRingMagic, pulseRecordDType,
+                                             iterSharedMemoryPulseBlocks)
+from syntheticPulses import syntheticPulsePairs, sweepInNanoseconds, frequencyInGHz
+
+"""
+
+ This class is the producer side of the ring (see the C++ API: DPulseStreamSharedMemoryRing).
+
+"""
+
+class DRingProducer():
+    def __init__(self, name, numberOfCells, capacity, version, timeAxis):
+        self.m_recordDType = pulseRecordDType(numberOfCells, True, version)
+
+        axisSizeInBytes   = 4*numberOfCells if version == 2 else 0
+        dataOffsetInBytes = ((sharedMemoryRingControlDType.itemsize + axisSizeInBytes + 63)//64)*64 # cache line aligned
+
+        self.m_sharedMemory = shared_memory.SharedMemory(name=name, create=True, size=dataOffsetInBytes + capacity*self.m_recordDType.itemsize)
+
+        self.m_control = np.ndarray((1,), dtype=sharedMemoryRingControlDType, buffer=self.m_sharedMemory.buf)
+
+        self.m_control[0] = np.zeros(1, dtype=sharedMemoryRingControlDType)[0]
+
+        self.m_control['magic']                        = sharedMemoryRingMagic
+        self.m_control['layoutVersion']                = 1
+        self.m_control['header']['version']            = version
+        self.m_control['header']['sweepInNanoseconds'] = sweepInNanoseconds
+        self.m_control['header']['frequencyInGHz']     = frequencyInGHz
+        self.m_control['header']['numberOfCells']      = numberOfCells
+        self.m_control['recordSizeInBytes']            = self.m_recordDType.itemsize
+        self.m_control['capacityInRecords']            = capacity
+        self.m_control['dataOffsetInBytes']            = dataOffsetInBytes
+
+        if version == 2:
+            np.ndarray((numberOfCells,), dtype='<f4', buffer=self.m_sharedMemory.buf, offset=sharedMemoryRingControlDType.itemsize)[:] = timeAxis
+
+        self.m_records  = np.ndarray((capacity,), dtype=self.m_recordDType, buffer=self.m_sharedMemory.buf, offset=dataOffsetInBytes)
+        self.m_capacity = capacity
+
+    def write(self, traces):
+        writeIndex = int(self.m_control['writeIndex'][0])
+
+        assert writeIndex + len(traces[1]) - int(self.m_control['readIndex'][0]) <= self.m_capacity
+
+        for k in range(len(traces[1])):
+            record = self.m_records[(writeIndex + k)%self.m_capacity]
+
+            for name, trace in zip(('timeA', 'voltageA', 'timeB', 'voltageB'), traces):
+                if name in self.m_recordDType.names:
+                    record[name] = trace[k]
+
+        self.m_control['writeIndex'] = writeIndex + len(traces[1])
+
+    def close(self):
+        self.m_control['closed'] = 1
+
+    # the readers (python < 3.13) remove the segment from the resource tracker of this process, which is the producer here
+    def track(self):
+        resource_tracker.register(self.m_sharedMemory._name, 'shared_memory')
+
+    def unlink(self):
+        self.m_control = None
+        self.m_records = None
+
+        self.m_sharedMemory.close()
+        self.m_sharedMemory.unlink()
+
+def ringPulsePairs(rng, n, version):
+    traces = syntheticPulsePairs(rng, n, 128)
+
+    if version == 2:
+        traces = tuple(np.broadcast_to(traces[0][0], trace.shape) if k%2 == 0 else trace for k, trace in enumerate(traces))
+
+    return traces
+
+@pytest.mark.parametrize('version', [1, 2])
+def test_ring(version):
+    traces = ringPulsePairs(np.random.default_rng(19), 40, version)
+
+    producer = DRingProducer('DPulseStreamRingTest{0}_{1}'.format(os.getpid(), version), 128, 16, version, traces[0][0])
+
+    try:
+        reader = DPulseStreamSharedMemoryReader(producer.m_sharedMemory.name)
+
+        assert reader.m_numberOfCells == 128 and reader.m_capacity == 16 and reader.numberOfAvailablePairs() == 0
+
+        producer.write([trace[:10] for trace in traces])
+
+        block = reader.readBlock(6)
+
+        assert np.array_equal(block[1], traces[1][:6]) and np.array_equal(block[3], traces[3][:6])
+        assert np.array_equal(block[0], np.sort(traces[0][:6], axis=1)) and not block[1].flags.writeable
+
+        reader.release(6)
+
+        # the next pairs wrap around the end of the ring
+        producer.write([trace[10:22] for trace in traces])
+
+        first  = reader.readBlock()
+
+        assert len(first[1]) == 10 and np.array_equal(first[1], traces[1][6:16])
+
+        reader.release(10)
+
+        second = reader.readBlock()
+
+        assert np.array_equal(second[3], traces[3][16:22])
+
+        reader.release(6)
+
+        del block, first, second
+
+        reader.close()
+
+        producer.track()
+        producer.write([trace[22:34] for trace in traces])
+        producer.close()
+
+        blocks = [tuple(np.array(trace) for trace in block) for block in iterSharedMemoryPulseBlocks(producer.m_sharedMemory.name, 4, idleTimeout_in_s=1.0)]
+
+        # the block at the end of the ring is shorter
+        assert [len(block[1]) for block in blocks] == [4, 4, 2, 2]
+        assert np.array_equal(np.concatenate([block[1] for block in blocks]), traces[1][22:34])
+        assert np.array_equal(np.concatenate([block[2] for block in blocks]), np.sort(traces[2][22:34], axis=1))
+    finally:
+        producer.track()
+        producer.unlink()